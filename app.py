@@ -1,10 +1,20 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
+import time
 from datetime import datetime
 
+from lumina import config, downloads, figures, instrument, report, thumbnails, warmup
+from lumina.aggregates import BEV
+from lumina.export import FORMATS
+from lumina.filters import DEFAULT_YEAR_START, FilterState
+from lumina.geo import MIN_LEVEL, viewport
+from lumina.history import COMPARE_DIMS, History, history_version
+from lumina.measures import MEASURES
+from lumina.records import DEFAULT_SORT, SORT_COLUMNS, RecordQuery
+from lumina.sample import ESTIMATED_FIELDS
+
 # -----------------------------------------------------------------------------
 # 1. KONFIGURASI HALAMAN & CSS
 # -----------------------------------------------------------------------------
@@ -17,8 +27,6 @@ st.set_page_config(
 
 # Palet Warna Konsisten (Nuansa Biru/Cyan untuk Dark Mode)
 COLOR_PALETTE = px.colors.sequential.Blues[::-1]
-PRIMARY_COLOR = "#00D4FF" # Cyan terang untuk highlight
-SECONDARY_COLOR = "#007BFF" # Biru untuk elemen sekunder
 
 st.markdown("""
 <style>
@@ -127,11 +135,6 @@ st.markdown("""
         color: #00D4FF;
         margin-top: 5px;
     }
-    .model-image {
-        max-width: 100%;
-        height: auto;
-        border-radius: 5px;
-    }
     
 </style>
 """, unsafe_allow_html=True)
@@ -139,39 +142,38 @@ st.markdown("""
 # -----------------------------------------------------------------------------
 # 2. FUNGSI LOAD DATA & UTILS
 # -----------------------------------------------------------------------------
-@st.cache_data
-def load_data():
-    df = pd.read_csv("https://raw.githubusercontent.com/ginamalia/dataset/refs/heads/main/Electric_Vehicle_Population_Data.csv")
-    
-    df_clean = df.copy()
-    cols_to_drop = [
-        'Base MSRP', 'Electric Range', 'Legislative District', 
-        'VIN (1-10)', 'DOL Vehicle ID', '2020 Census Tract',
-        'Vehicle Location'
-    ]
-    
-    df_clean = df_clean.drop(columns=[col for col in cols_to_drop if col in df_clean.columns], errors='ignore')
-    
-    df_clean = df_clean.dropna()
-    
-    if 'Postal Code' in df_clean.columns:
-        df_clean['Postal Code'] = df_clean['Postal Code'].astype(float).astype(int).astype(str)
-    
-    return df_clean
-
-def apply_dark_theme(fig):
-    """Helper function untuk menerapkan tema dark konsisten ke semua plot"""
-    fig.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(family="sans-serif", color="white"),
-        margin=dict(l=20, r=20, t=40, b=20),
-        hovermode="x unified"
-    )
-    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='#30363D')
-    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='#30363D')
-    return fig
+@st.cache_resource
+def load_dataset():
+    # Snapshot, cube, indeks, dan cache hasil dibangun sekali per proses dan
+    # dibagi (read-only) ke semua sesi; perubahan sumber diterapkan inkremental.
+    # Jika server dijalankan lewat lumina.serve, pemanasan sudah berjalan sejak boot.
+    return warmup.dataset()
+
+@st.cache_resource(max_entries=1)
+def load_history(version):
+    # Rilis bertanggal dibuka lewat memory-map; yang tinggal di memori hanya cuboid per rilis.
+    # ``version`` berubah saat rilis ditambahkan sehingga riwayat dibuka ulang.
+    return History.open(config.HISTORY_DIR)
+
+def show_chart(kind, data, estimate=None, **chart_args):
+    """Helper untuk membangun grafik dari kerangka bertemanya lalu menampilkannya.
+
+    ``estimate`` (hasil mode perkiraan) menambahkan keterangan margin galat.
+    """
+    with instrument.span(f"chart.{kind}.build"):
+        fig = figures.build(kind, data)
+    # Termasuk serialisasi figure ke JSON dan pengiriman ke browser
+    with instrument.span(f"chart.{kind}.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True, **chart_args)
+    if config.SHOW_CACHE_STATS:
+        figures.measure_payload(kind, fig)
+    field = report.CHART_SOURCES.get(kind)
+    if estimate is not None and field in ESTIMATED_FIELDS:
+        margin = estimate.margin(field)
+        if margin is None:
+            st.caption("≈ Nilai perkiraan dari sampel berstrata; nilai pasti sedang dihitung.")
+        else:
+            st.caption(f"≈ Nilai perkiraan dari sampel berstrata (margin galat 95% hingga ±{margin:,.0f} kendaraan per kategori).")
 
 def display_insight(text):
     """Helper untuk menampilkan kotak insight"""
@@ -186,9 +188,16 @@ def display_insight(text):
 # 3. MAIN APP LOGIC
 # -----------------------------------------------------------------------------
 
+run_started = time.perf_counter()
+
 # Load data
 with st.spinner('Memuat data...'):
-    df_clean = load_data()
+    dataset = load_dataset()
+dataset.refresh_if_due()
+
+# State dataset dikunci untuk satu run, walau refresh di background menukarnya
+data = dataset.state
+df_clean = data.frame
 
 # Sidebar
 with st.sidebar:
@@ -201,20 +210,23 @@ with st.sidebar:
         "Rentang Tahun Model",
         min_value=min_year,
         max_value=max_year,
-        value=(2015, max_year)
+        value=(DEFAULT_YEAR_START, max_year)
     )
     
     ev_types = st.multiselect(
         "Tipe Kendaraan",
-        options=df_clean['Electric Vehicle Type'].unique(),
-        default=df_clean['Electric Vehicle Type'].unique()
+        options=list(df_clean['Electric Vehicle Type'].cat.categories),
+        default=list(df_clean['Electric Vehicle Type'].cat.categories)
     )
     
     counties = st.multiselect(
         "Pilih County (Opsional)",
-        options=sorted(df_clean['County'].unique()),
+        options=sorted(df_clean['County'].cat.categories),
         default=None
     )
+
+    # Diisi tombol ekspor setelah filter di-resolve
+    export_container = st.container()
     
     st.markdown("---")
     
@@ -231,151 +243,129 @@ with st.sidebar:
     - Ridhaka Gina Amalia
     """)
 
-# Filter Logic
-df_filtered = df_clean[
-    (df_clean['Model Year'] >= year_range[0]) & 
-    (df_clean['Model Year'] <= year_range[1]) &
-    (df_clean['Electric Vehicle Type'].isin(ev_types))
-]
+# Filter Logic (AND/OR bitset per nilai, cek data kosong lewat popcount;
+# angka halaman untuk state hasil resolve diambil dari irisan cube).
+# Hasilnya di-cache per state filter ter-normalisasi untuk semua sesi.
+filter_state = FilterState.from_widgets(year_range, ev_types, counties)
+# Mode perkiraan: state yang belum ada di cache hasil ditampilkan dulu dari
+# sampel berstrata, angka pastinya dihitung di background lalu halaman dirender ulang
+# (tidak berlaku jika sampel sudah mencakup seluruh baris)
+estimate = None
+if config.APPROXIMATE and len(data.sample) < len(df_clean) and not dataset.has_page(data, filter_state):
+    resolved, estimate = data.compute_estimate(filter_state)
+    agg = estimate.agg
+    dataset.refine_in_background(data, filter_state)
+else:
+    with instrument.span("page"):
+        resolved, agg = dataset.page(data, filter_state)
+
+# Ekspor dikirim bertahap oleh route /api/export dari server.py (di-encode per
+# potongan langsung ke respons). Tombol unduh biasa tidak dipakai karena Streamlit
+# selalu membaca seluruh isi file ke media store, berapa pun ukurannya.
+with export_container:
+    st.markdown("### 📥 Ekspor Data Terfilter")
+    if downloads.enabled():
+        for column, (fmt, (label, _)) in zip(st.columns(len(FORMATS)), FORMATS.items()):
+            column.link_button(label, downloads.url(filter_state, fmt))
+    else:
+        st.caption("Ekspor hanya tersedia jika dashboard dijalankan lewat `python -m lumina.serve`.")
+    st.caption(f"{agg.total:,} kendaraan sesuai filter saat ini.")
+
+if config.SHOW_CACHE_STATS:
+    with st.sidebar.expander("⚙️ Statistik Cache"):
+        st.json(dataset.result_cache.stats())
+        st.json({'record_cache': dataset.record_cache.stats()})
+        if dataset.last_refresh:
+            st.json(dataset.last_refresh)
 
-if counties and not df_filtered[df_filtered['County'].isin(counties)].empty:
-    df_filtered = df_filtered[df_filtered['County'].isin(counties)]
-elif counties and df_filtered[df_filtered['County'].isin(counties)].empty:
+if resolved.county_dropped:
     st.warning("Kombinasi filter saat ini (termasuk County) menghasilkan data kosong. Menampilkan data hanya berdasarkan filter Tahun dan Tipe EV.")
 
-if df_filtered.empty:
+if resolved.all_empty:
     st.error("Semua filter menghasilkan data kosong. Silakan sesuaikan filter Anda.")
-    df_filtered = df_clean
 
 # Judul Utama
 st.markdown('<div class="main-header">⚡ Dashboard Analisis Kendaraan Listrik Tahun 2000-2025</div>', unsafe_allow_html=True)
 st.markdown('<div class="sub-text">Analisis Tren Adopsi EV di Negara Bagian Washington, USA</div>', unsafe_allow_html=True)
 
 # Metrics
-m1, m2, m3, m4 = st.columns(4)
-
-total_ev_filtered = len(df_filtered)
-total_ev_clean = len(df_clean)
-bev_count_filtered = len(df_filtered[df_filtered['Electric Vehicle Type'] == 'Battery Electric Vehicle (BEV)'])
-phev_count_filtered = len(df_filtered[df_filtered['Electric Vehicle Type'] == 'Plug-in Hybrid Electric Vehicle (PHEV)'])
+with instrument.span("metrics"):
+    for column, (label, value, delta) in zip(st.columns(4), report.metric_cards(agg)):
+        column.metric(label, value, delta=delta)
+
+if estimate is not None:
+    @st.fragment(run_every=config.REFINE_POLL_SECONDS)
+    def wait_for_exact():
+        """Render ulang halaman begitu angka pasti untuk filter saat ini selesai dihitung"""
+        if dataset.has_page(data, filter_state):
+            st.rerun()
+        st.caption(
+            f"⏳ Menampilkan perkiraan dari {estimate.sample_rows:,} baris sampel; angka pasti sedang dihitung. "
+            "Total, BEV/PHEV, County, dan tren tahunan sudah pasti; jumlah merek/model adalah batas bawah."
+        )
 
-m1.metric("Total Kendaraan", f"{total_ev_filtered:,}", delta=f"{(total_ev_filtered/total_ev_clean*100):.1f}% dari total" if total_ev_clean > 0 else "N/A")
-m2.metric("Total BEV", f"{bev_count_filtered:,}", delta=f"{(bev_count_filtered/total_ev_filtered*100):.1f}%" if total_ev_filtered > 0 else "0.0%")
-m3.metric("Total PHEV", f"{phev_count_filtered:,}", delta=f"{(phev_count_filtered/total_ev_filtered*100):.1f}%" if total_ev_filtered > 0 else "0.0%")
-m4.metric("Merek", f"{df_filtered['Make'].nunique()}", delta=f"{df_filtered['Model'].nunique()} model")
+    wait_for_exact()
 
 st.markdown("---")
 
-# Tabs
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "🗺️ Geografis", "📈 Tren", "🚗 Merek", "⚡ Tipe EV", "📊 Lanjutan"
-])
-
 # --- TAB 1: GEOGRAFIS ---
-with tab1:
+def zoom_map():
+    """Viewport peta baru dari sel yang dipilih pengguna (kotak/lasso)"""
+    points = st.session_state["vehicle_map"].selection.points
+    lon = [point["lon"] for point in points if "lon" in point]
+    lat = [point["lat"] for point in points if "lat" in point]
+    if lon:
+        st.session_state["map_bounds"] = viewport(lon, lat, st.session_state.get("map_level", MIN_LEVEL))
+
+def reset_map():
+    st.session_state["map_bounds"] = None
+
+@st.fragment
+@instrument.timed("tab.Geografis")
+def render_geografis(agg):
+    """Tab Geografis: Top 10 County dan City serta peta sebaran"""
     st.markdown('<div class="section-header">Distribusi Geografis</div>', unsafe_allow_html=True)
     
     col_map1, col_map2 = st.columns(2)
     
     with col_map1:
-        top_counties = df_filtered['County'].value_counts().nlargest(10)
-        fig_county = go.Figure()
-        fig_county.add_trace(go.Bar(
-            x=top_counties.index,
-            y=top_counties.values,
-            marker=dict(
-                color=top_counties.values,
-                colorscale='Blues',
-                showscale=False,
-                colorbar=dict(
-                    title=dict(text="Jumlah", font=dict(color="white")),
-                    tickfont=dict(color="white")
-                )
-            ),
-            text=top_counties.values,
-            textposition='outside',
-            hovertemplate='<b>%{x}</b><br>Jumlah: %{y:,.0f}<extra></extra>'
-        ))
-        fig_county.update_layout(
-            title="Top 10 County",
-            xaxis_title="County",
-            yaxis_title="Jumlah Kendaraan",
-            height=450
-        )
-        st.plotly_chart(apply_dark_theme(fig_county), use_container_width=True)
+        top_counties = agg.top_counties
+        show_chart('county_bar', top_counties, estimate=estimate)
         
     with col_map2:
-        top_cities = df_filtered['City'].value_counts().nlargest(10)
-        fig_city = go.Figure()
-        fig_city.add_trace(go.Bar(
-            x=top_cities.index,
-            y=top_cities.values,
-            marker=dict(
-                color=top_cities.values,
-                colorscale='Blues',
-                showscale=False,
-                colorbar=dict(
-                    title=dict(text="Jumlah", font=dict(color="white")),
-                    tickfont=dict(color="white")
-                )
-            ),
-            text=top_cities.values,
-            textposition='outside',
-            hovertemplate='<b>%{x}</b><br>Jumlah: %{y:,.0f}<extra></extra>'
-        ))
-        fig_city.update_layout(
-            title="Top 10 City",
-            xaxis_title="City",
-            yaxis_title="Jumlah Kendaraan",
-            height=450
-        )
-        st.plotly_chart(apply_dark_theme(fig_city), use_container_width=True)
+        show_chart('city_bar', agg.top_cities, estimate=estimate)
 
     if not top_counties.empty:
         display_insight(f"King County mendominasi dengan {top_counties.values[0]:,} kendaraan, jauh melampaui county lainnya. Ini menunjukkan konsentrasi adopsi EV di area metropolitan Seattle.")
     else:
         display_insight("Tidak ada data County yang tersedia berdasarkan filter saat ini.")
 
+    # --- Peta sebaran: sel grid agregat dari piramida tile, bukan titik per kendaraan ---
+    # Viewport per sesi; memilih area di peta meminta level tile yang lebih halus untuk area itu
+    st.markdown("### Peta Sebaran Kendaraan")
+    bounds = st.session_state.get("map_bounds")
+    map_cells = dataset.map_cells(data, filter_state, bounds)
+    st.session_state["map_level"] = map_cells.level
+    show_chart('map', map_cells, key="vehicle_map", on_select=zoom_map, selection_mode=("box", "lasso"))
+    st.caption(f"{len(map_cells.cells):,} sel grid (level {map_cells.level}) mewakili {map_cells.total:,} kendaraan dengan lokasi tercatat. Seret untuk memilih area dan memperbesar ke detail yang lebih halus.")
+    if bounds is not None:
+        st.button("Tampilkan Seluruh Peta", on_click=reset_map)
+
+# Jumlah kategori dengan perubahan terbesar per grafik perbandingan rilis
+TOP_GROWTH = 15
+
 # --- TAB 2: TREN ---
-with tab2:
+@st.fragment
+@instrument.timed("tab.Tren")
+def render_tren(agg):
+    """Tab Tren: pertumbuhan adopsi EV per tahun model"""
     st.markdown('<div class="section-header">Tren Pertumbuhan</div>', unsafe_allow_html=True)
     
-    trend_data = df_filtered.groupby('Model Year').size().reset_index(name='Count')
-    
-    fig_trend = go.Figure()
-    fig_trend.add_trace(go.Scatter(
-        x=trend_data['Model Year'],
-        y=trend_data['Count'],
-        mode='lines+markers',
-        name='Jumlah',
-        line=dict(color=PRIMARY_COLOR, width=3),
-        marker=dict(size=8, color='white', line=dict(width=1, color=PRIMARY_COLOR)),
-        fill='tozeroy',
-        fillcolor='rgba(0, 212, 255, 0.1)'
-    ))
+    trend_data = agg.trend.reset_index()
+    show_chart('trend', agg.trend, estimate=estimate)
     
     if not trend_data.empty:
         peak_row = trend_data.loc[trend_data['Count'].idxmax()]
-        fig_trend.add_annotation(
-            x=peak_row['Model Year'],
-            y=peak_row['Count'],
-            text=f"Puncak: {peak_row['Count']:,}",
-            showarrow=True,
-            arrowhead=2,
-            arrowcolor="white",
-            bgcolor="#0F2838",
-            font=dict(color=PRIMARY_COLOR)
-        )
-
-    fig_trend.update_layout(
-        title="Pertumbuhan Adopsi EV per Tahun Model",
-        xaxis_title="Tahun Model",
-        yaxis_title="Jumlah Kendaraan",
-        height=500
-    )
-    st.plotly_chart(apply_dark_theme(fig_trend), use_container_width=True)
-    
-    if not trend_data.empty:
         base_insight = f"Adopsi EV mengalami lonjakan signifikan mulai tahun 2018, mencapai puncaknya pada tahun {int(peak_row['Model Year'])}."
         
         # Cek apakah ada data di atas tahun saat ini (misal 2025)
@@ -387,60 +377,55 @@ with tab2:
     else:
         display_insight("Tidak ada data tren yang tersedia berdasarkan filter saat ini.")
 
+    # --- Perbandingan antar rilis DOL: dari cuboid per snapshot bertanggal ---
+    st.markdown("### Perbandingan Antar Rilis Data")
+    history = load_history(history_version(config.HISTORY_DIR))
+    releases = history.releases
+    if len(releases) < 2:
+        st.info("Perbandingan antar rilis membutuhkan minimal dua snapshot bertanggal. Tambahkan rilis dengan `python -m lumina.history add <label> <csv>`.")
+        return
+
+    col_release1, col_release2 = st.columns(2)
+    with col_release1:
+        before = st.selectbox("Rilis Awal", releases, index=len(releases) - 2, key="release_before")
+    with col_release2:
+        after = st.selectbox("Rilis Akhir", releases, index=len(releases) - 1, key="release_after")
+
+    with instrument.span("history.compare"):
+        comparison = history.compare(before, after, resolved.state)
+    total_before, total_after = comparison.totals
+    change = total_after - total_before
+    st.metric(
+        f"Kendaraan Terfilter ({after})",
+        f"{total_after:,}",
+        delta=f"{change:+,} sejak {before}" + (f" ({change / total_before:+.1%})" if total_before else "")
+    )
+
+    titles = {'County': "County", 'Make': "Merek", 'Electric Vehicle Type': "Tipe EV"}
+    for column, dim in zip(st.columns(len(COMPARE_DIMS)), COMPARE_DIMS):
+        with column:
+            show_chart('growth_bar', (f"Perubahan per {titles[dim]}", comparison.growth[dim].head(TOP_GROWTH)))
+
 # --- TAB 3: MEREK ---
-with tab3:
+@st.fragment
+@instrument.timed("tab.Merek")
+def render_merek(agg):
+    """Tab Merek: pangsa merek, model terpopuler, dan foto model"""
     st.markdown('<div class="section-header">Analisis Merek (Make) dan Model</div>', unsafe_allow_html=True)
-    
-    # ----------------------------------------------------------------------
-    # DEFINISI MAPPING URL FOTO 
-    # ----------------------------------------------------------------------
-    MODEL_IMAGE_MAP = {
-        "MODEL Y": "https://digitalassets.tesla.com/tesla-contents/image/upload/f_auto,q_auto/Homepage-Card-Model-Y-Desktop-US-v2.jpg", 
-        "MODEL 3": "https://digitalassets.tesla.com/tesla-contents/image/upload/f_auto,q_auto/Homepage-Card-Model-3-Desktop-US-v2.jpg",
-        "LEAF": "https://dealernissandijakarta.com/wp-content/uploads/2021/08/nissan-leaf-1.jpg",
-        "MODEL S": "https://digitalassets.tesla.com/tesla-contents/image/upload/f_auto,q_auto/Homepage-Card-Model-S-Desktop-US-v3.jpg",
-        "BOLT EV": "https://media.architecturaldigest.com/photos/58910b7233bd1de9129eab2c/master/pass/Chevrolet%20Bolt%20EV%201.jpg",
-    }
 
     # --- Baris 1: Top 15 Merek (Treemap - Full Width) ---
     st.markdown("### Distribusi Merek Kendaraan")
-    top_makes = df_filtered['Make'].value_counts().nlargest(15)
-    
-    fig_make = go.Figure(go.Treemap(
-        labels=top_makes.index,
-        parents=[""] * len(top_makes), # Set parents to empty string list for top level
-        values=top_makes.values,
-        marker=dict(colorscale='Blues'),
-        textposition='middle center',
-        texttemplate='<b>%{label}</b><br>%{value:,.0f}',
-        hovertemplate='<b>%{label}</b><br>Jumlah: %{value:,.0f}<br>Pangsa: %{percentParent:.1%}<extra></extra>'
-    ))
-    
-    fig_make.update_layout(
-        title="Top 15 Merek Kendaraan (Pangsa Pasar)",
-        height=500
-    )
-    # Terapkan tema gelap dan tampilkan
-    st.plotly_chart(apply_dark_theme(fig_make), use_container_width=True)
+    top_makes = agg.top_makes
+    show_chart('make_treemap', top_makes, estimate=estimate)
 
     st.markdown("---")
 
-    # --- Baris 2: Top 15 Model (Sunburst Chart - Full Width) ---
-    st.markdown("### Model Paling Populer")
-    top_models = df_filtered['Model'].value_counts().nlargest(15)
-    fig_model = go.Figure(go.Sunburst(
-        labels=top_models.index,
-        parents=[""] * len(top_models),
-        values=top_models.values,
-        marker=dict(colorscale='Blues'),
-        hovertemplate='<b>%{label}</b><br>Jumlah: %{value:,.0f}<extra></extra>'
-    ))
-    fig_model.update_layout(
-        title="Top 15 Model Kendaraan",
-        height=500,
-        margin=dict(t=50, b=20, l=20, r=20)
-    )
-    st.plotly_chart(apply_dark_theme(fig_model), use_container_width=True)
+    # --- Baris 2: Drill-down Merek -> Model -> Tahun (Sunburst - Full Width) ---
+    # Pohon dipangkas (top-k anak per level + "Lainnya") dan ikut di-cache bersama angka halaman
+    st.markdown("### Model Paling Populer per Merek")
+    top_models = agg.top_models
+    show_chart('model_sunburst', agg.model_tree, estimate=estimate)
+    st.caption("Klik merek untuk melihat model dan tahun modelnya; klik pusat lingkaran untuk kembali.")
     
     # --- Insight & Foto Template ---
     if not top_makes.empty and not top_models.empty:
@@ -452,22 +437,22 @@ with tab3:
 
     st.markdown("### 📷 Top 5 Model Kendaraan Terpopuler Sepanjang Masa")
     
-    # Mengatur layout foto dalam satu baris horizontal kecil
-    top_5_model_names= df_clean['Model'].value_counts().nlargest(5).index.tolist()[:5]
+    # Mengatur layout foto dalam satu baris horizontal kecil.
+    # Top 5 dihitung sekali per versi dataset; foto berupa thumbnail lokal yang
+    # dikirim lewat media endpoint Streamlit. Thumbnail yang belum siap diambil
+    # di background dan sementara diganti placeholder (browser tidak pernah
+    # memuat gambar dari server luar).
+    top_5_model_names = data.top_models
+    thumbnails.prefetch(top_5_model_names)
     cols_photo = st.columns(5)
     
     for i, model_name in enumerate(top_5_model_names):
-        # Ambil URL dari mapping
-        image_url = MODEL_IMAGE_MAP.get(model_name, "")
+        thumbnail = thumbnails.cached(model_name)
         
         with cols_photo[i]:
-            if image_url:
-                st.markdown(f"""
-                <div class="car-photo-container">
-                    <img src="{image_url}" class="model-image" alt="Foto {model_name}" />
-                    <div class="model-name">#{i+1}: {model_name}</div>
-                </div>
-                """, unsafe_allow_html=True)
+            if thumbnail:
+                st.image(thumbnail, width="stretch", alt=f"Foto {model_name}")
+                st.markdown(f'<div class="model-name">#{i+1}: {model_name}</div>', unsafe_allow_html=True)
             else:
                 st.markdown(f"""
                 <div class="car-photo-container">
@@ -475,103 +460,44 @@ with tab3:
                     <div class="model-name">#{i+1}: {model_name}</div>
                 </div>
                 """, unsafe_allow_html=True)
-            
+
 # --- TAB 4: TIPE EV ---
-with tab4:
+@st.fragment
+@instrument.timed("tab.Tipe EV")
+def render_tipe_ev(agg):
+    """Tab Tipe EV: perbandingan BEV vs PHEV"""
     st.markdown('<div class="section-header">Perbandingan BEV vs PHEV</div>', unsafe_allow_html=True)
     
     col_type1, col_type2 = st.columns(2)
     
     with col_type1:
-        type_counts = df_filtered['Electric Vehicle Type'].value_counts()
-        fig_type_bar = go.Figure(go.Bar(
-            x=type_counts.index.str.replace('Battery Electric Vehicle (BEV)', 'BEV').str.replace('Plug-in Hybrid Electric Vehicle (PHEV)', 'PHEV'),
-            y=type_counts.values,
-            marker=dict(color=[PRIMARY_COLOR, SECONDARY_COLOR]),
-            text=type_counts.values,
-            textposition='auto'
-        ))
-        fig_type_bar.update_layout(
-            title="Jumlah Kendaraan per Tipe",
-            height=400
-        )
-        st.plotly_chart(apply_dark_theme(fig_type_bar), use_container_width=True)
+        show_chart('type_bar', agg.type_counts, estimate=estimate)
         
     with col_type2:
         
-        # 1. Ambil 5 county teratas dan simpan urutannya (index-nya)
-        top_5_counts_series = df_filtered['County'].value_counts().nlargest(5)
-        top_5_counties_ordered = top_5_counts_series.index.tolist() # List urutan: ['King', 'Snohomish', ...]
-        
-        # 2. Filter data hanya untuk 5 county ini
-        df_top5 = df_filtered[df_filtered['County'].isin(top_5_counties_ordered)]
-        
-        # 3. Buat pivot/crosstab
-        type_county = df_top5.groupby(['County', 'Electric Vehicle Type']).size().unstack().fillna(0)
-        
-        # 4. PENTING: Reindex DataFrame pivot agar barisnya mengikuti urutan 'top_5_counties_ordered'
-        type_county = type_county.reindex(top_5_counties_ordered)
-        
-        fig_stack = go.Figure()
-        fig_stack.add_trace(go.Bar(
-            name='BEV',
-            x=type_county.index, # Index sekarang sudah terurut
-            y=type_county.get('Battery Electric Vehicle (BEV)', 0),
-            marker_color=PRIMARY_COLOR
-        ))
-        fig_stack.add_trace(go.Bar(
-            name='PHEV',
-            x=type_county.index, # Index sekarang sudah terurut
-            y=type_county.get('Plug-in Hybrid Electric Vehicle (PHEV)', 0),
-            marker_color=SECONDARY_COLOR
-        ))
-        
-        fig_stack.update_layout(
-            barmode='stack',
-            title="Proporsi Tipe EV di 5 County Teratas",
-            height=400,
-            legend=dict(orientation="v", y=1.1)
-        )
-        st.plotly_chart(apply_dark_theme(fig_stack), use_container_width=True)
+        # Crosstab 5 county teratas x Tipe EV, baris sudah terurut dari cube
+        show_chart('type_stack', agg.type_by_county, estimate=estimate)
 
-    if total_ev_filtered > 0:
-        bev_pct = (bev_count_filtered / total_ev_filtered * 100)
+    if agg.total > 0:
+        bev_pct = (agg.type_count(BEV) / agg.total * 100)
         display_insight(f"Kendaraan Listrik Baterai Murni (BEV) jauh lebih populer dibandingkan Plug-in Hybrid (PHEV), mencakup {bev_pct:.1f}% dari total populasi EV yang difilter.")
     else:
         display_insight("Tidak ada data Tipe Kendaraan yang tersedia berdasarkan filter saat ini.")
 
 # --- TAB 5: LANJUTAN ---
-with tab5:
+@st.fragment
+@instrument.timed("tab.Lanjutan")
+def render_lanjutan(agg):
+    """Tab Lanjutan: penyedia listrik dan heatmap merek per tahun"""
     st.markdown('<div class="section-header">Analisis Lanjutan</div>', unsafe_allow_html=True)
     
     # --- Baris 1: Top 10 Electric Utility (Bar Chart) ---
     st.markdown("### Distribusi Berdasarkan Penyedia Listrik")
-    top_utility = df_filtered['Electric Utility'].value_counts().nlargest(10)
-    fig_utility = go.Figure(go.Bar(
-        y=top_utility.index,
-        x=top_utility.values,
-        orientation='h',
-        marker=dict(
-            color=top_utility.values,
-            colorscale='Blues',
-            showscale=False
-        ),
-        text=top_utility.values,
-        textposition='outside',
-        hovertemplate='<b>%{y}</b><br>Jumlah Kendaraan: %{x:,.0f}<extra></extra>'
-    ))
-    
-    fig_utility.update_layout(
-        title="Top 10 Penyedia Listrik (Electric Utility)",
-        xaxis_title="Jumlah Kendaraan",
-        yaxis_title="Penyedia Listrik",
-        height=500,
-        yaxis=dict(autorange="reversed")
-    )
-    st.plotly_chart(apply_dark_theme(fig_utility), use_container_width=True)
+    top_utility = agg.top_utilities
+    show_chart('utility_bar', top_utility, estimate=estimate)
 
     if not top_utility.empty:
-        top_utility_count = df_filtered['Electric Utility'].value_counts().nlargest(1).iloc[0]
+        top_utility_count = top_utility.iloc[0]
         display_insight(f"Penyedia listrik {top_utility.index[0]} melayani {top_utility_count:,} kendaraan listrik terbanyak, yang sebagian besar kemungkinan besar merupakan wilayah metropolitan King County.")
     else:
         display_insight("Tidak ada data Utility atau Heatmap yang tersedia berdasarkan filter saat ini.")
@@ -580,33 +506,130 @@ with tab5:
 
     # --- Baris 2: Heatmap Tahun vs Merek ---
     st.markdown("### Heatmap: Intensitas Model per Tahun vs Merek")
-    top_makes_heat = df_filtered['Make'].value_counts().nlargest(10).index
-    df_heat = df_filtered[df_filtered['Make'].isin(top_makes_heat)]
-    heatmap_data = df_heat.groupby(['Make', 'Model Year']).size().reset_index(name='Count')
-    
-    heatmap_matrix = heatmap_data.pivot(index='Make', columns='Model Year', values='Count').fillna(0)
-    
-    fig_heat = go.Figure(data=go.Heatmap(
-        z=heatmap_matrix.values,
-        x=heatmap_matrix.columns,
-        y=heatmap_matrix.index,
-        colorscale='Blues',
-        colorbar=dict(
-            title=dict(text="Jumlah", font=dict(color="white")),
-            tickfont=dict(color="white")
-        )
-    ))
-    
-    fig_heat.update_layout(
-        title="Heatmap: Intensitas Model per Tahun vs Merek",
-        xaxis_title="Tahun Model",
-        yaxis_title="Merek",
-        height=500
-    )
-    st.plotly_chart(apply_dark_theme(fig_heat), use_container_width=True)
+    show_chart('heatmap', agg.heatmap, estimate=estimate)
 
     display_insight("Heatmap memperlihatkan bagaimana merek tertentu (seperti Tesla) mulai mendominasi di tahun-tahun belakangan, sementara merek lain memiliki pola pertumbuhan yang berbeda.")
 
+# --- TAB 6: JANGKAUAN & HARGA ---
+@st.fragment
+@instrument.timed("tab.Jangkauan & Harga")
+def render_jangkauan(agg):
+    """Tab Jangkauan & Harga: distribusi Electric Range dan Base MSRP"""
+    st.markdown('<div class="section-header">Jangkauan Listrik dan Harga</div>', unsafe_allow_html=True)
+
+    measure = st.radio(
+        "Ukuran",
+        MEASURES,
+        format_func=lambda m: figures.MEASURE_LABELS[m][0],
+        horizontal=True,
+        key="measure"
+    )
+    label, unit = figures.MEASURE_LABELS[measure]
+    # Histogram dan persentil dari histogram ber-bin per sel cube, bukan dari baris
+    summary = dataset.measure_summary(data, filter_state, measure)
+
+    if summary.n == 0:
+        display_insight(f"Tidak ada kendaraan dengan nilai {label} tercatat berdasarkan filter saat ini.")
+        return
+
+    for column, (name, value) in zip(st.columns(4), [("Kendaraan Tercatat", summary.n)] + list(zip(("p10", "p50 (Median)", "p90"), summary.percentiles))):
+        column.metric(name, f"{value:,.0f}" if name == "Kendaraan Tercatat" else f"{value:,.0f} {unit}")
+
+    show_chart('measure_hist', summary)
+
+    col_measure1, col_measure2 = st.columns(2)
+
+    with col_measure1:
+        show_chart('measure_by_make', summary)
+
+    with col_measure2:
+        show_chart('measure_by_year', summary)
+
+    display_insight(f"Hanya {summary.n:,} dari {agg.total:,} kendaraan terfilter yang memiliki nilai {label}; nilai 0 pada data DOL berarti belum diriset sehingga tidak dihitung. Persentil dihitung dari histogram ber-bin, sehingga akurat hingga lebar satu bin.")
+
+# --- TAB 7: DATA KENDARAAN ---
+def reset_records_page():
+    st.session_state["records_page"] = 1
+
+@st.fragment
+@instrument.timed("tab.Data Kendaraan")
+def render_data_kendaraan(agg):
+    """Tab Data Kendaraan: penjelajah baris dengan pencarian, urutan, dan halaman di server"""
+    st.markdown('<div class="section-header">Penjelajah Data Kendaraan</div>', unsafe_allow_html=True)
+
+    col_search, col_sort, col_order = st.columns([3, 2, 1])
+
+    with col_search:
+        search = st.text_input(
+            "Cari (Make, Model, City, Postal Code)",
+            key="records_search",
+            on_change=reset_records_page
+        )
+
+    with col_sort:
+        sort = st.selectbox(
+            "Urutkan berdasarkan",
+            SORT_COLUMNS,
+            index=SORT_COLUMNS.index(DEFAULT_SORT),
+            key="records_sort",
+            on_change=reset_records_page
+        )
+
+    with col_order:
+        descending = st.toggle("Menurun", value=True, key="records_desc", on_change=reset_records_page)
+
+    # Seleksi di-cache ringkas (bitset + hitungan per blok); browser menerima satu halaman saja
+    selection = dataset.records(data, RecordQuery.from_widgets(filter_state, search, sort, descending))
+
+    if selection.total == 0:
+        display_insight("Tidak ada kendaraan yang cocok dengan pencarian dan filter saat ini.")
+        return
+
+    page_size = config.RECORDS_PAGE_ROWS
+    n_pages = (selection.total + page_size - 1) // page_size
+    if st.session_state.get("records_page", 1) > n_pages:
+        # Filter sidebar berubah sehingga halaman yang tersimpan sudah tidak ada
+        st.session_state["records_page"] = n_pages
+    page = int(st.number_input("Halaman", min_value=1, max_value=n_pages, step=1, key="records_page"))
+
+    with instrument.span("records.page"):
+        page_rows = data.records.page(selection, page - 1, page_size)
+        st.dataframe(page_rows, hide_index=True, use_container_width=True)
+
+    start = (page - 1) * page_size
+    st.caption(f"Menampilkan baris {start + 1:,}–{start + len(page_rows):,} dari {selection.total:,} kendaraan (halaman {page:,} dari {n_pages:,}).")
+
+# Tabs (lazy: hanya tab yang sedang dibuka yang dihitung dan dikirim ke browser)
+tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
+    "🗺️ Geografis", "📈 Tren", "🚗 Merek", "⚡ Tipe EV", "📊 Lanjutan", "💰 Jangkauan & Harga",
+    "🔎 Data Kendaraan"
+], key="active_tab", on_change="rerun")
+
+for tab, render in (
+    (tab1, render_geografis),
+    (tab2, render_tren),
+    (tab3, render_merek),
+    (tab4, render_tipe_ev),
+    (tab5, render_lanjutan),
+    (tab6, render_jangkauan),
+    (tab7, render_data_kendaraan),
+):
+    if tab.open:
+        with tab:
+            render(agg)
+
+if config.SHOW_CACHE_STATS:
+    with st.sidebar.expander("📦 Payload Grafik"):
+        st.json(figures.chart_stats())
+
+instrument.observe("run", time.perf_counter() - run_started)
+
+if config.DEBUG_PANEL:
+    with st.sidebar.expander("⏱️ Instrumentasi"):
+        metrics = instrument.snapshot()
+        st.dataframe(pd.DataFrame.from_dict(metrics['spans'], orient='index').round(3))
+        st.json(metrics['collectors'])
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,5 @@
+"""Lapisan data Lumina EV Dashboard.
+
+Modul-modul di paket ini tidak bergantung pada Streamlit sehingga bisa dipakai
+ulang dari skrip maupun dari ``app.py``.
+"""
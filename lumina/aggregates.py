@@ -0,0 +1,183 @@
+"""Hasil agregasi yang dibutuhkan satu halaman dashboard.
+
+Semua sumber agregasi (cube, engine baris, dst.) menghasilkan vektor hitungan
+padat per dimensi (kecuali sel Make x Model x Model Year yang jarang);
+``summarize`` mengubahnya menjadi ``DashboardAggregates`` yang langsung
+dipakai kartu metrik dan grafik di setiap tab.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+BEV = 'Battery Electric Vehicle (BEV)'
+PHEV = 'Plug-in Hybrid Electric Vehicle (PHEV)'
+
+# Jumlah kategori teratas yang ditampilkan tiap grafik
+TOP_N = {
+    'County': 10,
+    'City': 10,
+    'Make': 15,
+    'Model': 15,
+    'Electric Utility': 10,
+}
+TOP_COUNTIES_BY_TYPE = 5
+TOP_MAKES_HEATMAP = 10
+
+COUNTY_TYPE = ('County', 'Electric Vehicle Type')
+MAKE_YEAR = ('Make', 'Model Year')
+MAKE_MODEL_YEAR = ('Make', 'Model', 'Model Year')
+
+# Jumlah anak teratas per level pohon drill-down Make -> Model -> Model Year;
+# sisanya digabung ke node OTHER_LABEL sehingga jumlah node paling banyak
+# (k1 + 1) + k1 (k2 + 1) + k1 k2 (k3 + 1), berapa pun jumlah kombinasinya
+TREE_TOP_K = (10, 5, 5)
+OTHER_LABEL = "Lainnya"
+
+
+@dataclass
+class DashboardAggregates:
+    total: int
+    total_all: int
+    type_counts: pd.Series
+    n_makes: int
+    n_models: int
+    top_counties: pd.Series
+    top_cities: pd.Series
+    top_makes: pd.Series
+    top_models: pd.Series
+    top_utilities: pd.Series
+    trend: pd.Series
+    type_by_county: pd.DataFrame
+    heatmap: pd.DataFrame
+    model_tree: pd.DataFrame  # node drill-down: id, label, parent, value
+
+
+    def type_count(self, label):
+        return int(self.type_counts.get(label, 0))
+
+
+def top_k(counts, labels, k=None):
+    """Kategori dengan hitungan terbesar (hanya yang > 0), urut menurun.
+
+    Kandidat dipilih dengan partisi O(n) terhadap nilai ke-k, lalu hanya k
+    kandidat itu yang diurutkan. Nilai seri diurutkan menurut kode kamus.
+    """
+    present = np.flatnonzero(counts)
+    if k is not None and k < len(present):
+        values = counts[present]
+        kth = np.partition(values, len(values) - k)[len(values) - k]
+        above = present[values > kth]
+        ties = present[values == kth][:k - len(above)]
+        present = np.sort(np.concatenate([above, ties]))
+    order = present[np.argsort(-counts[present], kind='stable')]
+    return pd.Series(counts[order], index=labels[order], name='count')
+
+
+def _sum_by(codes, values):
+    """Kode unik (terurut) beserta jumlah ``values`` per kode"""
+    unique, inverse = np.unique(codes, return_inverse=True)
+    return unique, np.bincount(inverse, weights=values, minlength=len(unique)).astype(np.int64)
+
+
+def _top_children(codes, values, k):
+    """``k`` kode dengan nilai terbesar (> 0, seri menurut kode) beserta nilainya dan sisa hitungan di luarnya"""
+    present = values > 0
+    codes, values = codes[present], values[present]
+    order = np.argsort(-values, kind='stable')[:k]
+    return codes[order], values[order], values.sum() - values[order].sum()
+
+
+def model_tree(cells, labels, top=TREE_TOP_K):
+    """Pohon Make -> Model -> Model Year yang dipangkas dari sel hitungan ``cells``.
+
+    ``cells`` berupa ``(keys, counts)``: array kode Make, Model, dan Model Year
+    per sel tidak kosong beserta hitungannya, sehingga biaya pohon mengikuti
+    jumlah sel, bukan perkalian ukuran kamus ketiga dimensi. Setiap level hanya
+    menyimpan ``top`` anak terbesar; sisanya menjadi satu node ``OTHER_LABEL``
+    tanpa anak. Nilai node induk = jumlah nilai anaknya.
+    """
+    # list biasa: akses per elemen Index (string Arrow) jauh lebih lambat
+    make_labels, model_labels, year_labels = (labels[dim].tolist() for dim in MAKE_MODEL_YEAR)
+    (make_keys, model_keys, year_keys), values = cells
+    rows = []
+
+    def add_other(prefix, parent, rest):
+        if rest > 0:
+            rows.append((prefix + OTHER_LABEL, OTHER_LABEL, parent, rest))
+
+    makes, make_totals, rest = _top_children(*_sum_by(make_keys, values), top[0])
+    for make, make_total in zip(makes, make_totals):
+        make_id = str(make_labels[make])
+        rows.append((make_id, make_id, "", make_total))
+        in_make = make_keys == make
+        models, model_totals, model_rest = _top_children(*_sum_by(model_keys[in_make], values[in_make]), top[1])
+        for model, model_total in zip(models, model_totals):
+            model_id = "%s/%s" % (make_id, model_labels[model])
+            rows.append((model_id, str(model_labels[model]), make_id, model_total))
+            in_model = in_make & (model_keys == model)
+            years, year_totals, year_rest = _top_children(*_sum_by(year_keys[in_model], values[in_model]), top[2])
+            for year, value in zip(years, year_totals):
+                rows.append(("%s/%s" % (model_id, year_labels[year]), str(year_labels[year]), model_id, value))
+            add_other(model_id + "/", model_id, year_rest)
+        add_other(make_id + "/", make_id, model_rest)
+    add_other("", "", rest)
+    ids, names, parents, values = zip(*rows) if rows else ((),) * 4
+    return pd.DataFrame({
+        'id': list(ids), 'label': list(names), 'parent': list(parents),
+        'value': np.array(values, dtype=np.int64),
+    })
+
+
+def _as_counts(values):
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        values = np.rint(values)
+    return values.astype(np.int64)
+
+
+def summarize(counts, labels, total_all):
+    """Susun ``DashboardAggregates`` dari vektor hitungan padat.
+
+    ``counts`` memetakan nama dimensi ke array 1D hitungan per kode,
+    ``COUNTY_TYPE`` dan ``MAKE_YEAR`` ke matriks 2D, serta ``MAKE_MODEL_YEAR``
+    ke sel tidak kosong ``(keys, counts)`` (lihat ``model_tree``). ``labels``
+    memetakan nama dimensi ke label (kamus) yang sejajar dengan kode.
+    """
+    keys, cell_counts = counts[MAKE_MODEL_YEAR]
+    counts = {dim: _as_counts(values) for dim, values in counts.items() if dim != MAKE_MODEL_YEAR}
+    type_labels = labels['Electric Vehicle Type']
+    year_labels = labels['Model Year']
+
+    top_5 = top_k(counts['County'], labels['County'], TOP_COUNTIES_BY_TYPE)
+    county_codes = labels['County'].get_indexer(top_5.index)
+    type_by_county = pd.DataFrame(
+        counts[COUNTY_TYPE][county_codes], index=top_5.index, columns=type_labels
+    )
+
+    top_makes_heat = top_k(counts['Make'], labels['Make'], TOP_MAKES_HEATMAP)
+    heat_makes = sorted(top_makes_heat.index)
+    heat = counts[MAKE_YEAR][labels['Make'].get_indexer(heat_makes)]
+    heat_years = np.flatnonzero(heat.sum(axis=0))
+    heatmap = pd.DataFrame(heat[:, heat_years], index=pd.Index(heat_makes, name='Make'),
+                           columns=pd.Index(year_labels[heat_years], name='Model Year'))
+
+    year_counts = counts['Model Year']
+    years_present = np.flatnonzero(year_counts)
+
+    return DashboardAggregates(
+        total=int(counts['Electric Vehicle Type'].sum()),
+        total_all=int(total_all),
+        type_counts=top_k(counts['Electric Vehicle Type'], type_labels),
+        n_makes=int(np.count_nonzero(counts['Make'])),
+        n_models=int(np.count_nonzero(counts['Model'])),
+        top_counties=top_k(counts['County'], labels['County'], TOP_N['County']),
+        top_cities=top_k(counts['City'], labels['City'], TOP_N['City']),
+        top_makes=top_k(counts['Make'], labels['Make'], TOP_N['Make']),
+        top_models=top_k(counts['Model'], labels['Model'], TOP_N['Model']),
+        top_utilities=top_k(counts['Electric Utility'], labels['Electric Utility'], TOP_N['Electric Utility']),
+        trend=pd.Series(year_counts[years_present], index=pd.Index(year_labels[years_present], name='Model Year'), name='Count'),
+        type_by_county=type_by_county,
+        heatmap=heatmap,
+        model_tree=model_tree((keys, _as_counts(cell_counts)), labels),
+    )
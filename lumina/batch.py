@@ -0,0 +1,171 @@
+"""Render laporan statis dashboard untuk banyak preset filter secara paralel.
+
+Contoh::
+
+    python -m lumina.batch --preset county-type --out reports --workers 8
+
+Proses utama memuat snapshot dan membangun cube sekali, lalu mengirim cube
+(hanya sel agregat, bukan baris) ke setiap worker di process pool. Worker
+menghitung angka halaman tiap preset dari cube dan menulis satu file laporan
+(HTML statis atau JSON) berisi kartu metrik dan semua grafik dashboard.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+
+import plotly.utils
+
+from lumina import config, figures
+from lumina.cube import AggregateCube
+from lumina.filters import DEFAULT_YEAR_START, FilterState
+from lumina.report import CHART_SOURCES, chart_data, cube_page, metric_cards
+from lumina.snapshot import load_vehicle_frame
+
+logger = logging.getLogger(__name__)
+
+PRESETS = ('default', 'county', 'type', 'county-type')
+
+_cube = None
+
+
+def preset_states(preset, frame, year_range):
+    """List ``(nama, FilterState)`` untuk preset ``preset``"""
+    counties = sorted(frame['County'].cat.categories)
+    types = list(frame['Electric Vehicle Type'].cat.categories)
+    if preset == 'default':
+        return [('default', FilterState.from_widgets(year_range, types, []))]
+    if preset == 'county':
+        return [(county, FilterState.from_widgets(year_range, types, [county])) for county in counties]
+    if preset == 'type':
+        return [(figures.SHORT_TYPE.get(t, t), FilterState.from_widgets(year_range, [t], [])) for t in types]
+    if preset == 'county-type':
+        return [
+            ("%s %s" % (county, figures.SHORT_TYPE.get(t, t)), FilterState.from_widgets(year_range, [t], [county]))
+            for county, t in itertools.product(counties, types)
+        ]
+    raise ValueError("Preset tidak dikenal: %s" % preset)
+
+
+def _slug(name):
+    return re.sub(r'[^A-Za-z0-9]+', '-', name).strip('-').lower() or 'preset'
+
+
+def _html_page(name, cards, figs, resolved):
+    notes = []
+    if resolved.county_dropped:
+        notes.append("Filter County menghasilkan data kosong; County diabaikan.")
+    if resolved.all_empty:
+        notes.append("Semua filter menghasilkan data kosong; menampilkan seluruh data.")
+    metrics = "".join(
+        '<div class="metric"><div class="label">%s</div><div class="value">%s</div><div class="delta">%s</div></div>'
+        % card for card in cards
+    )
+    charts = "".join(
+        fig.to_html(full_html=False, include_plotlyjs='cdn' if i == 0 else False)
+        for i, fig in enumerate(figs.values())
+    )
+    return """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Lumina EV - %s</title>
+<style>
+body { background-color: #0E1117; color: #FAFAFA; font-family: sans-serif; margin: 2rem; }
+.metrics { display: flex; gap: 1rem; margin-bottom: 1.5rem; }
+.metric { background-color: #161B22; border: 1px solid #30363D; padding: 15px; border-radius: 10px; flex: 1; }
+.label { color: #A0AAB5; } .value { color: #00D4FF; font-size: 1.8rem; } .delta { color: #A0AAB5; }
+.note { color: #FFDD00; }
+</style></head><body>
+<h1>%s</h1>%s<div class="metrics">%s</div>%s
+</body></html>
+""" % (name, name, "".join('<p class="note">%s</p>' % n for n in notes), metrics, charts)
+
+
+def _init_worker(cube):
+    global _cube
+    _cube = cube
+
+
+def render_preset(job):
+    """Hitung dan tulis laporan satu preset; kembalikan ringkasannya"""
+    name, state, out_dir, fmt = job
+    started = time.perf_counter()
+    resolved, agg = cube_page(_cube, state)
+    cards = metric_cards(agg)
+    figs = {kind: figures.build(kind, chart_data(agg, kind)) for kind in CHART_SOURCES}
+
+    path = os.path.join(out_dir, "%s.%s" % (_slug(name), fmt))
+    with open(path, 'w', encoding='utf-8') as f:
+        if fmt == 'html':
+            f.write(_html_page(name, cards, figs, resolved))
+        else:
+            json.dump({
+                'preset': name,
+                'filter': asdict(state),
+                'resolved': asdict(resolved),
+                'metrics': [dict(zip(('label', 'value', 'delta'), card)) for card in cards],
+                'figures': {kind: fig.to_plotly_json() for kind, fig in figs.items()},
+            }, f, cls=plotly.utils.PlotlyJSONEncoder)
+    return {
+        'preset': name,
+        'file': os.path.basename(path),
+        'total': agg.total,
+        'county_dropped': resolved.county_dropped,
+        'all_empty': resolved.all_empty,
+        'seconds': round(time.perf_counter() - started, 4),
+    }
+
+
+def run(preset, out_dir, workers=None, fmt='html', year_range=None, source=None, snapshot_dir=None):
+    """Render semua laporan untuk ``preset`` ke ``out_dir``; kembalikan isi index.json"""
+    started = time.perf_counter()
+    frame = load_vehicle_frame(source, snapshot_dir)
+    cube = AggregateCube.from_frame(frame)
+    year_range = year_range or (DEFAULT_YEAR_START, int(frame['Model Year'].max()))
+    jobs = [(name, state, out_dir, fmt) for name, state in preset_states(preset, frame, year_range)]
+    del frame
+
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(cube)
+        results = [render_preset(job) for job in jobs]
+    else:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cube,)) as pool:
+            results = list(pool.map(render_preset, jobs, chunksize=chunksize))
+
+    index = {
+        'preset': preset,
+        'format': fmt,
+        'year_range': list(year_range),
+        'workers': workers,
+        'seconds': round(time.perf_counter() - started, 3),
+        'reports': results,
+    }
+    with open(os.path.join(out_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+    logger.info("%d laporan (%s) ditulis ke %s dalam %.1fs", len(results), preset, out_dir, index['seconds'])
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render laporan statis Lumina EV Dashboard per preset filter")
+    parser.add_argument('--preset', choices=PRESETS, default='county-type')
+    parser.add_argument('--out', default='reports', help="folder output laporan")
+    parser.add_argument('--workers', type=int, default=None, help="jumlah proses (default: semua core)")
+    parser.add_argument('--format', choices=('html', 'json'), default='html')
+    parser.add_argument('--years', type=int, nargs=2, metavar=('AWAL', 'AKHIR'), help="rentang tahun model")
+    parser.add_argument('--source', default=config.DATA_SOURCE, help="path/URL CSV sumber")
+    parser.add_argument('--snapshot-dir', default=config.SNAPSHOT_DIR)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run(args.preset, args.out, args.workers, args.format, args.years, args.source, args.snapshot_dir)
+
+
+if __name__ == '__main__':
+    main()
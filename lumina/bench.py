@@ -0,0 +1,240 @@
+"""Benchmark skala dashboard di atas populasi EV sintetis.
+
+Untuk setiap ukuran data (default 100 ribu, 1 juta, 10 juta baris) sebuah
+proses baru menjalankan dan mencatat:
+
+- ``load_data_cold``/``load_data_warm``: ingest CSV ke snapshot lalu buka
+  ulang snapshot lewat memory-map (setara ``load_data()`` saat deploy/restart)
+- ``build_cube``, ``build_index``, ``build_engine``, ``build_geo``,
+  ``build_measures``, ``build_records``: struktur turunan dataset
+- ``filter``: resolve fallback + seleksi bitmap per state filter (median)
+- ``page_cube``/``page_engine``: seluruh angka halaman per state filter (median)
+- ``map_cells``: sel peta dari piramida tile per state filter (median)
+- ``measure_summary``: ringkasan semua ukuran Jangkauan & Harga per state filter (median)
+- ``records_select``: seleksi penjelajah data (filter + cari + urut) per state (median)
+- ``records_page``: ambil satu halaman 50 baris dari tengah seleksi (median)
+- ``export_csv``/``export_parquet``: encode ekspor baris hasil filter per potongan (median)
+- ``build_sample``/``estimate``: sampel berstrata mode perkiraan dan estimasi
+  angka halaman beserta margin galatnya per state filter (median)
+- ``tab_<nama>``: build figure dan serialisasi JSON semua grafik tab (median)
+- ``peak_rss_mb``: RSS puncak proses benchmark
+
+Hasil ditulis ke file JSON. Jika ``--thresholds`` diberikan, setiap angka
+dibandingkan dengan batasnya dan proses keluar dengan kode 1 bila ada yang
+melewati batas atau belum punya batas; ``--baseline`` membandingkan relatif dengan hasil sebelumnya.
+
+Contoh::
+
+    python -m lumina.bench --sizes 100000 1000000 --thresholds benchmarks/thresholds.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+DEFAULT_SIZES = (100_000, 1_000_000, 10_000_000)
+N_STATES = 30
+N_EXPORTS = 3  # ekspor menulis seluruh baris hasil filter, jadi cukup beberapa state
+INFO_METRICS = ('rows', 'generate_csv')  # dicatat saja, tanpa batas maupun baseline
+
+
+def random_states(frame, n, seed=0):
+    """State filter acak yang meniru interaksi sidebar (tahun, tipe EV, County)"""
+    from lumina.filters import FilterState
+
+    rng = np.random.default_rng(seed)
+    years = frame['Model Year'].to_numpy()
+    year_min, year_max = int(years.min()), int(years.max())
+    types = list(frame['Electric Vehicle Type'].cat.categories)
+    counties = list(frame['County'].cat.categories)
+    states = []
+    for _ in range(n):
+        low = int(rng.integers(year_min, year_max + 1))
+        high = int(rng.integers(low, year_max + 1))
+        picked_types = [t for t in types if rng.random() < 0.7] or types[:1]
+        picked_counties = list(rng.choice(counties, int(rng.integers(0, 4)), replace=False))
+        states.append(FilterState.from_widgets((low, high), picked_types, picked_counties))
+    return states
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def _median(fn, items):
+    return statistics.median(_timed(lambda: fn(item))[1] for item in items)
+
+
+def _peak_rss_mb():
+    # ru_maxrss dalam KB di Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_size(n_rows, workdir, seed=0):
+    """Jalankan semua tahap benchmark untuk satu ukuran data (di proses sendiri)"""
+    import plotly.io as pio
+    import pyarrow as pa
+
+    from lumina import figures, synthetic
+    from lumina.bitmap import DEFAULT_DIMS, BitmapIndex, to_mask, to_rows
+    from lumina.cube import AggregateCube
+    from lumina.engine import AggregationEngine
+    from lumina.export import FORMATS, write_export
+    from lumina.filters import resolve_filters
+    from lumina.geo import TilePyramid
+    from lumina.measures import MEASURES, MeasureCube
+    from lumina.records import SORT_COLUMNS, RecordIndex
+    from lumina.sample import StratifiedSample
+    from lumina.report import TAB_CHARTS, chart_data
+    from lumina.snapshot import load_vehicle_frame
+
+    results = {}
+    csv_path = os.path.join(workdir, "synthetic-%d-%d.csv" % (n_rows, seed))
+    if not os.path.exists(csv_path):
+        _, results['generate_csv'] = _timed(lambda: synthetic.write_csv(csv_path, n_rows, seed))
+
+    snapshot_dir = os.path.join(workdir, "snapshot-%d" % n_rows)
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+    frame, results['load_data_cold'] = _timed(lambda: load_vehicle_frame(csv_path, snapshot_dir))
+    del frame
+    frame, results['load_data_warm'] = _timed(lambda: load_vehicle_frame(csv_path, snapshot_dir))
+
+    cube, results['build_cube'] = _timed(lambda: AggregateCube.from_frame(frame))
+    index, results['build_index'] = _timed(lambda: BitmapIndex.from_frame(frame, DEFAULT_DIMS))
+    engine, results['build_engine'] = _timed(lambda: AggregationEngine.from_frame(frame))
+    geo, results['build_geo'] = _timed(lambda: TilePyramid.from_frame(frame))
+    measures, results['build_measures'] = _timed(lambda: MeasureCube.from_frame(frame))
+    records = RecordIndex(frame)
+    _, results['build_records'] = _timed(lambda: [records.order(column) for column in SORT_COLUMNS])
+
+    states = random_states(frame, N_STATES, seed)
+    resolved = [resolve_filters(state, index.count) for state in states]
+    results['filter'] = _median(
+        lambda state: index.select(resolve_filters(state, index.count).state), states
+    )
+    results['page_cube'] = _median(lambda r: cube.aggregates(r.state), resolved)
+    results['page_engine'] = _median(
+        lambda r: engine.aggregates(to_rows(index.select(r.state), index.n_rows)), resolved
+    )
+    results['map_cells'] = _median(lambda r: geo.cells(r.state), resolved)
+    results['measure_summary'] = _median(
+        lambda r: [measures.summary(measure, r.state) for measure in MEASURES], resolved
+    )
+
+    masks = [to_mask(index.select(r.state), index.n_rows) for r in resolved]
+    results['records_select'] = _median(lambda mask: records.select(mask, 'tesla', 'Make'), masks)
+    selections = [records.select(mask, '', 'Model Year') for mask in masks]
+    results['records_page'] = _median(
+        lambda selection: records.page(selection, selection.total // (2 * 50), 50).to_dict('records'), selections
+    )
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    for fmt in FORMATS:
+        results['export_' + fmt] = _median(
+            lambda mask: write_export(table, np.flatnonzero(mask), os.devnull, fmt), masks[:N_EXPORTS]
+        )
+
+    sample, results['build_sample'] = _timed(lambda: StratifiedSample.from_frame(frame))
+    results['estimate'] = _median(lambda r: sample.estimate(r.state), resolved)
+
+    pages = [cube.aggregates(r.state) for r in resolved]
+    for kind in figures.CHARTS:
+        figures.skeleton(kind)  # kerangka dibangun sekali per proses, di luar pengukuran
+    for tab, charts in TAB_CHARTS.items():
+        def render(agg, charts=charts):
+            for kind, _ in charts:
+                pio.to_json(figures.build(kind, chart_data(agg, kind)).to_dict(), validate=False)
+        results['tab_' + tab.lower().replace(' ', '_')] = _median(render, pages)
+
+    results['rows'] = len(frame)
+    results['peak_rss_mb'] = _peak_rss_mb()
+    return results
+
+
+def check(results, thresholds=None, baseline=None, tolerance=0.25):
+    """Daftar pelanggaran: batas absolut per ukuran, atau regresi relatif terhadap baseline
+
+    Dengan ``thresholds``, metrik yang dilaporkan tanpa batas juga dihitung
+    pelanggaran agar metrik baru tidak lolos tanpa pernah diperiksa.
+    """
+    failures = []
+    for size, metrics in results.items():
+        if thresholds is not None:
+            limits = thresholds.get(size, {})
+            for name in metrics:
+                if name not in INFO_METRICS and name not in limits:
+                    failures.append("%s %s: tidak ada batas di thresholds" % (size, name))
+        for name, limit in (thresholds or {}).get(size, {}).items():
+            if name in metrics and metrics[name] > limit:
+                failures.append("%s %s: %.4g > batas %.4g" % (size, name, metrics[name], limit))
+        for name, before in (baseline or {}).get(size, {}).items():
+            if name in INFO_METRICS or name not in metrics or not before:
+                continue
+            if metrics[name] > before * (1 + tolerance):
+                failures.append("%s %s: %.4g > baseline %.4g (+%d%%)" % (
+                    size, name, metrics[name], before, tolerance * 100))
+    return failures
+
+
+def _load_json(path):
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get('results', data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark skala Lumina EV Dashboard")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--workdir', default=os.path.join(".lumina_cache", "bench"))
+    parser.add_argument('--out', default="bench-results.json")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--thresholds', help="JSON batas absolut per ukuran")
+    parser.add_argument('--baseline', help="hasil benchmark sebelumnya untuk perbandingan relatif")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="regresi relatif yang diizinkan")
+    args = parser.parse_args(argv)
+    os.makedirs(args.workdir, exist_ok=True)
+
+    results = {}
+    for n_rows in args.sizes:
+        # Proses baru per ukuran agar RSS puncak tidak tercampur ukuran sebelumnya
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results[str(n_rows)] = pool.submit(run_size, n_rows, args.workdir, args.seed).result()
+        print("%10d baris: %s" % (n_rows, ", ".join(
+            "%s=%.4g" % item for item in results[str(n_rows)].items())), flush=True)
+
+    failures = check(results, _load_json(args.thresholds), _load_json(args.baseline), args.tolerance)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({
+            'meta': {
+                'created_at': time.time(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'numpy': np.__version__,
+                'seed': args.seed,
+                'states_per_size': N_STATES,
+            },
+            'results': results,
+            'failures': failures,
+        }, f, indent=2)
+
+    for failure in failures:
+        print("REGRESI:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
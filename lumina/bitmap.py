@@ -0,0 +1,305 @@
+"""Indeks bitmap per nilai untuk logika filter sidebar.
+
+Setiap bitset disimpan sebagai array ``uint64`` (satu bit per baris), sehingga
+filter tahun, tipe EV, dan County menjadi operasi AND/OR per word dan cek
+"hasil kosong" menjadi popcount.
+
+- Model Year memakai bitmap ber-encode rentang: ``le[k]`` berisi baris dengan
+  kode tahun <= k, sehingga rentang tahun apa pun cukup dua bitset.
+- Dimensi lain memakai bitset padat untuk nilai yang sering muncul, dan daftar
+  nomor baris terurut untuk nilai jarang (lebih hemat dari bitset penuh).
+"""
+import numpy as np
+
+from lumina.encoding import codes_of
+
+DEFAULT_DIMS = ('Electric Vehicle Type', 'County')
+
+# Nilai dengan porsi baris di bawah 1/SPARSE_RATIO disimpan sebagai daftar baris
+# (4 byte per baris) karena lebih kecil dari bitset padat (n/8 byte).
+SPARSE_RATIO = 32
+
+_POPCOUNT_LUT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def n_words(n_rows):
+    return (n_rows + 63) // 64
+
+
+def pack(mask):
+    """Ubah mask boolean menjadi bitset uint64"""
+    packed = np.packbits(mask, bitorder='little')
+    padded = np.zeros(n_words(len(mask)) * 8, dtype=np.uint8)
+    padded[:len(packed)] = packed
+    return padded.view(np.uint64)
+
+
+def from_rows(rows, n_rows):
+    """Bitset dari daftar nomor baris"""
+    bits = np.zeros(n_words(n_rows), dtype=np.uint64)
+    np.bitwise_or.at(bits, rows >> 6, np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+    return bits
+
+
+def contains(bits, rows):
+    """Mask boolean: apakah bit setiap nomor baris ``rows`` bernilai 1"""
+    rows = np.asarray(rows, dtype=np.int64)
+    return ((bits[rows >> 6] >> (rows & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+def delete_bits(bits, n_rows, removed):
+    """Bitset (atau matriks bitset, satu per baris matriks) tanpa baris ``removed``.
+
+    ``removed`` berisi nomor baris terurut dan unik; bit baris sesudahnya
+    bergeser maju. Word yang memuat baris terhapus dirapatkan dengan operasi
+    bit, word lain dipindahkan utuh dengan geser bit, sehingga biayanya
+    sebanding jumlah word, bukan jumlah baris.
+    """
+    removed = np.asarray(removed, dtype=np.int64)
+    words = np.array(bits, dtype=np.uint64, ndmin=2)[:, :n_words(n_rows)]
+    n_kept = n_rows - len(removed)
+    out = np.zeros((len(words), n_words(n_kept)), dtype=np.uint64)
+    if n_kept > 0 and len(removed):
+        lengths = np.full(words.shape[1], 64, dtype=np.int64)
+        lengths[-1] = n_rows - 64 * (words.shape[1] - 1)
+        touched, n_removed = np.unique(removed >> 6, return_counts=True)
+        lengths[touched] -= n_removed
+
+        # Word tersentuh: bit baris terhapus dibuang satu per satu mulai dari bit
+        # tertinggi, bit di atasnya turun satu posisi; iterasinya sebanyak baris
+        # terhapus terbanyak dalam satu word
+        word_of = removed >> 6
+        from_end = np.searchsorted(word_of, word_of, side='right') - 1 - np.arange(len(removed))
+        for rank in range(int(from_end.max()) + 1):
+            pick = from_end == rank
+            cols, bit = word_of[pick], (removed[pick] & 63).astype(np.uint64)
+            values = words[:, cols]
+            below = (np.uint64(1) << bit) - np.uint64(1)
+            words[:, cols] = (values & below) | (((values >> bit) >> np.uint64(1)) << bit)
+
+        # Sambung potongan bit: potongan k mulai di offset jumlah panjang potongan
+        # sebelumnya. Setiap word hasil menerima bagian rendah sekelompok potongan
+        # yang mulai di word itu (lebih dari satu hanya di sekitar word tersentuh),
+        # ditambah sisa bagian tinggi potongan terakhir kelompok sebelumnya.
+        present = lengths > 0
+        if not present.all():
+            words, lengths = words[:, present], lengths[present]
+        offsets = np.cumsum(lengths) - lengths
+        dest, shift = offsets >> 6, (offsets & 63).astype(np.uint64)
+        low = words << shift
+        high = np.where((offsets & 63) + lengths > 64, words >> ((np.uint64(64) - shift) & np.uint64(63)), np.uint64(0))
+        first = np.r_[True, dest[1:] != dest[:-1]]
+        if first.all():
+            merged, spill = low, high
+        else:
+            starts = np.flatnonzero(first)
+            merged = low[:, starts]
+            # Bit potongan sekelompok tidak beririsan, jadi cukup di-OR ke word kelompoknya
+            rest = np.flatnonzero(~first)
+            np.bitwise_or.at(merged, (slice(None), dest[rest]), low[:, rest])
+            spill = high[:, np.r_[starts[1:] - 1, len(dest) - 1]]
+        width = min(merged.shape[1], out.shape[1])
+        out[:, :width] = merged[:, :width]
+        out[:, 1:] |= spill[:, :out.shape[1] - 1]
+    elif n_kept > 0:
+        out[:] = words
+    return out.reshape(np.shape(bits)[:-1] + (out.shape[1],))
+
+
+def shift_rows(rows, removed):
+    """Nomor baris ``rows`` (terurut) setelah baris ``removed`` (terurut) dibuang"""
+    rows = np.asarray(rows, dtype=np.int64)
+    removed = np.asarray(removed, dtype=np.int64)
+    if not len(removed):
+        return rows
+    before = np.searchsorted(removed, rows)
+    kept = removed[np.minimum(before, len(removed) - 1)] != rows
+    return rows[kept] - before[kept]
+
+
+def popcount(bits):
+    """Jumlah bit bernilai 1"""
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(bits).sum(dtype=np.int64))
+    return int(_POPCOUNT_LUT[bits.view(np.uint8)].sum(dtype=np.int64))
+
+
+def to_mask(bits, n_rows):
+    """Ubah bitset kembali menjadi mask boolean sepanjang ``n_rows``"""
+    return np.unpackbits(bits.view(np.uint8), bitorder='little', count=n_rows).astype(bool)
+
+
+def to_rows(bits, n_rows):
+    """Nomor baris (terurut) yang bit-nya bernilai 1"""
+    return np.flatnonzero(to_mask(bits, n_rows))
+
+
+class ValueBitmaps:
+    """Bitmap per nilai untuk satu dimensi kategorikal"""
+
+    def __init__(self, categories, n_rows, dense, sparse):
+        self.categories = categories
+        self.n_rows = n_rows
+        self.dense = dense  # kode -> bitset uint64
+        self.sparse = sparse  # kode -> nomor baris uint32 terurut
+
+    @classmethod
+    def from_codes(cls, codes, categories, n_rows):
+        """Bangun bitmap per nilai dari array kode kolom"""
+        dense, sparse = {}, {}
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+        for code in range(len(categories)):
+            size = bounds[code + 1] - bounds[code]
+            if size * SPARSE_RATIO >= n_rows:
+                dense[code] = pack(codes == code)
+            elif size:
+                sparse[code] = order[bounds[code]:bounds[code + 1]].astype(np.uint32)
+        return cls(categories, n_rows, dense, sparse)
+
+    @property
+    def nbytes(self):
+        return sum(b.nbytes for b in self.dense.values()) + sum(r.nbytes for r in self.sparse.values())
+
+    def union(self, values):
+        """OR dari bitmap setiap nilai di ``values``"""
+        bits = np.zeros(n_words(self.n_rows), dtype=np.uint64)
+        sparse_rows = []
+        for code in self.categories.get_indexer(list(values)):
+            if code in self.dense:
+                bits |= self.dense[code]
+            elif code in self.sparse:
+                sparse_rows.append(self.sparse[code])
+        if sparse_rows:
+            bits |= from_rows(np.concatenate(sparse_rows).astype(np.int64), self.n_rows)
+        return bits
+
+
+class BitmapIndex:
+    def __init__(self, n_rows, year_min, year_le, value_bitmaps):
+        self.n_rows = n_rows
+        self.year_min = year_min
+        self.year_le = year_le
+        self.value_bitmaps = value_bitmaps
+        self.all_bits = pack(np.ones(n_rows, dtype=bool))
+
+    @classmethod
+    def from_frame(cls, df, dims=DEFAULT_DIMS):
+        """Bangun indeks untuk Model Year plus dimensi kategorikal ``dims``"""
+        n_rows = len(df)
+        years = df['Model Year'].to_numpy()
+        year_min = int(years.min()) if n_rows else 0
+        year_codes = years - year_min
+        n_years = int(year_codes.max()) + 1 if n_rows else 0
+
+        # Bitmap ber-encode rentang dibangun secara kumulatif: le[k] = le[k-1] | (tahun == k)
+        year_le = np.zeros((n_years, n_words(n_rows)), dtype=np.uint64)
+        running = np.zeros(n_words(n_rows), dtype=np.uint64)
+        for code in range(n_years):
+            running = running | pack(year_codes == code)
+            year_le[code] = running
+
+        value_bitmaps = {
+            dim: ValueBitmaps.from_codes(codes_of(df[dim]), df[dim].cat.categories, n_rows)
+            for dim in dims
+        }
+        return cls(n_rows, year_min, year_le, value_bitmaps)
+
+    def apply_delta(self, removed, added):
+        """Indeks baru setelah baris lama ``removed`` (posisi terurut) dibuang dan ``added`` ditambahkan.
+
+        Mengikuti tata letak snapshot delta: baris lama yang tersisa (urutan
+        tetap) lalu baris ``added`` di akhir. ``added`` harus berasal dari frame
+        snapshot baru (kamusnya memperluas kamus lama). Bitset padat digeser
+        per word dan daftar baris jarang per nomor baris, sehingga biayanya
+        tidak lagi memerlukan frame penuh; indeks lama tidak diubah. Nilai yang
+        baru muncul disimpan sebagai daftar baris jarang.
+        """
+        removed = np.asarray(removed, dtype=np.int64)
+        n_kept = self.n_rows - len(removed)
+        n_rows = n_kept + len(added)
+        positions = np.arange(n_kept, n_rows)
+
+        # Semua bitset padat (tahun dan nilai per dimensi) digeser dalam satu matriks
+        dense_codes = {dim: sorted(values.dense) for dim, values in self.value_bitmaps.items()}
+        stacked = np.concatenate(
+            [self.year_le]
+            + [np.stack([values.dense[code] for code in dense_codes[dim]])
+               for dim, values in self.value_bitmaps.items() if dense_codes[dim]]
+        )
+        kept = delete_bits(stacked, self.n_rows, removed)
+        carried = np.zeros((len(kept), n_words(n_rows)), dtype=np.uint64)
+        carried[:, :kept.shape[1]] = kept
+
+        years = added['Model Year'].to_numpy().astype(np.int64)
+        year_min, year_max = self.year_min, self.year_min + len(self.year_le) - 1
+        if len(years):
+            year_min = min(year_min, int(years.min())) if len(self.year_le) else int(years.min())
+            year_max = max(year_max, int(years.max()))
+        shift = self.year_min - year_min
+        year_le = np.zeros((max(year_max - year_min + 1, 0), n_words(n_rows)), dtype=np.uint64)
+        if len(self.year_le):
+            year_le[shift:shift + len(self.year_le)] = carried[:len(self.year_le)]
+            year_le[shift + len(self.year_le):] = year_le[shift + len(self.year_le) - 1]
+        # Baris baru hanya menyentuh word mulai dari baris pertamanya
+        tail = n_kept >> 6
+        year_codes = years - year_min
+        for code in np.unique(year_codes):
+            year_le[code:, tail:] |= from_rows(positions[year_codes == code] - 64 * tail, n_rows - 64 * tail)
+
+        value_bitmaps = {}
+        row = len(self.year_le)
+        for dim, values in self.value_bitmaps.items():
+            codes = codes_of(added[dim])
+            dense = dict(zip(dense_codes[dim], carried[row:row + len(dense_codes[dim])]))
+            row += len(dense_codes[dim])
+            sparse = {}
+            for code, rows in values.sparse.items():
+                rows = shift_rows(rows, removed)
+                if len(rows):
+                    sparse[code] = rows.astype(np.uint32)
+            for code in np.unique(codes[codes >= 0]):
+                rows = positions[codes == code]
+                if code in dense:
+                    dense[code][tail:] |= from_rows(rows - 64 * tail, n_rows - 64 * tail)
+                else:
+                    sparse[code] = np.concatenate([sparse.get(code, np.zeros(0, dtype=np.uint32)), rows.astype(np.uint32)])
+            categories = added[dim].cat.categories if len(added) else values.categories
+            value_bitmaps[dim] = ValueBitmaps(categories, n_rows, dense, sparse)
+        return BitmapIndex(n_rows, year_min, year_le, value_bitmaps)
+
+    @property
+    def nbytes(self):
+        return self.year_le.nbytes + sum(v.nbytes for v in self.value_bitmaps.values())
+
+    def year_bits(self, year_range):
+        """Bitset rentang tahun inklusif: le[hi] AND NOT le[lo - 1]"""
+        low = year_range[0] - self.year_min
+        high = min(year_range[1] - self.year_min, len(self.year_le) - 1)
+        if high < 0 or low > high:
+            return np.zeros_like(self.all_bits)
+        bits = self.year_le[high]
+        if low > 0:
+            bits = bits & ~self.year_le[low - 1]
+        return bits
+
+    def select(self, state, extra=None):
+        """Bitset baris yang lolos ``state`` (FilterState) dan filter tambahan.
+
+        ``extra`` opsional memetakan dimensi lain yang diindeks (mis. Make)
+        ke daftar nilai yang diizinkan.
+        """
+        bits = self.all_bits
+        if state.year_range is not None:
+            bits = bits & self.year_bits(state.year_range)
+        if state.ev_types is not None:
+            bits = bits & self.value_bitmaps['Electric Vehicle Type'].union(state.ev_types)
+        if state.counties:
+            bits = bits & self.value_bitmaps['County'].union(state.counties)
+        for dim, values in (extra or {}).items():
+            bits = bits & self.value_bitmaps[dim].union(values)
+        return bits
+
+    def count(self, state):
+        """Jumlah baris yang lolos ``state`` (popcount dari bitset seleksi)"""
+        return popcount(self.select(state))
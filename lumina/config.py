@@ -0,0 +1,99 @@
+"""Konfigurasi runtime yang dapat diatur melalui environment variable."""
+import os
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_DATA_SOURCE = "https://raw.githubusercontent.com/ginamalia/dataset/refs/heads/main/Electric_Vehicle_Population_Data.csv"
+
+# Path lokal atau URL CSV Electric_Vehicle_Population_Data
+DATA_SOURCE = os.environ.get("LUMINA_DATA_SOURCE", DEFAULT_DATA_SOURCE)
+
+# Folder tempat snapshot kolumnar (Arrow IPC) dan manifest-nya disimpan
+SNAPSHOT_DIR = os.environ.get("LUMINA_SNAPSHOT_DIR", os.path.join(_ROOT_DIR, ".lumina_cache"))
+
+# Folder riwayat snapshot rilis bertanggal untuk perbandingan antar rilis (lihat lumina.history)
+HISTORY_DIR = os.environ.get("LUMINA_HISTORY_DIR", os.path.join(SNAPSHOT_DIR, "history"))
+
+# Folder dataset bersama lintas proses server (lihat lumina.shared), mis. /dev/shm/lumina;
+# kosong berarti setiap proses memegang frame dan indeksnya sendiri
+SHARED_DIR = os.environ.get("LUMINA_SHARED_DIR", "")
+
+# Folder cache foto model (asli dan thumbnail) untuk strip Top 5 Model (lihat lumina.thumbnails)
+THUMBNAIL_DIR = os.environ.get("LUMINA_THUMBNAIL_DIR", os.path.join(SNAPSHOT_DIR, "thumbnails"))
+
+# Lebar maksimum thumbnail foto model (piksel)
+THUMBNAIL_WIDTH = int(os.environ.get("LUMINA_THUMBNAIL_WIDTH", "320"))
+
+# Batas total ukuran thumbnail foto model di disk (MB, foto asli tidak dihitung);
+# thumbnail yang paling lama tidak dipakai dihapus dulu
+THUMBNAIL_CACHE_MB = float(os.environ.get("LUMINA_THUMBNAIL_CACHE_MB", "20"))
+
+# Batas waktu (detik) untuk request kondisional ke sumber URL saat startup
+REMOTE_TIMEOUT = float(os.environ.get("LUMINA_REMOTE_TIMEOUT", "10"))
+
+# Jumlah baris CSV per chunk saat ingest; menentukan memori puncak ingest
+INGEST_CHUNK_ROWS = int(os.environ.get("LUMINA_INGEST_CHUNK_ROWS", "100000"))
+
+# Dimensi kategorikal tambahan yang ikut diindeks bitmap, mis. "Make,Electric Utility"
+BITMAP_EXTRA_DIMS = tuple(
+    dim.strip() for dim in os.environ.get("LUMINA_BITMAP_EXTRA_DIMS", "").split(",") if dim.strip()
+)
+
+# Sumber angka halaman: "cube" (irisan cube agregat) atau "engine"
+# (agregasi satu-lintasan atas baris hasil seleksi bitmap)
+AGGREGATION_BACKEND = os.environ.get("LUMINA_AGGREGATION", "cube")
+
+# Batas memori cache hasil agregasi lintas-sesi (MB)
+RESULT_CACHE_BYTES = int(float(os.environ.get("LUMINA_RESULT_CACHE_MB", "64")) * 2**20)
+
+# Tampilkan statistik cache hasil di sidebar ("1" untuk mengaktifkan)
+SHOW_CACHE_STATS = os.environ.get("LUMINA_SHOW_CACHE_STATS", "0") == "1"
+
+# Interval (detik) pengecekan perubahan sumber data untuk refresh inkremental
+# di background; 0 menonaktifkan refresh selama server berjalan
+REFRESH_INTERVAL = float(os.environ.get("LUMINA_REFRESH_INTERVAL", "0"))
+
+# Span waktu/alokasi jalur panas ("0" untuk menonaktifkan)
+METRICS_ENABLED = os.environ.get("LUMINA_METRICS", "1") != "0"
+
+# File ekspor metrik: akhiran .prom untuk format teks Prometheus, selain itu JSON lines
+METRICS_EXPORT = os.environ.get("LUMINA_METRICS_EXPORT", "")
+
+# Interval (detik) ekspor metrik ke file
+METRICS_EXPORT_INTERVAL = float(os.environ.get("LUMINA_METRICS_EXPORT_INTERVAL", "60"))
+
+# Tampilkan panel debug performa (histogram span dan cache) di sidebar ("1" untuk mengaktifkan)
+DEBUG_PANEL = os.environ.get("LUMINA_DEBUG_PANEL", "0") == "1"
+
+# Preset filter yang dihitung ke cache hasil saat warm-up (lihat lumina.batch.PRESETS)
+WARM_PRESETS = tuple(
+    preset.strip() for preset in os.environ.get("LUMINA_WARM_PRESETS", "default,county,type").split(",") if preset.strip()
+)
+
+# Port endpoint readiness HTTP (/ready) yang dijalankan lumina.serve; 0 menonaktifkan
+READY_PORT = int(os.environ.get("LUMINA_READY_PORT", "0"))
+
+# Jumlah maksimum sel grid yang dikirim ke peta Geografis per render
+MAP_MAX_CELLS = int(os.environ.get("LUMINA_MAP_MAX_CELLS", "3000"))
+
+# Jumlah baris per halaman penjelajah data kendaraan
+RECORDS_PAGE_ROWS = int(os.environ.get("LUMINA_RECORDS_PAGE_ROWS", "50"))
+
+# Batas memori cache seleksi penjelajah data (MB), terpisah dari cache hasil agregasi
+RECORDS_CACHE_BYTES = int(float(os.environ.get("LUMINA_RECORDS_CACHE_MB", "16")) * 2**20)
+
+# Jumlah baris per potongan saat ekspor CSV/Parquet; menentukan memori puncak ekspor
+EXPORT_CHUNK_ROWS = int(os.environ.get("LUMINA_EXPORT_CHUNK_ROWS", "65536"))
+
+# Mode perkiraan: halaman untuk state filter yang belum ada di cache hasil
+# ditampilkan dulu dari sampel berstrata, nilai pasti dihitung di background ("1" untuk mengaktifkan)
+APPROXIMATE = os.environ.get("LUMINA_APPROXIMATE", "0") == "1"
+
+# Target jumlah baris sampel berstrata mode perkiraan
+SAMPLE_ROWS = int(os.environ.get("LUMINA_SAMPLE_ROWS", "200000"))
+
+# Interval (detik) pengecekan apakah nilai pasti sudah selesai dihitung
+REFINE_POLL_SECONDS = float(os.environ.get("LUMINA_REFINE_POLL_SECONDS", "0.5"))
+
+# Jumlah maksimum state filter yang menunggu dihitung pasti di background (yang terlama dibuang)
+REFINE_QUEUE = int(os.environ.get("LUMINA_REFINE_QUEUE", "8"))
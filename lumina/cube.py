@@ -0,0 +1,217 @@
+"""Cube agregat yang dibangun sekali saat data dimuat.
+
+Cube terdiri dari beberapa cuboid: satu cuboid dasar berkunci
+(Model Year, Electric Vehicle Type, County) dan satu cuboid per dimensi
+sekunder (Make, Model, City, Electric Utility) yang menambahkan dimensi itu ke
+kunci dasar. Cuboid Model juga berkunci Make untuk pohon drill-down; karena
+hampir setiap model hanya milik satu merek, jumlah selnya nyaris sama. Filter
+sidebar hanya menyentuh dimensi dasar, sehingga setiap filter menjadi irisan
+cuboid dan seluruh angka halaman dihitung dari sel-sel cuboid, bukan dari
+baris mentah.
+"""
+import numpy as np
+import pandas as pd
+
+from lumina.aggregates import COUNTY_TYPE, MAKE_MODEL_YEAR, MAKE_YEAR, summarize
+from lumina.encoding import codes_of, membership_lut
+
+BASE_DIMS = ('Model Year', 'Electric Vehicle Type', 'County')
+SECONDARY_DIMS = ('Make', 'Model', 'City', 'Electric Utility')
+# Dimensi tambahan di depan dimensi sekunder pada kunci cuboid-nya
+CUBOID_PREFIX = {'Model': ('Make',)}
+
+# Di bawah batas jumlah sel ini pengelompokan memakai bincount padat (O(n)),
+# di atasnya memakai np.unique agar array sementara tidak membengkak.
+DENSE_CELLS_LIMIT = 1 << 22
+
+
+def _smallest_uint(size):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if size <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def group_counts(codes, sizes, weights=None):
+    """Kelompokkan kombinasi kode dan hitung jumlah baris per kombinasi.
+
+    Mengembalikan ``(keys, counts)`` dengan ``keys`` berupa list array kode
+    per dimensi untuk setiap sel yang tidak kosong. ``weights`` opsional
+    (mis. +1/-1 untuk delta) dijumlahkan alih-alih menghitung baris.
+    """
+    flat = np.ravel_multi_index(tuple(c.astype(np.intp) for c in codes), sizes)
+    n_cells = int(np.prod(sizes))
+    if n_cells <= DENSE_CELLS_LIMIT:
+        dense = np.bincount(flat, weights=weights, minlength=n_cells)
+        cells = np.flatnonzero(dense)
+        counts = dense[cells]
+    elif weights is None:
+        cells, counts = np.unique(flat, return_counts=True)
+    else:
+        cells, inverse = np.unique(flat, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights)
+        cells, counts = cells[counts != 0], counts[counts != 0]
+    if counts.dtype.kind == 'f':
+        counts = np.rint(counts)
+    keys = [
+        part.astype(_smallest_uint(size))
+        for part, size in zip(np.unravel_index(cells, sizes), sizes)
+    ]
+    return keys, counts.astype(np.int64)
+
+
+class Cuboid:
+    """Sel-sel tidak kosong untuk satu kombinasi dimensi"""
+
+    def __init__(self, dims, keys, counts):
+        self.dims = dims
+        self.keys = dict(zip(dims, keys))
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    @property
+    def nbytes(self):
+        return self.counts.nbytes + sum(k.nbytes for k in self.keys.values())
+
+
+def _labels(df, year_min, year_max):
+    labels = {'Model Year': pd.Index(np.arange(year_min, year_max + 1), name='Model Year')}
+    for dim in BASE_DIMS[1:] + SECONDARY_DIMS:
+        labels[dim] = df[dim].cat.categories
+    return labels
+
+
+def _codes(df, year_min):
+    codes = {'Model Year': df['Model Year'].to_numpy().astype(np.intp) - year_min}
+    for dim in BASE_DIMS[1:] + SECONDARY_DIMS:
+        codes[dim] = codes_of(df[dim])
+    return codes
+
+
+def base_mask(cuboid, labels, year_min, state):
+    """Mask sel ``cuboid`` (berkunci dimensi dasar) yang lolos filter ``state``"""
+    mask = np.ones(len(cuboid), dtype=bool)
+    if state.year_range is not None:
+        years = cuboid.keys['Model Year'].astype(np.intp)
+        low = state.year_range[0] - year_min
+        high = state.year_range[1] - year_min
+        mask &= (years >= low) & (years <= high)
+    if state.ev_types is not None:
+        lut = membership_lut(labels['Electric Vehicle Type'], state.ev_types)
+        mask &= lut[cuboid.keys['Electric Vehicle Type']]
+    if state.counties:
+        mask &= membership_lut(labels['County'], state.counties)[cuboid.keys['County']]
+    return mask
+
+
+class AggregateCube:
+    def __init__(self, labels, cuboids, total):
+        self.labels = labels
+        self.cuboids = cuboids
+        self.total = total
+        self.year_min = int(labels['Model Year'][0]) if len(labels['Model Year']) else 0
+
+    @classmethod
+    def from_frame(cls, df):
+        """Bangun cube dari frame kendaraan ter-encode"""
+        years = df['Model Year'].to_numpy()
+        year_min = int(years.min()) if len(years) else 0
+        year_max = int(years.max()) if len(years) else -1
+        labels = _labels(df, year_min, year_max)
+        codes = _codes(df, year_min)
+
+        cuboids = {}
+        for extra in (None,) + SECONDARY_DIMS:
+            dims = BASE_DIMS + (CUBOID_PREFIX.get(extra, ()) + (extra,) if extra else ())
+            keys, counts = group_counts([codes[d] for d in dims], [len(labels[d]) for d in dims])
+            cuboids[extra] = Cuboid(dims, keys, counts)
+        return cls(labels, cuboids, len(df))
+
+    def apply_delta(self, removed, added):
+        """Cube baru setelah baris ``removed`` dikurangi dan ``added`` ditambahkan.
+
+        ``added`` harus berasal dari frame snapshot baru (kamusnya memperluas
+        kamus lama). Biaya sebanding dengan jumlah sel plus baris delta, bukan
+        jumlah seluruh baris; cube lama tidak diubah.
+        """
+        years = np.concatenate([removed['Model Year'].to_numpy(), added['Model Year'].to_numpy()])
+        year_min = self.year_min
+        year_max = year_min + len(self.labels['Model Year']) - 1
+        if len(years):
+            year_min = min(year_min, int(years.min())) if year_max >= year_min else int(years.min())
+            year_max = max(year_max, int(years.max()))
+        labels = _labels(added, year_min, year_max) if len(added) else dict(self.labels, **{
+            'Model Year': pd.Index(np.arange(year_min, year_max + 1), name='Model Year')
+        })
+        shift = self.year_min - year_min
+        deltas = [(_codes(removed, year_min), -1), (_codes(added, year_min), 1)]
+
+        cuboids = {}
+        for extra, cuboid in self.cuboids.items():
+            dims = cuboid.dims
+            parts = [[cuboid.keys[d].astype(np.intp) + (shift if d == 'Model Year' else 0) for d in dims]]
+            weights = [cuboid.counts]
+            for codes, sign in deltas:
+                parts.append([codes[d] for d in dims])
+                weights.append(np.full(len(codes['Model Year']), sign, dtype=np.int64))
+            keys, counts = group_counts(
+                [np.concatenate(p) for p in zip(*parts)], [len(labels[d]) for d in dims],
+                weights=np.concatenate(weights).astype(np.float64),
+            )
+            cuboids[extra] = Cuboid(dims, keys, counts)
+        return AggregateCube(labels, cuboids, self.total - len(removed) + len(added))
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.cuboids.values())
+
+    def _mask(self, cuboid, state):
+        return base_mask(cuboid, self.labels, self.year_min, state)
+
+    def _bincount(self, cuboid, mask, *dims):
+        weights = cuboid.counts[mask]
+        sizes = [len(self.labels[d]) for d in dims]
+        flat = cuboid.keys[dims[0]][mask].astype(np.intp)
+        for dim, size in zip(dims[1:], sizes[1:]):
+            flat = flat * size + cuboid.keys[dim][mask]
+        dense = np.bincount(flat, weights=weights, minlength=int(np.prod(sizes)))
+        return dense.astype(np.int64).reshape(sizes)
+
+    def _cells(self, cuboid, mask, *dims):
+        """Sel tidak kosong irisan ``cuboid`` per kombinasi ``dims`` sebagai ``(keys, counts)``.
+
+        Sel cuboid dikelompokkan ulang dengan ``np.unique`` atas kunci gabungan,
+        tanpa tensor padat seukuran perkalian kamus ``dims``.
+        """
+        sizes = [len(self.labels[d]) for d in dims]
+        flat = np.ravel_multi_index(tuple(cuboid.keys[d][mask].astype(np.intp) for d in dims), sizes)
+        cells, inverse = np.unique(flat, return_inverse=True)
+        counts = np.bincount(inverse, weights=cuboid.counts[mask], minlength=len(cells))
+        return list(np.unravel_index(cells, sizes)), counts.astype(np.int64)
+
+    def count(self, state):
+        """Jumlah kendaraan yang lolos ``state``"""
+        base = self.cuboids[None]
+        return int(base.counts[self._mask(base, state)].sum())
+
+    def aggregates(self, state):
+        """Seluruh angka halaman untuk ``state``, dihitung dari irisan cuboid"""
+        base = self.cuboids[None]
+        mask = self._mask(base, state)
+        counts = {
+            'Model Year': self._bincount(base, mask, 'Model Year'),
+            'Electric Vehicle Type': self._bincount(base, mask, 'Electric Vehicle Type'),
+            'County': self._bincount(base, mask, 'County'),
+            COUNTY_TYPE: self._bincount(base, mask, *COUNTY_TYPE),
+        }
+        for dim in SECONDARY_DIMS:
+            cuboid = self.cuboids[dim]
+            mask = self._mask(cuboid, state)
+            counts[dim] = self._bincount(cuboid, mask, dim)
+            if dim == 'Make':
+                counts[MAKE_YEAR] = self._bincount(cuboid, mask, *MAKE_YEAR)
+            elif dim == 'Model':
+                counts[MAKE_MODEL_YEAR] = self._cells(cuboid, mask, *MAKE_MODEL_YEAR)
+        return summarize(counts, self.labels, self.total)
@@ -0,0 +1,346 @@
+"""Dataset yang sedang dilayani dashboard beserta struktur turunannya.
+
+``DatasetState`` membundel satu versi frame snapshot dengan cube, indeks
+bitmap, dan engine yang dibangun darinya; state tidak diubah lagi setelah
+dipakai sesi. ``Dataset`` memegang state aktif dan memperbaruinya lewat
+refresh inkremental di thread background: cube disesuaikan dengan delta,
+hasil cache untuk filter yang sedang dipakai dihitung ulang, baru kemudian
+state baru ditukar, sehingga sesi aktif tidak menemui cache dingin.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pyarrow as pa
+
+from lumina import config, instrument
+from lumina.bitmap import DEFAULT_DIMS, BitmapIndex, to_mask, to_rows
+from lumina.cube import AggregateCube
+from lumina.encoding import top_values
+from lumina.engine import AggregationEngine
+from lumina.export import write_export
+from lumina.geo import MapQuery, TilePyramid
+from lumina.measures import MEASURES, MeasureCube
+from lumina.filters import resolve_filters
+from lumina.records import RecordIndex
+from lumina.result_cache import ResultCache
+from lumina.sample import StratifiedSample
+from lumina.shared import attach
+from lumina.snapshot import current_snapshot, load_vehicle_frame, read_manifest, refresh_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Jumlah maksimum entri cache hasil (terbaru) yang dihitung ulang sebelum state ditukar
+REWARM_LIMIT = 64
+
+# Jenis entri cache hasil untuk sel peta dan seleksi penjelajah data (selain
+# angka halaman per backend dan ringkasan per ukuran di lumina.measures.MEASURES).
+# Entri MAP berkunci MapQuery dan entri RECORDS berkunci RecordQuery, bukan FilterState.
+# Entri RECORDS disimpan di cache seleksi tersendiri, sehingga pencarian yang
+# diketik tidak mengusir angka halaman dari cache hasil.
+MAP = "map"
+RECORDS = "records"
+
+# Jumlah model terpopuler (seluruh data, tanpa filter) pada strip foto tab Merek
+TOP_MODELS = 5
+
+
+class DatasetState:
+    def __init__(self, frame, cube, fingerprint=None, version=0, shared=None, index=None, geo=None, measures=None):
+        self.frame = frame
+        self.cube = cube
+        self.fingerprint = fingerprint
+        self.version = version
+        # Indeks per baris dari dataset bersama hanya dipakai jika frame memang berasal darinya
+        self.shared = shared if shared is not None and shared.frame is frame else None
+        dims = DEFAULT_DIMS + config.BITMAP_EXTRA_DIMS
+        self.index = self.shared.bitmap_index(dims) if self.shared else None
+        if self.index is None:
+            # ``index`` (mis. hasil BitmapIndex.apply_delta saat refresh) dipakai jika ada
+            self.index = index if index is not None else BitmapIndex.from_frame(frame, dims)
+        self._engine = None
+        self._engine_lock = threading.Lock()
+        self._geo = geo
+        self._geo_lock = threading.Lock()
+        self._measures = measures
+        self._measures_lock = threading.Lock()
+        self._records = None
+        self._records_lock = threading.Lock()
+        self._table = None
+        self._table_lock = threading.Lock()
+        self._sample = None
+        self._sample_lock = threading.Lock()
+        # Tidak bergantung filter: dihitung sekali per versi dataset
+        self.top_models = top_values(frame['Model'], TOP_MODELS).index.tolist()
+
+    @property
+    def engine(self):
+        with self._engine_lock:
+            if self._engine is None:
+                self._engine = self.shared.engine() if self.shared else AggregationEngine.from_frame(self.frame)
+            return self._engine
+
+    @property
+    def geo(self):
+        with self._geo_lock:
+            if self._geo is None:
+                self._geo = TilePyramid.from_frame(self.frame)
+            return self._geo
+
+    @property
+    def measures(self):
+        with self._measures_lock:
+            if self._measures is None:
+                self._measures = MeasureCube.from_frame(self.frame)
+            return self._measures
+
+    @property
+    def records(self):
+        with self._records_lock:
+            if self._records is None:
+                self._records = self.shared.records() if self.shared else RecordIndex(self.frame)
+            return self._records
+
+    @property
+    def table(self):
+        """Frame sebagai tabel Arrow (kolom kategorikal menjadi kolom dictionary)"""
+        with self._table_lock:
+            if self._table is None:
+                if self.shared:
+                    self._table = self.shared.table()
+                else:
+                    self._table = pa.Table.from_pandas(self.frame, preserve_index=False)
+            return self._table
+
+    @property
+    def sample(self):
+        with self._sample_lock:
+            if self._sample is None:
+                self._sample = StratifiedSample.from_frame(self.frame)
+            return self._sample
+
+    def export(self, state, fmt, sink):
+        """Tulis baris yang lolos ``state`` (sudah di-resolve) ke ``sink`` dalam format ``fmt``; kembalikan jumlah baris"""
+        with instrument.span("export." + fmt):
+            rows = to_rows(self.index.select(state), self.index.n_rows)
+            return write_export(self.table, rows, sink, fmt)
+
+    def compute_page(self, state):
+        """Resolve fallback filter lalu hitung seluruh angka halaman untuk state tersebut"""
+        with instrument.span("filter.resolve"):
+            resolved = resolve_filters(state, self.index.count)
+        with instrument.span("filter.aggregate"):
+            if config.AGGREGATION_BACKEND == "engine":
+                rows = to_rows(self.index.select(resolved.state), self.index.n_rows)
+                return resolved, self.engine.aggregates(rows)
+            return resolved, self.cube.aggregates(resolved.state)
+
+    def compute_estimate(self, state):
+        """``(resolved, Estimate)`` dari sampel berstrata; fallback di-resolve dengan ukuran strata (pasti)"""
+        with instrument.span("estimate"):
+            resolved = resolve_filters(state, self.sample.count)
+            return resolved, self.sample.estimate(resolved.state)
+
+    def compute_map(self, query):
+        """Sel peta (``MapCells``) untuk ``MapQuery`` setelah fallback filter di-resolve"""
+        resolved = resolve_filters(query.filter_state, self.index.count)
+        with instrument.span("map.cells"):
+            return self.geo.cells(resolved.state, bounds=query.bounds)
+
+    def compute_measure(self, measure, state):
+        """``MeasureSummary`` ukuran ``measure`` untuk state filter setelah fallback di-resolve"""
+        resolved = resolve_filters(state, self.index.count)
+        with instrument.span("measure.summary"):
+            return self.measures.summary(measure, resolved.state)
+
+    def compute_records(self, query):
+        """``RecordSelection`` untuk ``RecordQuery`` setelah fallback filter di-resolve"""
+        resolved = resolve_filters(query.filter_state, self.index.count)
+        with instrument.span("records.select"):
+            mask = to_mask(self.index.select(resolved.state), self.index.n_rows)
+            return self.records.select(mask, query.search, query.sort, query.descending, resolved)
+
+    def compute(self, kind, state):
+        if kind == RECORDS:
+            return self.compute_records(state)
+        if kind == MAP:
+            return self.compute_map(state)
+        if kind in MEASURES:
+            return self.compute_measure(kind, state)
+        return self.compute_page(state)
+
+
+def shared_snapshot(snapshot_dir, manifest):
+    """Dataset bersama (lumina.shared) untuk snapshot ``manifest``, atau None jika mode bersama tidak aktif"""
+    if not config.SHARED_DIR or "file" not in manifest:
+        return None
+    return attach(os.path.join(snapshot_dir, manifest["file"]))
+
+
+class Dataset:
+    def __init__(self, state, result_cache, source=None, snapshot_dir=None, record_cache=None):
+        self.state = state
+        self.result_cache = result_cache
+        self.record_cache = record_cache if record_cache is not None else ResultCache(config.RECORDS_CACHE_BYTES)
+        self.source = source
+        self.snapshot_dir = snapshot_dir or config.SNAPSHOT_DIR
+        self.last_refresh = None
+        self._checked_at = time.monotonic()
+        self._check_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refine_queue = OrderedDict()
+        self._refine_lock = threading.Lock()
+        self._refine_thread = None
+
+    @classmethod
+    def load(cls, result_cache, source=None, snapshot_dir=None):
+        """Muat snapshot (membangunnya jika perlu) beserta cube dan indeksnya"""
+        with instrument.span("load_data"):
+            frame = load_vehicle_frame(source, snapshot_dir)
+            manifest = read_manifest(snapshot_dir or config.SNAPSHOT_DIR)
+            state = DatasetState(
+                frame, AggregateCube.from_frame(frame), manifest.get("fingerprint"),
+                shared=shared_snapshot(snapshot_dir or config.SNAPSHOT_DIR, manifest)
+            )
+        dataset = cls(state, result_cache, source, snapshot_dir)
+        instrument.register_collector("result_cache", result_cache.stats)
+        instrument.register_collector("record_cache", dataset.record_cache.stats)
+        return dataset
+
+    @staticmethod
+    def cache_key(state, filter_state, kind=None):
+        return (kind or config.AGGREGATION_BACKEND, state.version, filter_state)
+
+    def page(self, state, filter_state):
+        """``(resolved, agg)`` untuk ``filter_state`` pada ``state``, lewat cache hasil lintas-sesi"""
+        return self.result_cache.get_or_compute(
+            self.cache_key(state, filter_state), lambda: state.compute_page(filter_state)
+        )
+
+    def has_page(self, state, filter_state):
+        """True jika angka halaman pasti untuk ``filter_state`` sudah ada di cache hasil"""
+        return self.cache_key(state, filter_state) in self.result_cache
+
+    def refine_in_background(self, state, filter_state):
+        """Antrekan perhitungan pasti ``page`` di thread background (yang terbaru dikerjakan dulu)"""
+        key = self.cache_key(state, filter_state)
+        with self._refine_lock:
+            self._refine_queue[key] = (state, filter_state)
+            self._refine_queue.move_to_end(key)
+            while len(self._refine_queue) > config.REFINE_QUEUE:
+                self._refine_queue.popitem(last=False)
+            if self._refine_thread is None:
+                self._refine_thread = threading.Thread(target=self._refine, name="lumina-refine", daemon=True)
+                self._refine_thread.start()
+
+    def _refine(self):
+        while True:
+            with self._refine_lock:
+                if not self._refine_queue:
+                    self._refine_thread = None
+                    return
+                _, (state, filter_state) = self._refine_queue.popitem(last=True)
+            try:
+                with instrument.span("refine"):
+                    self.page(state, filter_state)
+            except Exception:
+                logger.exception("Perhitungan pasti di background gagal")
+
+    def measure_summary(self, state, filter_state, measure):
+        """``MeasureSummary`` ``measure`` untuk ``filter_state`` pada ``state``, lewat cache hasil"""
+        return self.result_cache.get_or_compute(
+            self.cache_key(state, filter_state, measure), lambda: state.compute_measure(measure, filter_state)
+        )
+
+    def map_cells(self, state, filter_state, bounds=None):
+        """``MapCells`` untuk ``filter_state`` di viewport ``bounds`` pada ``state``, lewat cache hasil lintas-sesi"""
+        query = MapQuery(filter_state, bounds)
+        return self.result_cache.get_or_compute(
+            self.cache_key(state, query, MAP), lambda: state.compute_map(query)
+        )
+
+    def records(self, state, query):
+        """``RecordSelection`` untuk ``query`` pada ``state``, lewat cache seleksi lintas-sesi"""
+        return self.record_cache.get_or_compute(
+            self.cache_key(state, query, RECORDS), lambda: state.compute_records(query)
+        )
+
+    def refresh(self):
+        """Terapkan perubahan sumber data ke state aktif; True jika state ditukar"""
+        with self._refresh_lock, instrument.span("refresh"):
+            started = time.perf_counter()
+            old = self.state
+            result = refresh_snapshot(self.source, self.snapshot_dir)
+            if result is None:
+                current = current_snapshot(self.snapshot_dir)
+                if current is None or current[1].get("fingerprint") == old.fingerprint:
+                    return False
+                # Snapshot sudah diperbarui proses lain: muat ulang penuh
+                frame, manifest = current
+                delta = None
+            else:
+                frame, delta = result
+                manifest = read_manifest(self.snapshot_dir)
+                if delta is not None and manifest.get("base") != old.fingerprint:
+                    delta = None
+                elif delta is not None and delta.empty:
+                    # Hanya kolom yang tidak dipakai dashboard yang berubah
+                    old.fingerprint = manifest.get("fingerprint")
+                    return False
+
+            if delta is None:
+                cube, index, geo, measures = AggregateCube.from_frame(frame), None, None, None
+            else:
+                added = frame.iloc[len(frame) - len(delta.added):]
+                removed = old.frame.take(delta.removed)
+                cube = old.cube.apply_delta(removed, added)
+                index = old.index.apply_delta(delta.removed, added)
+                # Struktur lazy yang sudah dibangun ikut disesuaikan; yang belum tetap lazy
+                geo = old._geo.apply_delta(removed, added) if old._geo is not None else None
+                measures = old._measures.apply_delta(removed, added) if old._measures is not None else None
+            new = DatasetState(
+                frame, cube, manifest.get("fingerprint"), old.version + 1,
+                shared=shared_snapshot(self.snapshot_dir, manifest), index=index, geo=geo, measures=measures
+            )
+            if config.APPROXIMATE:
+                new.sample
+            rewarmed = sum(self._rewarm(cache, old, new) for cache in (self.result_cache, self.record_cache))
+            self.state = new
+            for cache in (self.result_cache, self.record_cache):
+                for key in cache.keys():
+                    if key[1] == old.version:
+                        cache.discard(key)
+
+            self.last_refresh = dict(
+                delta.report.as_dict() if delta is not None else {},
+                mode="delta" if delta is not None else "full",
+                rows=len(frame), rewarmed=rewarmed, at=time.time(),
+                seconds=time.perf_counter() - started,
+            )
+            logger.info("Dataset diperbarui (%s) dalam %.2fs", self.last_refresh["mode"], self.last_refresh["seconds"])
+            return True
+
+    def _rewarm(self, cache, old, new):
+        """Hitung ulang entri ``cache`` terbaru milik ``old`` untuk ``new`` sebelum ditukar"""
+        keys = [key for key in cache.keys() if key[1] == old.version][-REWARM_LIMIT:]
+        for kind, _, filter_state in keys:
+            cache.put(self.cache_key(new, filter_state, kind), new.compute(kind, filter_state))
+        return len(keys)
+
+    def refresh_if_due(self):
+        """Mulai refresh di thread background jika interval refresh sudah lewat"""
+        if config.REFRESH_INTERVAL <= 0:
+            return
+        with self._check_lock:
+            if time.monotonic() - self._checked_at < config.REFRESH_INTERVAL or self._refresh_lock.locked():
+                return
+            self._checked_at = time.monotonic()
+        threading.Thread(target=self._refresh_in_background, name="lumina-refresh", daemon=True).start()
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Refresh inkremental gagal; state lama tetap dipakai")
@@ -0,0 +1,153 @@
+"""Route HTTP unduhan ekspor data terfilter untuk server ASGI dashboard.
+
+``GET /api/export/<fmt>?year=..&year=..&type=..&county=..`` menerima filter
+sidebar (bentuk ``FilterState.from_widgets``), me-resolve fallback-nya atas
+state dataset terbaru, lalu menjalankan ``write_export`` di thread produsen.
+Hasil encode dikumpulkan per blok ``BLOCK_SIZE`` dan diserahkan ke antrean
+asyncio berukuran ``QUEUE_BLOCKS``; respons mengirim blok dari antrean itu
+sambil potongan berikutnya di-encode. Antrean penuh menahan produsen, jadi
+memori puncak beberapa blok saja; tidak ada file sementara maupun isi ekspor
+di media store Streamlit. Panjang ekspor tidak diketahui di muka, sehingga
+respons dikirim tanpa ``Content-Length``.
+
+Route dipasang lewat ``routes()`` di ``server.py`` (``st.App``); tanpa itu
+(mis. ``streamlit run app.py``) ``enabled()`` bernilai False dan dashboard
+tidak menawarkan ekspor.
+"""
+import asyncio
+import threading
+from functools import partial
+from urllib.parse import urlencode
+
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from lumina import warmup
+from lumina.export import FORMATS
+from lumina.filters import FilterState, resolve_filters
+
+PATH = "/api/export/{fmt}"
+
+# Ukuran blok (byte) yang dikirim ke klien, dan jumlah blok yang boleh menunggu di antrean
+BLOCK_SIZE = 1 << 20
+QUEUE_BLOCKS = 4
+
+_enabled = False
+
+
+def routes():
+    """Route Starlette untuk ``st.App``; menandai unduhan streaming tersedia di proses ini"""
+    global _enabled
+    _enabled = True
+    return [Route(PATH, download)]
+
+
+def enabled():
+    return _enabled
+
+
+def file_name(state, fmt):
+    return f"ev-{state.year_range[0]}-{state.year_range[1]}.{fmt}"
+
+
+def url(state, fmt):
+    """URL unduhan untuk state filter sidebar ``state`` (hasil ``FilterState.from_widgets``)"""
+    query = [('year', year) for year in state.year_range]
+    query += [('type', ev_type) for ev_type in state.ev_types]
+    query += [('county', county) for county in state.counties]
+    return PATH.format(fmt=fmt) + "?" + urlencode(query)
+
+
+class QueueSink:
+    """Sink file-like ``write_export`` yang meneruskan byte ke antrean asyncio ``queue``.
+
+    Dipakai dari thread produsen: byte dikumpulkan sampai ``block_size`` lalu
+    di-``put`` ke antrean lewat event loop ``loop``, menunggu jika antrean
+    penuh. Setelah ``cancel()`` (klien berhenti membaca) penulisan berikutnya
+    gagal sehingga produsen berhenti.
+    """
+
+    closed = False
+
+    def __init__(self, loop, queue, block_size=BLOCK_SIZE):
+        self.loop = loop
+        self.queue = queue
+        self.block_size = block_size
+        self.buffer = bytearray()
+        self.cancelled = False
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def write(self, data):
+        self.buffer += data
+        if len(self.buffer) >= self.block_size:
+            self._put(bytes(self.buffer))
+            self.buffer.clear()
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def _put(self, item):
+        with self._lock:
+            if self.cancelled:
+                raise ConnectionAbortedError("Unduhan dihentikan klien")
+            self._pending = asyncio.run_coroutine_threadsafe(self.queue.put(item), self.loop)
+        self._pending.result()
+
+    def run(self, produce):
+        """Jalankan ``produce(self)`` sampai selesai; akhir data ditandai ``None``, kegagalan dengan exception-nya"""
+        try:
+            produce(self)
+            if self.buffer:
+                self._put(bytes(self.buffer))
+            end = None
+        except Exception as exc:
+            end = exc
+        try:
+            self._put(end)
+        except Exception:
+            pass  # klien sudah berhenti membaca
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._pending is not None:
+                self._pending.cancel()
+
+
+async def stream(produce, block_size=BLOCK_SIZE):
+    """Blok bytes yang ditulis ``produce(sink)`` di thread produsen, segera setelah tersedia"""
+    queue = asyncio.Queue(maxsize=QUEUE_BLOCKS)
+    sink = QueueSink(asyncio.get_running_loop(), queue, block_size)
+    threading.Thread(target=sink.run, args=(produce,), name="lumina-export", daemon=True).start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        sink.cancel()
+
+
+def _export(state, fmt, sink):
+    data = warmup.dataset().state
+    resolved = resolve_filters(state, data.index.count)
+    data.export(resolved.state, fmt, sink)
+
+
+async def download(request):
+    fmt = request.path_params['fmt']
+    if fmt not in FORMATS:
+        return PlainTextResponse("Format ekspor tidak dikenal", status_code=404)
+    params = request.query_params
+    try:
+        state = FilterState.from_widgets(params.getlist('year'), params.getlist('type'), params.getlist('county'))
+    except (IndexError, ValueError):
+        return PlainTextResponse("Parameter filter tidak valid", status_code=400)
+
+    headers = {'Content-Disposition': 'attachment; filename="%s"' % file_name(state, fmt)}
+    return StreamingResponse(stream(partial(_export, state, fmt)), media_type=FORMATS[fmt][1], headers=headers)
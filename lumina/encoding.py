@@ -0,0 +1,132 @@
+"""Representasi kolom ter-encode kamus (dictionary encoding) dan operasi di atas kodenya.
+
+Setiap kolom string disimpan sebagai kode integer kecil yang merujuk ke satu
+kamus bersama per kolom (``pd.Categorical``). Kode diberikan berdasarkan urutan
+kemunculan pertama sehingga kode lama tetap stabil ketika kamus diperluas.
+Filter dan perhitungan di dashboard bekerja langsung pada array kode ini.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+class DictionaryBuilder:
+    """Membangun kamus per kolom secara inkremental dari chunk-chunk data"""
+
+    def __init__(self, columns):
+        self.lookup = {col: {} for col in columns}
+
+    @classmethod
+    def from_dictionaries(cls, dictionaries):
+        """Lanjutkan kamus yang sudah ada (mis. dari snapshot); kode lama tidak berubah"""
+        builder = cls(dictionaries)
+        for col, values in dictionaries.items():
+            builder.lookup[col] = {label: code for code, label in enumerate(values)}
+        return builder
+
+    def encode(self, col, values):
+        """Ubah Series string menjadi array kode int32 global untuk kolom ``col``"""
+        local_codes, uniques = pd.factorize(values)
+        table = self.lookup[col]
+        lut = np.fromiter(
+            (table.setdefault(label, len(table)) for label in uniques),
+            dtype=np.int32, count=len(uniques)
+        )
+        return lut[local_codes]
+
+    def dictionary(self, col):
+        """Kamus kolom ``col`` sebagai array Arrow, urut sesuai kode"""
+        return pa.array(list(self.lookup[col]), type=pa.string())
+
+
+def index_type(size):
+    """Tipe integer Arrow terkecil yang cukup untuk kamus berukuran ``size``"""
+    if size <= np.iinfo(np.int8).max:
+        return pa.int8()
+    if size <= np.iinfo(np.int16).max:
+        return pa.int16()
+    return pa.int32()
+
+
+def codes_of(series):
+    """Array kode numpy (tanpa salinan, read-only) dari kolom kategorikal"""
+    # ``series.cat.codes`` membuat Series baru berisi salinan kode
+    return series.array.codes
+
+
+def membership_lut(categories, values):
+    """Tabel lookup boolean per kode: True jika label kode ada di ``values``"""
+    lut = np.zeros(len(categories) + 1, dtype=bool)  # slot terakhir untuk kode -1 (NaN)
+    idx = categories.get_indexer(list(values))
+    lut[idx[idx >= 0]] = True
+    return lut
+
+
+def isin_codes(series, values):
+    """Setara ``series.isin(values)`` tetapi lewat tabel lookup pada kode"""
+    return membership_lut(series.cat.categories, values)[codes_of(series)]
+
+
+def bincount(series, weights=None):
+    """Hitungan per nilai dalam bentuk array padat beserta labelnya.
+
+    Kolom kategorikal dihitung per kode kamus; kolom integer (mis. Model Year)
+    dihitung per offset dari nilai minimumnya.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = codes_of(series)
+        labels = series.cat.categories
+        counts = np.bincount(codes[codes >= 0], weights=weights, minlength=len(labels))
+        return counts, labels
+    values = series.to_numpy()
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int64), pd.Index([], dtype=series.dtype)
+    low = int(values.min())
+    counts = np.bincount(values - low, weights=weights)
+    return counts, pd.Index(np.arange(low, low + len(counts), dtype=series.dtype))
+
+
+def count_values(series, sort=True):
+    """Pengganti ``value_counts()`` berbasis kode; hanya nilai yang muncul.
+
+    Dengan ``sort=False`` urutan mengikuti label (seperti ``groupby().size()``).
+    """
+    counts, labels = bincount(series)
+    present = np.flatnonzero(counts)
+    if sort:
+        present = present[np.argsort(-counts[present], kind="stable")]
+    return pd.Series(counts[present], index=labels[present], name="count")
+
+
+def top_values(series, n):
+    """Pengganti ``value_counts().nlargest(n)`` berbasis kode"""
+    return count_values(series).iloc[:n]
+
+
+def count_nunique(series):
+    """Jumlah nilai berbeda yang benar-benar muncul di ``series``"""
+    counts, _ = bincount(series)
+    return int(np.count_nonzero(counts))
+
+
+def crosstab(row_series, col_series):
+    """Tabel silang hitungan padat (label x label) dari dua kolom ter-encode"""
+    row_codes, row_labels = _dense_codes(row_series)
+    col_codes, col_labels = _dense_codes(col_series)
+    flat = np.bincount(
+        row_codes.astype(np.intp) * len(col_labels) + col_codes,
+        minlength=len(row_labels) * len(col_labels)
+    )
+    return pd.DataFrame(
+        flat.reshape(len(row_labels), len(col_labels)),
+        index=row_labels, columns=col_labels
+    )
+
+
+def _dense_codes(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return codes_of(series), series.cat.categories
+    values = series.to_numpy()
+    low = int(values.min()) if len(values) else 0
+    high = int(values.max()) if len(values) else -1
+    return values - low, pd.Index(np.arange(low, high + 1, dtype=series.dtype))
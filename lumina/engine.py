@@ -0,0 +1,93 @@
+"""Engine agregasi satu-lintasan di atas seleksi baris.
+
+Dipakai untuk seleksi yang tidak bisa dijawab cube (mis. filter dimensi
+tambahan dari indeks bitmap) atau ketika baris memiliki bobot (sampel).
+Semua angka halaman diturunkan dari tiga bincount atas kode integer (County x
+Tipe EV, City, dan Utility) dan pengelompokan sel Make x Model x Model Year
+dengan ``np.unique``; Make x Model Year serta marginal County, Tipe EV, Make,
+Model, dan Model Year diambil dari hasil County x Tipe EV dan sel tersebut.
+"""
+import numpy as np
+import pandas as pd
+
+from lumina.aggregates import COUNTY_TYPE, MAKE_MODEL_YEAR, MAKE_YEAR, summarize
+from lumina.encoding import codes_of
+
+ENGINE_DIMS = ('Electric Vehicle Type', 'County', 'City', 'Make', 'Model', 'Electric Utility')
+
+
+class AggregationEngine:
+    def __init__(self, codes, labels, total):
+        self.codes = codes
+        self.labels = labels
+        self.total = total
+
+    @classmethod
+    def from_frame(cls, df, year_codes=None):
+        """Siapkan array kode per dimensi dari frame ter-encode.
+
+        ``year_codes`` opsional berisi kode Model Year yang sudah dihitung (mis. dari lumina.shared).
+        """
+        years = df['Model Year'].to_numpy()
+        year_min = int(years.min()) if len(years) else 0
+        year_max = int(years.max()) if len(years) else -1
+        if year_codes is None:
+            year_codes = (years - year_min).astype(np.intp)
+        codes = {'Model Year': year_codes}
+        labels = {'Model Year': pd.Index(np.arange(year_min, year_max + 1), name='Model Year')}
+        for dim in ENGINE_DIMS:
+            codes[dim] = codes_of(df[dim])
+            labels[dim] = df[dim].cat.categories
+        return cls(codes, labels, len(df))
+
+    def _joint(self, rows, weights, *dims):
+        sizes = [len(self.labels[d]) for d in dims]
+        flat = self._take(dims[0], rows).astype(np.intp)
+        for dim, size in zip(dims[1:], sizes[1:]):
+            flat = flat * size + self._take(dim, rows)
+        return np.bincount(flat, weights=weights, minlength=int(np.prod(sizes))).reshape(sizes)
+
+    def _cells(self, rows, weights, *dims):
+        """Sel tidak kosong kombinasi ``dims`` sebagai ``(keys, counts)``, tanpa tensor padat"""
+        sizes = [len(self.labels[d]) for d in dims]
+        flat = np.ravel_multi_index(tuple(self._take(d, rows).astype(np.intp) for d in dims), sizes)
+        cells, inverse = np.unique(flat, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights, minlength=len(cells))
+        return list(np.unravel_index(cells, sizes)), counts
+
+    def _take(self, dim, rows):
+        codes = self.codes[dim]
+        return codes if rows is None else codes[rows]
+
+    def dense_counts(self, rows=None, weights=None):
+        """Vektor hitungan padat per dimensi untuk baris ``rows`` (None = semua).
+
+        ``MAKE_MODEL_YEAR`` berupa sel tidak kosong ``(keys, counts)``.
+        """
+        county_type = self._joint(rows, weights, *COUNTY_TYPE)
+        make_model_year = self._cells(rows, weights, *MAKE_MODEL_YEAR)
+        (makes, models, years), cell_counts = make_model_year
+        n_years = len(self.labels['Model Year'])
+        make_year = np.bincount(
+            makes.astype(np.intp) * n_years + years, weights=cell_counts,
+            minlength=len(self.labels['Make']) * n_years,
+        ).reshape(-1, n_years)
+        counts = {
+            COUNTY_TYPE: county_type,
+            MAKE_YEAR: make_year,
+            MAKE_MODEL_YEAR: make_model_year,
+            'County': county_type.sum(axis=1),
+            'Electric Vehicle Type': county_type.sum(axis=0),
+            'Make': make_year.sum(axis=1),
+            'Model': np.bincount(models, weights=cell_counts, minlength=len(self.labels['Model'])),
+            'Model Year': make_year.sum(axis=0),
+        }
+        for dim in ('City', 'Electric Utility'):
+            counts[dim] = np.bincount(self._take(dim, rows), weights=weights, minlength=len(self.labels[dim]))
+        return counts
+
+    def aggregates(self, rows=None, weights=None):
+        """Seluruh angka halaman untuk seleksi baris ``rows`` (opsional berbobot)"""
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+        return summarize(self.dense_counts(rows, weights), self.labels, self.total)
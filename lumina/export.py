@@ -0,0 +1,50 @@
+"""Ekspor streaming baris hasil filter sidebar ke CSV atau Parquet.
+
+Frame kendaraan dipandang sebagai tabel Arrow (dibangun sekali per state
+dataset). Nomor baris hasil seleksi bitmap diproses per potongan
+``config.EXPORT_CHUNK_ROWS``: potongan yang barisnya bersebelahan menjadi
+irisan tabel tanpa salinan, selainnya di-``take``. Setiap potongan langsung
+di-encode ke ``sink`` (path atau objek file-like), sehingga memori puncak
+ditentukan ukuran potongan, bukan ukuran subset maupun hasil encode-nya.
+``lumina.downloads`` memakai sink yang meneruskan hasil encode langsung ke
+respons HTTP, tanpa file sementara.
+"""
+import pyarrow as pa
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
+
+from lumina import config
+
+FORMATS = {
+    'csv': ('CSV', 'text/csv'),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def iter_chunks(table, rows, chunk_rows=None):
+    """Tabel Arrow per potongan ``chunk_rows`` baris dari nomor baris terurut ``rows``"""
+    chunk_rows = chunk_rows or config.EXPORT_CHUNK_ROWS
+    for start in range(0, len(rows), chunk_rows):
+        part = rows[start:start + chunk_rows]
+        first, last = int(part[0]), int(part[-1])
+        if last - first + 1 == len(part):
+            # Baris bersebelahan: irisan zero-copy
+            yield table.slice(first, len(part))
+        else:
+            yield table.take(pa.array(part, type=pa.int64()))
+
+
+def write_export(table, rows, sink, fmt, chunk_rows=None):
+    """Tulis baris ``rows`` dari ``table`` ke ``sink`` dalam format ``fmt``; kembalikan jumlah baris"""
+    if fmt not in FORMATS:
+        raise ValueError("Format ekspor tidak dikenal: %r" % fmt)
+    chunk_rows = chunk_rows or config.EXPORT_CHUNK_ROWS
+    if fmt == 'csv':
+        writer, options = pcsv.CSVWriter(sink, table.schema), {}
+    else:
+        # Satu row group per potongan
+        writer, options = pq.ParquetWriter(sink, table.schema), {'row_group_size': chunk_rows}
+    with writer:
+        for chunk in iter_chunks(table, rows, chunk_rows):
+            writer.write_table(chunk, **options)
+    return len(rows)
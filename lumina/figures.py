@@ -0,0 +1,539 @@
+"""Figure Plotly dashboard yang dibangun dari kerangka bertema.
+
+Setiap jenis grafik punya kerangka (dict figure) yang tema gelap, judul, sumbu,
+dan gaya trace-nya sudah diterapkan. Kerangka dibangun dan divalidasi Plotly
+sekali per proses; saat rerun hanya array data yang ditempel ke salinan
+dangkal kerangka lalu dibungkus ``go.Figure`` tanpa validasi ulang.
+
+Data dikirim sebagai array numpy sehingga Plotly meng-encode-nya sebagai typed
+array base64 (``bdata``) alih-alih list JSON, dan ``template.data`` pada
+kerangka dipangkas menjadi tipe trace yang benar-benar dipakai grafik itu.
+"""
+import threading
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from lumina.aggregates import BEV, PHEV
+from lumina.measures import BIN_EDGES, MSRP, RANGE
+
+PRIMARY_COLOR = "#00D4FF" # Cyan terang untuk highlight
+SECONDARY_COLOR = "#007BFF" # Biru untuk elemen sekunder
+DECLINE_COLOR = "#FF6B6B" # Merah untuk penurunan
+
+SHORT_TYPE = {BEV: 'BEV', PHEV: 'PHEV'}
+
+# Label tampilan dan satuan per ukuran numerik
+MEASURE_LABELS = {RANGE: ("Jangkauan Listrik", "mil"), MSRP: ("Base MSRP", "USD")}
+
+
+def apply_dark_theme(fig):
+    """Helper function untuk menerapkan tema dark konsisten ke semua plot"""
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="sans-serif", color="white"),
+        margin=dict(l=20, r=20, t=40, b=20),
+        hovermode="x unified"
+    )
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='#30363D')
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='#30363D')
+    return fig
+
+
+# -----------------------------------------------------------------------------
+# Kerangka per jenis grafik (tanpa data)
+# -----------------------------------------------------------------------------
+def _top_bar(title, axis_title):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        marker=dict(
+            colorscale='Blues',
+            showscale=False,
+            colorbar=dict(
+                title=dict(text="Jumlah", font=dict(color="white")),
+                tickfont=dict(color="white")
+            )
+        ),
+        textposition='outside',
+        hovertemplate='<b>%{x}</b><br>Jumlah: %{y:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=axis_title,
+        yaxis_title="Jumlah Kendaraan",
+        height=450
+    )
+    return fig
+
+
+def _trend():
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        mode='lines+markers',
+        name='Jumlah',
+        line=dict(color=PRIMARY_COLOR, width=3),
+        marker=dict(size=8, color='white', line=dict(width=1, color=PRIMARY_COLOR)),
+        fill='tozeroy',
+        fillcolor='rgba(0, 212, 255, 0.1)'
+    ))
+    fig.update_layout(
+        title="Pertumbuhan Adopsi EV per Tahun Model",
+        xaxis_title="Tahun Model",
+        yaxis_title="Jumlah Kendaraan",
+        height=500
+    )
+    return fig
+
+
+def _make_treemap():
+    fig = go.Figure(go.Treemap(
+        marker=dict(colorscale='Blues'),
+        textposition='middle center',
+        texttemplate='<b>%{label}</b><br>%{value:,.0f}',
+        hovertemplate='<b>%{label}</b><br>Jumlah: %{value:,.0f}<br>Pangsa: %{percentParent:.1%}<extra></extra>'
+    ))
+    fig.update_layout(
+        title="Top 15 Merek Kendaraan (Pangsa Pasar)",
+        height=500
+    )
+    return fig
+
+
+def _model_sunburst():
+    fig = go.Figure(go.Sunburst(
+        branchvalues='total',
+        maxdepth=2,  # Merek dan Model; klik node untuk masuk ke level Tahun Model
+        marker=dict(colorscale='Blues'),
+        insidetextorientation='radial',
+        hovertemplate='<b>%{id}</b><br>Jumlah: %{value:,.0f}<br>Pangsa: %{percentParent:.1%}<extra></extra>'
+    ))
+    fig.update_layout(
+        title="Merek → Model → Tahun Model",
+        height=500,
+        margin=dict(t=50, b=20, l=20, r=20)
+    )
+    return fig
+
+
+def _type_bar():
+    fig = go.Figure(go.Bar(
+        marker=dict(color=[PRIMARY_COLOR, SECONDARY_COLOR]),
+        textposition='auto'
+    ))
+    fig.update_layout(
+        title="Jumlah Kendaraan per Tipe",
+        height=400
+    )
+    return fig
+
+
+def _type_stack():
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='BEV', marker_color=PRIMARY_COLOR))
+    fig.add_trace(go.Bar(name='PHEV', marker_color=SECONDARY_COLOR))
+    fig.update_layout(
+        barmode='stack',
+        title="Proporsi Tipe EV di 5 County Teratas",
+        height=400,
+        legend=dict(orientation="v", y=1.1)
+    )
+    return fig
+
+
+def _utility_bar():
+    fig = go.Figure(go.Bar(
+        orientation='h',
+        marker=dict(
+            colorscale='Blues',
+            showscale=False
+        ),
+        textposition='outside',
+        hovertemplate='<b>%{y}</b><br>Jumlah Kendaraan: %{x:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        title="Top 10 Penyedia Listrik (Electric Utility)",
+        xaxis_title="Jumlah Kendaraan",
+        yaxis_title="Penyedia Listrik",
+        height=500,
+        yaxis=dict(autorange="reversed")
+    )
+    return fig
+
+
+def _heatmap():
+    fig = go.Figure(data=go.Heatmap(
+        colorscale='Blues',
+        colorbar=dict(
+            title=dict(text="Jumlah", font=dict(color="white")),
+            tickfont=dict(color="white")
+        )
+    ))
+    fig.update_layout(
+        title="Heatmap: Intensitas Model per Tahun vs Merek",
+        xaxis_title="Tahun Model",
+        yaxis_title="Merek",
+        height=500
+    )
+    return fig
+
+
+def _map():
+    fig = go.Figure(go.Scattermap(
+        mode='markers',
+        marker=dict(
+            colorscale=[[0, SECONDARY_COLOR], [1, PRIMARY_COLOR]],
+            opacity=0.75,
+            sizemode='diameter',
+            colorbar=dict(
+                title=dict(text="Jumlah", font=dict(color="white")),
+                tickfont=dict(color="white")
+            )
+        ),
+        hovertemplate='Jumlah: %{customdata:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        title="Peta Sebaran Kendaraan",
+        height=550,
+        map=dict(style="carto-darkmatter"),
+        # Seret untuk memilih area; app meminta sel level lebih halus untuk area itu
+        dragmode='select',
+        margin=dict(l=0, r=0, t=40, b=0)
+    )
+    return fig
+
+
+def _measure_hist():
+    fig = go.Figure(go.Bar(
+        marker=dict(color=PRIMARY_COLOR, line=dict(width=0)),
+        hovertemplate='%{customdata}<br>Jumlah: %{y:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        yaxis_title="Jumlah Kendaraan",
+        bargap=0.05,
+        height=400
+    )
+    return fig
+
+
+def _measure_by_make():
+    fig = go.Figure(go.Bar(
+        name='p50',
+        marker_color=SECONDARY_COLOR,
+        error_y=dict(type='data', symmetric=False, color=PRIMARY_COLOR, thickness=1.5),
+        hovertemplate='<b>%{x}</b><br>p10: %{customdata[0]:,.0f}<br>p50: %{y:,.0f}<br>p90: %{customdata[1]:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title="Merek",
+        height=450
+    )
+    return fig
+
+
+def _measure_by_year():
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(name='p10', mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(
+        name='p10 - p90', mode='lines', line=dict(width=0),
+        fill='tonexty', fillcolor='rgba(0, 212, 255, 0.15)', hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        name='p50', mode='lines+markers',
+        line=dict(color=PRIMARY_COLOR, width=3),
+        marker=dict(size=7, color='white', line=dict(width=1, color=PRIMARY_COLOR))
+    ))
+    fig.update_layout(
+        xaxis_title="Tahun Model",
+        height=450
+    )
+    return fig
+
+
+def _growth_bar():
+    fig = go.Figure(go.Bar(
+        orientation='h',
+        textposition='outside',
+        hovertemplate='<b>%{y}</b><br>Sebelum: %{customdata[0]:,.0f}<br>Sesudah: %{customdata[1]:,.0f}<br>Perubahan: %{x:+,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title="Perubahan Jumlah Kendaraan",
+        height=450,
+        yaxis=dict(autorange="reversed")
+    )
+    return fig
+
+
+SKELETON_BUILDERS = {
+    'county_bar': lambda: _top_bar("Top 10 County", "County"),
+    'city_bar': lambda: _top_bar("Top 10 City", "City"),
+    'trend': _trend,
+    'make_treemap': _make_treemap,
+    'model_sunburst': _model_sunburst,
+    'type_bar': _type_bar,
+    'type_stack': _type_stack,
+    'utility_bar': _utility_bar,
+    'heatmap': _heatmap,
+    'map': _map,
+    'measure_hist': _measure_hist,
+    'measure_by_make': _measure_by_make,
+    'measure_by_year': _measure_by_year,
+    'growth_bar': _growth_bar,
+}
+
+_skeletons = {}
+_skeleton_lock = threading.Lock()
+
+
+def _compact(spec):
+    """Pangkas ``template.data`` menjadi tipe trace yang dipakai figure"""
+    template = spec['layout'].get('template')
+    if template and 'data' in template:
+        used = {trace.get('type', 'scatter') for trace in spec['data']}
+        template['data'] = {k: v for k, v in template['data'].items() if k in used}
+    return spec
+
+
+def skeleton(kind):
+    """Kerangka bertema untuk ``kind``; dibangun sekali per proses lalu dipakai bersama"""
+    with _skeleton_lock:
+        spec = _skeletons.get(kind)
+        if spec is None:
+            fig = apply_dark_theme(SKELETON_BUILDERS[kind]())
+            spec = _skeletons[kind] = _compact(fig.to_dict())
+        return spec
+
+
+def _patch(base, patch):
+    """Salinan dangkal ``base`` dengan ``patch`` digabung rekursif (base tidak diubah)"""
+    merged = dict(base)
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            value = _patch(base[key], value)
+        merged[key] = value
+    return merged
+
+
+def from_skeleton(kind, traces, layout=None):
+    """Figure ``kind`` dengan data tiap trace (dan layout opsional) ditempel ke kerangka"""
+    spec = skeleton(kind)
+    data = [_patch(trace, values) for trace, values in zip(spec['data'], traces)]
+    layout = _patch(spec['layout'], layout) if layout else spec['layout']
+    return go.Figure({'data': data, 'layout': layout}, _validate=False)
+
+
+def _labels(index):
+    return np.asarray(index, dtype=object)
+
+
+# -----------------------------------------------------------------------------
+# Grafik dashboard
+# -----------------------------------------------------------------------------
+def top_bar(kind, counts):
+    """Bar top-N vertikal (County/City) dari Series hitungan"""
+    values = counts.to_numpy()
+    return from_skeleton(kind, [{
+        'x': _labels(counts.index), 'y': values, 'text': values, 'marker': {'color': values},
+    }])
+
+
+def trend(series):
+    """Garis tren jumlah kendaraan per tahun model, dengan anotasi puncak"""
+    years = series.index.to_numpy()
+    values = series.to_numpy()
+    layout = None
+    if len(values):
+        peak = int(np.argmax(values))
+        layout = {'annotations': [dict(
+            x=int(years[peak]),
+            y=int(values[peak]),
+            text=f"Puncak: {int(values[peak]):,}",
+            showarrow=True,
+            arrowhead=2,
+            arrowcolor="white",
+            bgcolor="#0F2838",
+            font=dict(color=PRIMARY_COLOR)
+        )]}
+    return from_skeleton('trend', [{'x': years, 'y': values}], layout)
+
+
+def make_treemap(counts):
+    """Treemap pangsa merek"""
+    return from_skeleton('make_treemap', [{
+        'labels': _labels(counts.index),
+        'parents': [""] * len(counts), # Semua kategori di level teratas
+        'values': counts.to_numpy(),
+    }])
+
+
+def model_sunburst(tree):
+    """Sunburst drill-down Merek -> Model -> Tahun Model dari node pohon yang sudah dipangkas"""
+    return from_skeleton('model_sunburst', [{
+        'ids': tree['id'].to_numpy(dtype=object),
+        'labels': tree['label'].to_numpy(dtype=object),
+        'parents': tree['parent'].to_numpy(dtype=object),
+        'values': tree['value'].to_numpy(),
+    }])
+
+
+def type_bar(counts):
+    """Bar jumlah kendaraan per tipe EV (label disingkat BEV/PHEV)"""
+    values = counts.to_numpy()
+    labels = [SHORT_TYPE.get(label, label) for label in counts.index]
+    return from_skeleton('type_bar', [{'x': labels, 'y': values, 'text': values}])
+
+
+def type_stack(type_by_county):
+    """Bar bertumpuk BEV/PHEV untuk county teratas"""
+    counties = _labels(type_by_county.index)
+    traces = []
+    for label in (BEV, PHEV):
+        column = type_by_county[label].to_numpy() if label in type_by_county else np.zeros(len(counties), dtype=np.int64)
+        traces.append({'x': counties, 'y': column})
+    return from_skeleton('type_stack', traces)
+
+
+def utility_bar(counts):
+    """Bar horizontal top-N penyedia listrik"""
+    values = counts.to_numpy()
+    return from_skeleton('utility_bar', [{
+        'y': _labels(counts.index), 'x': values, 'text': values, 'marker': {'color': values},
+    }])
+
+
+def heatmap(matrix):
+    """Heatmap jumlah kendaraan Merek x Tahun Model"""
+    return from_skeleton('heatmap', [{
+        'z': matrix.to_numpy(), 'x': matrix.columns.to_numpy(), 'y': _labels(matrix.index),
+    }])
+
+
+def vehicle_map(map_cells):
+    """Peta titik agregat per sel grid (ukuran dan warna sebanding jumlah kendaraan)"""
+    cells = map_cells.cells
+    counts = cells['Count'].to_numpy()
+    lon = cells['Longitude'].to_numpy()
+    lat = cells['Latitude'].to_numpy()
+    layout = {'hovermode': 'closest'}
+    if map_cells.bounds is not None:
+        lon_min, lat_min, lon_max, lat_max = map_cells.bounds
+    elif len(counts):
+        lon_min, lat_min, lon_max, lat_max = lon.min(), lat.min(), lon.max(), lat.max()
+    if map_cells.bounds is not None or len(counts):
+        # Viewport yang diminta, atau sebaran sel; zoom kira-kira dari rentang bujur/lintang
+        span = max(float(lon_max - lon_min), float(lat_max - lat_min) * 1.5, 0.01)
+        layout['map'] = {
+            'center': {'lon': float((lon_min + lon_max) / 2), 'lat': float((lat_min + lat_max) / 2)},
+            'zoom': float(np.clip(np.log2(360.0 / span) - 0.5, 2, 14)),
+        }
+    sizes = 4 + 18 * np.sqrt(counts / counts.max()) if len(counts) else counts
+    return from_skeleton('map', [{
+        'lon': lon, 'lat': lat, 'customdata': counts,
+        'marker': {'size': sizes.astype(np.float32), 'color': counts},
+    }], layout)
+
+
+def measure_hist(summary):
+    """Histogram ber-bin satu ukuran (Electric Range/Base MSRP)"""
+    label, unit = MEASURE_LABELS[summary.measure]
+    edges = BIN_EDGES[summary.measure]
+    widths = np.append(np.diff(edges), edges[-1] - edges[-2])
+    counts = summary.histogram.to_numpy()
+    ranges = [f"{lo:,.0f} - {lo + w:,.0f} {unit}" for lo, w in zip(edges, widths)]
+    ranges[-1] = f">= {edges[-1]:,.0f} {unit}"
+    # Bin kosong di ujung atas tidak perlu dikirim
+    end = int(np.flatnonzero(counts)[-1]) + 1 if counts.any() else 0
+    edges, widths, counts, ranges = edges[:end], widths[:end], counts[:end], ranges[:end]
+    return from_skeleton('measure_hist', [{
+        'x': edges + widths / 2, 'y': counts, 'width': widths, 'customdata': np.asarray(ranges, dtype=object),
+    }], {'title': {'text': f"Distribusi {label}"}, 'xaxis': {'title': {'text': f"{label} ({unit})"}}})
+
+
+def measure_by_make(summary):
+    """p50 per merek dengan rentang p10-p90 sebagai error bar"""
+    label, unit = MEASURE_LABELS[summary.measure]
+    frame = summary.by_make
+    p50 = frame['p50'].to_numpy()
+    return from_skeleton('measure_by_make', [{
+        'x': _labels(frame.index), 'y': p50,
+        'customdata': frame[['p10', 'p90']].to_numpy(),
+        'error_y': {'array': frame['p90'].to_numpy() - p50, 'arrayminus': p50 - frame['p10'].to_numpy()},
+    }], {'title': {'text': f"{label} per Merek (p10 / p50 / p90)"}, 'yaxis': {'title': {'text': f"{label} ({unit})"}}})
+
+
+def measure_by_year(summary):
+    """Median per tahun model dengan pita p10-p90"""
+    label, unit = MEASURE_LABELS[summary.measure]
+    frame = summary.by_year
+    years = frame.index.to_numpy()
+    return from_skeleton('measure_by_year', [
+        {'x': years, 'y': frame['p10'].to_numpy()},
+        {'x': years, 'y': frame['p90'].to_numpy()},
+        {'x': years, 'y': frame['p50'].to_numpy()},
+    ], {'title': {'text': f"{label} per Tahun Model (p10 / p50 / p90)"}, 'yaxis': {'title': {'text': f"{label} ({unit})"}}})
+
+
+def growth_bar(growth):
+    """Bar horizontal perubahan jumlah kendaraan antar dua rilis (``(judul, frame)``)"""
+    title, frame = growth
+    change = frame['change'].to_numpy()
+    text = [f"{c:+,}" + (f" ({p:+.1f}%)" if np.isfinite(p) else "") for c, p in zip(change, frame['pct'].to_numpy())]
+    return from_skeleton('growth_bar', [{
+        'y': [SHORT_TYPE.get(label, label) for label in frame.index], 'x': change, 'text': text,
+        'customdata': frame[['before', 'after']].to_numpy(),
+        'marker': {'color': [PRIMARY_COLOR if c >= 0 else DECLINE_COLOR for c in change]},
+    }], {'title': {'text': title}})
+
+
+CHARTS = {
+    'county_bar': lambda counts: top_bar('county_bar', counts),
+    'city_bar': lambda counts: top_bar('city_bar', counts),
+    'trend': trend,
+    'make_treemap': make_treemap,
+    'model_sunburst': model_sunburst,
+    'type_bar': type_bar,
+    'type_stack': type_stack,
+    'utility_bar': utility_bar,
+    'heatmap': heatmap,
+    'map': vehicle_map,
+    'measure_hist': measure_hist,
+    'measure_by_make': measure_by_make,
+    'measure_by_year': measure_by_year,
+    'growth_bar': growth_bar,
+}
+
+
+# -----------------------------------------------------------------------------
+# Statistik build dan payload per grafik
+# -----------------------------------------------------------------------------
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(kind, **values):
+    with _stats_lock:
+        _stats.setdefault(kind, {}).update(values)
+
+
+def build(kind, data):
+    """Bangun grafik ``kind`` dari ``data``; waktu build dicatat per jenis grafik"""
+    start = time.perf_counter()
+    fig = CHARTS[kind](data)
+    _record(kind, build_ms=round((time.perf_counter() - start) * 1000, 3))
+    return fig
+
+
+def measure_payload(kind, fig):
+    """Serialisasi ``fig`` seperti ``st.plotly_chart`` dan catat ukuran byte-nya"""
+    start = time.perf_counter()
+    nbytes = len(pio.to_json(fig.to_dict(), validate=False).encode())
+    _record(kind, bytes=nbytes, serialize_ms=round((time.perf_counter() - start) * 1000, 3))
+    return nbytes
+
+
+def chart_stats():
+    """Statistik terakhir per jenis grafik (build_ms, bytes, serialize_ms)"""
+    with _stats_lock:
+        return {kind: dict(values) for kind, values in _stats.items()}
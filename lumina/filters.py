@@ -0,0 +1,53 @@
+"""State filter sidebar yang dinormalisasi beserta aturan fallback-nya."""
+from dataclasses import dataclass, replace
+
+# Tahun awal default slider "Rentang Tahun Model" (tahun akhir = tahun terbaru di data)
+DEFAULT_YEAR_START = 2015
+
+
+@dataclass(frozen=True)
+class FilterState:
+    """Filter sidebar; ``None`` berarti dimensi tersebut tidak dibatasi"""
+    year_range: tuple = None
+    ev_types: tuple = None
+    counties: tuple = ()
+
+    @classmethod
+    def from_widgets(cls, year_range, ev_types, counties):
+        """Normalisasi nilai widget: urutan pilihan tidak memengaruhi state"""
+        return cls(
+            year_range=(int(year_range[0]), int(year_range[1])),
+            ev_types=tuple(sorted(ev_types)),
+            counties=tuple(sorted(counties or ())),
+        )
+
+    def without_counties(self):
+        return replace(self, counties=())
+
+
+# State tanpa batasan apa pun (seluruh data)
+ALL_ROWS = FilterState()
+
+
+@dataclass(frozen=True)
+class ResolvedFilters:
+    state: FilterState
+    county_dropped: bool = False
+    all_empty: bool = False
+
+
+def resolve_filters(state, count):
+    """Terapkan aturan fallback dashboard memakai fungsi hitung ``count(state)``.
+
+    Jika filter County menghasilkan data kosong, filter County diabaikan.
+    Jika filter Tahun dan Tipe EV pun kosong, seluruh data ditampilkan.
+    """
+    county_dropped = False
+    if state.counties:
+        if count(state) > 0:
+            return ResolvedFilters(state)
+        county_dropped = True
+        state = state.without_counties()
+    if count(state) == 0:
+        return ResolvedFilters(ALL_ROWS, county_dropped, True)
+    return ResolvedFilters(state, county_dropped)
@@ -0,0 +1,207 @@
+"""Piramida tile agregat lokasi kendaraan untuk peta di tab Geografis.
+
+Koordinat ``Vehicle Location`` (float32, di-parse saat ingest) dipetakan ke
+grid Web Mercator: pada level ``z`` dunia dibagi ``2^z x 2^z`` sel. Untuk
+setiap level disimpan cuboid berkunci dimensi dasar cube (tahun, tipe EV,
+County) ditambah sel ``(x, y)``, sehingga filter sidebar diterapkan dengan
+mask yang sama seperti cube. Level terhalus dibangun dari baris, level yang
+lebih kasar dari level di bawahnya.
+
+Query peta (``MapQuery``) berisi filter sidebar dan viewport yang sedang
+dilihat. Sel setiap level dipotong ke rentang tile viewport itu, lalu dipilih
+level terhalus yang jumlah selnya tidak melebihi ``config.MAP_MAX_CELLS``:
+makin sempit viewport (zoom masuk), makin halus level yang dilayani. Browser
+hanya menerima paling banyak beberapa ribu titik agregat, berapa pun jumlah
+kendaraannya.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from lumina import config
+from lumina.cube import BASE_DIMS, Cuboid, base_mask, group_counts
+from lumina.encoding import codes_of
+
+MIN_LEVEL = 4
+MAX_LEVEL = 14  # ~1,6 km per sel di lintang Washington
+
+# Batas lintang proyeksi Web Mercator
+MAX_LATITUDE = 85.05112878
+
+GRID_DIMS = BASE_DIMS + ('x', 'y')
+
+
+def tile_xy(lon, lat, level):
+    """Indeks sel ``(x, y)`` Web Mercator pada ``level`` untuk koordinat derajat"""
+    n = 1 << level
+    lat_rad = np.radians(np.clip(lat.astype(np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    x = (lon.astype(np.float64) + 180.0) / 360.0 * n
+    y = (1.0 - np.arcsinh(np.tan(lat_rad)) / np.pi) / 2.0 * n
+    return (np.clip(x, 0, n - 1).astype(np.uint32), np.clip(y, 0, n - 1).astype(np.uint32))
+
+
+def cell_centers(x, y, level):
+    """Koordinat ``(lon, lat)`` pusat sel ``(x, y)`` pada ``level``"""
+    n = 1 << level
+    lon = (x + 0.5) / n * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * (y + 0.5) / n))))
+    return lon, lat
+
+
+def tile_range(bounds, level):
+    """Rentang sel ``(x0, x1, y0, y1)`` inklusif pada ``level`` yang menutupi ``bounds``"""
+    lon_min, lat_min, lon_max, lat_max = bounds
+    x0, y1 = tile_xy(np.array([lon_min]), np.array([lat_min]), level)
+    x1, y0 = tile_xy(np.array([lon_max]), np.array([lat_max]), level)
+    return int(x0[0]), int(x1[0]), int(y0[0]), int(y1[0])
+
+
+def viewport(lon, lat, level):
+    """Viewport ``(lon_min, lat_min, lon_max, lat_max)`` yang menutupi titik terpilih.
+
+    Diberi tepi satu sel ``level`` dan dibulatkan, sehingga seleksi yang hampir
+    sama memakai key cache yang sama.
+    """
+    pad = 360.0 / (1 << level)
+    return (
+        round(max(float(np.min(lon)) - pad, -180.0), 3), round(max(float(np.min(lat)) - pad, -MAX_LATITUDE), 3),
+        round(min(float(np.max(lon)) + pad, 180.0), 3), round(min(float(np.max(lat)) + pad, MAX_LATITUDE), 3),
+    )
+
+
+def _labels(df, year_min, year_max):
+    return {
+        'Model Year': pd.Index(np.arange(year_min, year_max + 1)),
+        'Electric Vehicle Type': df['Electric Vehicle Type'].cat.categories,
+        'County': df['County'].cat.categories,
+    }
+
+
+def _grid_codes(df, year_min):
+    """Kode dimensi dasar dan sel ``(x, y)`` level terhalus untuk baris berkoordinat ``df``"""
+    lon = df['Longitude'].to_numpy()
+    lat = df['Latitude'].to_numpy()
+    valid = np.isfinite(lon) & np.isfinite(lat)
+    x, y = tile_xy(lon[valid], lat[valid], MAX_LEVEL)
+    return [
+        df['Model Year'].to_numpy()[valid].astype(np.intp) - year_min,
+        codes_of(df['Electric Vehicle Type'])[valid],
+        codes_of(df['County'])[valid],
+        x, y,
+    ]
+
+
+@dataclass(frozen=True)
+class MapQuery:
+    """Permintaan peta; menjadi bagian key cache hasil"""
+    filter_state: object
+    bounds: tuple = None  # viewport (lon_min, lat_min, lon_max, lat_max); None = seluruh data
+
+
+@dataclass
+class MapCells:
+    level: int
+    cells: pd.DataFrame  # Longitude, Latitude, Count per sel tidak kosong
+    bounds: tuple = None  # viewport yang diminta; None = seluruh data
+
+    @property
+    def total(self):
+        return int(self.cells['Count'].sum())
+
+
+class TilePyramid:
+    def __init__(self, labels, year_min, levels, located):
+        self.labels = labels
+        self.year_min = year_min
+        self.levels = levels
+        self.located = located
+
+    @classmethod
+    def from_frame(cls, df):
+        """Bangun piramida dari frame kendaraan; baris tanpa koordinat dilewati"""
+        years = df['Model Year'].to_numpy()
+        year_min = int(years.min()) if len(years) else 0
+        labels = _labels(df, year_min, int(years.max()) if len(years) else -1)
+        sizes = [len(labels[d]) for d in BASE_DIMS]
+
+        codes = _grid_codes(df, year_min)
+        located = len(codes[0])
+        keys, counts = group_counts(codes, sizes + [1 << MAX_LEVEL] * 2)
+        levels = {MAX_LEVEL: Cuboid(GRID_DIMS, keys, counts)}
+        for level in range(MAX_LEVEL - 1, MIN_LEVEL - 1, -1):
+            finer = levels[level + 1]
+            codes = [finer.keys[d] for d in BASE_DIMS] + [finer.keys['x'] >> 1, finer.keys['y'] >> 1]
+            keys, counts = group_counts(
+                codes, sizes + [1 << level] * 2, weights=finer.counts.astype(np.float64)
+            )
+            levels[level] = Cuboid(GRID_DIMS, keys, counts)
+        return cls(labels, year_min, levels, located)
+
+    def apply_delta(self, removed, added):
+        """Piramida baru setelah baris ``removed`` dikurangi dan ``added`` ditambahkan.
+
+        Sama seperti ``AggregateCube.apply_delta``: ``added`` berasal dari frame
+        snapshot baru, setiap level digabung dengan kode baris delta pada level
+        itu, dan piramida lama tidak diubah.
+        """
+        years = np.concatenate([removed['Model Year'].to_numpy(), added['Model Year'].to_numpy()])
+        year_min = self.year_min
+        year_max = year_min + len(self.labels['Model Year']) - 1
+        if len(years):
+            year_min = min(year_min, int(years.min())) if year_max >= year_min else int(years.min())
+            year_max = max(year_max, int(years.max()))
+        labels = _labels(added, year_min, year_max) if len(added) else dict(
+            self.labels, **{'Model Year': pd.Index(np.arange(year_min, year_max + 1))}
+        )
+        sizes = [len(labels[d]) for d in BASE_DIMS]
+        shift = self.year_min - year_min
+        deltas = [(_grid_codes(removed, year_min), -1), (_grid_codes(added, year_min), 1)]
+
+        levels = {}
+        for level, cuboid in self.levels.items():
+            parts = [[cuboid.keys[d].astype(np.intp) + (shift if d == 'Model Year' else 0) for d in GRID_DIMS]]
+            weights = [cuboid.counts]
+            for codes, sign in deltas:
+                parts.append(codes[:3] + [c >> (MAX_LEVEL - level) for c in codes[3:]])
+                weights.append(np.full(len(codes[0]), sign, dtype=np.int64))
+            keys, counts = group_counts(
+                [np.concatenate(p) for p in zip(*parts)], sizes + [1 << level] * 2,
+                weights=np.concatenate(weights).astype(np.float64),
+            )
+            levels[level] = Cuboid(GRID_DIMS, keys, counts)
+        located = self.located - len(deltas[0][0][0]) + len(deltas[1][0][0])
+        return TilePyramid(labels, year_min, levels, located)
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.levels.values())
+
+    def _level_cells(self, level, state, bounds=None):
+        cuboid = self.levels[level]
+        mask = base_mask(cuboid, self.labels, self.year_min, state)
+        if bounds is not None:
+            x0, x1, y0, y1 = tile_range(bounds, level)
+            x, y = cuboid.keys['x'], cuboid.keys['y']
+            mask &= (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+        flat = (cuboid.keys['x'][mask].astype(np.int64) << level) | cuboid.keys['y'][mask]
+        cells, inverse = np.unique(flat, return_inverse=True)
+        return cells, inverse, cuboid.counts[mask]
+
+    def cells(self, state, max_cells=None, bounds=None):
+        """``MapCells`` untuk ``state`` di dalam viewport ``bounds`` pada level terhalus dengan sel <= ``max_cells``"""
+        max_cells = max_cells or config.MAP_MAX_CELLS
+        best = None
+        for level in range(MIN_LEVEL, MAX_LEVEL + 1):
+            cells, inverse, weights = self._level_cells(level, state, bounds)
+            if best is not None and len(cells) > max_cells:
+                break
+            best = level, cells, np.bincount(inverse, weights=weights, minlength=len(cells))
+        level, cells, counts = best
+        lon, lat = cell_centers((cells >> level).astype(np.float64), (cells & ((1 << level) - 1)).astype(np.float64), level)
+        frame = pd.DataFrame({
+            'Longitude': lon.astype(np.float32),
+            'Latitude': lat.astype(np.float32),
+            'Count': np.rint(counts).astype(np.int64),
+        })
+        return MapCells(level, frame, bounds)
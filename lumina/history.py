@@ -0,0 +1,250 @@
+"""Riwayat snapshot rilis DOL bertanggal untuk perbandingan antar rilis.
+
+Setiap rilis bulanan di-ingest sekali menjadi file Arrow IPC di
+``config.HISTORY_DIR`` dengan kamus yang melanjutkan kamus rilis yang
+ditambahkan sebelumnya, sehingga kode kategori sama di semua rilis dan satu
+kamus bersama cukup untuk semuanya. Contoh::
+
+    python -m lumina.history add 2025-01 Electric_Vehicle_Population_Data_2025-01.csv
+    python -m lumina.history list
+
+``History.open()`` membuka semua rilis lewat memory-map dan dari array kode
+(tanpa membuat DataFrame) membangun satu cuboid hitungan per rilis berkunci
+(Model Year, Electric Vehicle Type, County, Make). Perbandingan dua rilis
+untuk filter sidebar apa pun dihitung dari dua cuboid itu saja.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import urllib.request
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from lumina import config
+from lumina.cube import BASE_DIMS, Cuboid, base_mask, group_counts
+from lumina.ingest import STRING_COLUMNS, ingest_csv
+from lumina.snapshot import is_remote
+
+logger = logging.getLogger(__name__)
+
+HISTORY_MANIFEST = "history.json"
+
+# Label rilis menjadi bagian nama file di history_dir, jadi tidak boleh memuat pemisah path
+LABEL_PATTERN = re.compile(r'[A-Za-z0-9._-]+')
+
+HISTORY_DIMS = BASE_DIMS + ('Make',)
+COMPARE_DIMS = ('County', 'Make', 'Electric Vehicle Type')
+
+
+def read_history(history_dir=None):
+    """Daftar entri rilis (urut label), atau list kosong jika belum ada riwayat"""
+    history_dir = history_dir or config.HISTORY_DIR
+    try:
+        with open(os.path.join(history_dir, HISTORY_MANIFEST), encoding="utf-8") as f:
+            entries = json.load(f)['releases']
+    except (OSError, ValueError, KeyError):
+        return []
+    return sorted(entries, key=lambda entry: entry['label'])
+
+
+def history_version(history_dir=None):
+    """Penanda perubahan riwayat (mtime manifest); None jika belum ada riwayat"""
+    try:
+        return os.stat(os.path.join(history_dir or config.HISTORY_DIR, HISTORY_MANIFEST)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _write_history(history_dir, entries):
+    tmp = os.path.join(history_dir, HISTORY_MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({'releases': entries}, f, indent=2)
+    os.replace(tmp, os.path.join(history_dir, HISTORY_MANIFEST))
+
+
+def open_release(path, columns):
+    """Kolom ``columns`` file rilis ``path`` lewat memory-map, tanpa salinan.
+
+    ``feather.read_table(columns=...)`` menyalin kolom ke memori; reader IPC
+    langsung tidak.
+    """
+    return pa.ipc.open_file(pa.memory_map(path)).read_all().select(columns)
+
+
+def _dictionaries(path):
+    """Kamus kolom string file rilis ``path`` (kolom -> list label)"""
+    table = open_release(path, STRING_COLUMNS)
+    return {
+        col: table.column(col).chunk(0).dictionary.to_pylist() if table.column(col).num_chunks else []
+        for col in STRING_COLUMNS
+    }
+
+
+def add_release(label, source, history_dir=None):
+    """Ingest CSV ``source`` (path atau URL) sebagai rilis ``label``; rilis berlabel sama diganti"""
+    if not LABEL_PATTERN.fullmatch(label):
+        raise ValueError("Label rilis hanya boleh berisi huruf, angka, '.', '_' dan '-': %r" % label)
+    history_dir = history_dir or config.HISTORY_DIR
+    os.makedirs(history_dir, exist_ok=True)
+    entries = read_history(history_dir)
+    # Kamus dilanjutkan dari rilis yang terakhir ditambahkan (kamusnya paling lengkap)
+    latest = max(entries, key=lambda entry: entry['added_at'], default=None)
+    dictionaries = _dictionaries(os.path.join(history_dir, latest['file'])) if latest else None
+
+    downloaded = None
+    if is_remote(source):
+        fd, downloaded = tempfile.mkstemp(suffix=".csv", dir=history_dir)
+        os.close(fd)
+        urllib.request.urlretrieve(source, downloaded)
+    name = "release-%s.arrow" % label
+    tmp = os.path.join(history_dir, name + ".tmp")
+    try:
+        report = ingest_csv(downloaded or source, tmp, dictionaries=dictionaries)
+        os.replace(tmp, os.path.join(history_dir, name))
+    finally:
+        for path in (tmp, downloaded):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    entry = dict(label=label, file=name, source=source, rows=report.rows_kept, added_at=time.time())
+    _write_history(history_dir, [e for e in entries if e['label'] != label] + [entry])
+    logger.info("Rilis %s ditambahkan ke riwayat: %d baris", label, report.rows_kept)
+    return entry
+
+
+def _release_cuboid(table, luts, year_min, sizes):
+    """Cuboid hitungan ``HISTORY_DIMS`` dari kode satu rilis, per record batch"""
+    keys, counts = [], []
+    for batch in table.to_batches():
+        codes = [batch.column('Model Year').to_numpy().astype(np.intp) - year_min]
+        for dim in HISTORY_DIMS[1:]:
+            column = batch.column(dim).indices.to_numpy(zero_copy_only=False)
+            codes.append(luts[dim][column])
+        part_keys, part_counts = group_counts(codes, sizes)
+        keys.append(part_keys)
+        counts.append(part_counts)
+    if not keys:
+        return Cuboid(HISTORY_DIMS, [np.zeros(0, dtype=np.uint8)] * len(HISTORY_DIMS), np.zeros(0, dtype=np.int64))
+    merged = [np.concatenate([k[i] for k in keys]) for i in range(len(HISTORY_DIMS))]
+    keys, counts = group_counts(merged, sizes, weights=np.concatenate(counts).astype(np.float64))
+    return Cuboid(HISTORY_DIMS, keys, counts)
+
+
+@dataclass
+class ReleaseComparison:
+    before: str
+    after: str
+    totals: tuple  # (jumlah rilis before, jumlah rilis after)
+    growth: dict  # dimensi -> DataFrame [before, after, change, pct], urut |change| menurun
+
+
+class History:
+    def __init__(self, labels, year_min, cuboids, entries):
+        self.labels = labels
+        self.year_min = year_min
+        self.cuboids = cuboids
+        self.entries = entries
+
+    @classmethod
+    def open(cls, history_dir=None):
+        """Buka semua rilis di ``history_dir`` lewat memory-map dan bangun cuboid per rilis"""
+        history_dir = history_dir or config.HISTORY_DIR
+        entries = read_history(history_dir)
+        tables = {
+            entry['label']: open_release(os.path.join(history_dir, entry['file']), list(HISTORY_DIMS))
+            for entry in entries
+        }
+
+        # Kamus bersama: kamus terpanjang, ditambah label rilis lain yang belum ada
+        # (hanya terjadi jika file rilis tidak dibuat lewat add_release)
+        labels, own = {}, {}
+        for dim in HISTORY_DIMS[1:]:
+            own[dim] = {
+                label: pd.Index(table.column(dim).chunk(0).dictionary.to_pylist() if table.column(dim).num_chunks else [])
+                for label, table in tables.items()
+            }
+            shared = max(own[dim].values(), key=len, default=pd.Index([]))
+            for values in own[dim].values():
+                shared = shared.append(values[~values.isin(shared)])
+            labels[dim] = shared
+
+        years = [pc.min_max(table.column('Model Year')).as_py() for table in tables.values() if table.num_rows]
+        year_min = min((y['min'] for y in years), default=0)
+        year_max = max((y['max'] for y in years), default=-1)
+        labels['Model Year'] = pd.Index(np.arange(year_min, year_max + 1), name='Model Year')
+        sizes = [len(labels[dim]) for dim in HISTORY_DIMS]
+
+        cuboids = {}
+        for label, table in tables.items():
+            luts = {}
+            for dim in HISTORY_DIMS[1:]:
+                values = own[dim][label]
+                # Rilis yang dibuat berantai memakai awalan kamus bersama: kode tidak perlu dipetakan
+                if labels[dim][:len(values)].equals(values):
+                    luts[dim] = np.arange(len(values), dtype=np.intp)
+                else:
+                    luts[dim] = labels[dim].get_indexer(values)
+            cuboids[label] = _release_cuboid(table, luts, year_min, sizes)
+        return cls(labels, year_min, cuboids, entries)
+
+    @property
+    def releases(self):
+        return [entry['label'] for entry in self.entries]
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.cuboids.values())
+
+    def _counts(self, label, dim, state):
+        cuboid = self.cuboids[label]
+        mask = base_mask(cuboid, self.labels, self.year_min, state)
+        return np.bincount(cuboid.keys[dim][mask], weights=cuboid.counts[mask], minlength=len(self.labels[dim]))
+
+    def compare(self, before, after, state):
+        """Pertumbuhan jumlah kendaraan dari rilis ``before`` ke ``after`` per dimensi ``COMPARE_DIMS``"""
+        growth = {}
+        for dim in COMPARE_DIMS:
+            old = self._counts(before, dim, state).astype(np.int64)
+            new = self._counts(after, dim, state).astype(np.int64)
+            present = np.flatnonzero((old > 0) | (new > 0))
+            frame = pd.DataFrame({
+                'before': old[present],
+                'after': new[present],
+                'change': new[present] - old[present],
+            }, index=self.labels[dim][present])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                frame['pct'] = np.where(frame['before'] > 0, frame['change'] / frame['before'] * 100, np.nan)
+            order = np.argsort(-np.abs(frame['change'].to_numpy()), kind='stable')
+            growth[dim] = frame.iloc[order]
+        totals = tuple(int(self._counts(label, COMPARE_DIMS[-1], state).sum()) for label in (before, after))
+        return ReleaseComparison(before, after, totals, growth)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kelola riwayat snapshot rilis DOL untuk perbandingan antar rilis")
+    parser.add_argument('--history-dir', default=config.HISTORY_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help="ingest CSV rilis sebagai snapshot bertanggal")
+    add.add_argument('label', help="label rilis, mis. 2025-01 (urutan label = urutan waktu)")
+    add.add_argument('source', help="path/URL CSV rilis")
+    commands.add_parser('list', help="tampilkan rilis yang tersimpan")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.command == 'add':
+        add_release(args.label, args.source, args.history_dir)
+    else:
+        for entry in read_history(args.history_dir):
+            print("%s\t%d baris\t%s" % (entry['label'], entry['rows'], entry['source']))
+
+
+if __name__ == '__main__':
+    main()
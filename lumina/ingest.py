@@ -0,0 +1,211 @@
+"""Ingest CSV kendaraan secara streaming dengan memori puncak terbatas.
+
+CSV dibaca per-chunk, hanya kolom yang dipakai dashboard yang di-parse, dengan
+dtype eksplisit yang ringkas. Setiap chunk dibersihkan, kolom string-nya
+di-encode ke kode kamus, lalu langsung ditulis sebagai record batch ke file
+Arrow IPC, sehingga memori puncak ditentukan oleh ukuran chunk, bukan ukuran
+seluruh file. Setelah kamus lengkap, batch kode ditulis ulang sebagai kolom
+dictionary Arrow yang berbagi satu kamus per kolom.
+"""
+import logging
+import os
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from lumina import config
+from lumina.encoding import DictionaryBuilder, index_type
+
+logger = logging.getLogger(__name__)
+
+STRING_COLUMNS = [
+    'County', 'City', 'State', 'Make', 'Model', 'Electric Vehicle Type',
+    'Clean Alternative Fuel Vehicle (CAFV) Eligibility', 'Electric Utility'
+]
+
+# Kunci stabil per kendaraan, dipakai refresh inkremental (lihat lumina.delta)
+KEY_COLUMN = 'DOL Vehicle ID'
+
+# Kolom POINT WKT yang di-parse sekali saat ingest menjadi koordinat float32
+LOCATION_COLUMN = 'Vehicle Location'
+COORD_COLUMNS = ['Longitude', 'Latitude']
+
+# Ukuran numerik per kendaraan (float32, NaN jika kosong); 0 berarti belum diriset DOL
+MEASURE_COLUMNS = ['Electric Range', 'Base MSRP']
+
+# Kolom yang dipertahankan dashboard. Kolom lain (VIN (1-10), Legislative
+# District, dst.) tidak pernah di-parse sama sekali.
+KEEP_COLUMNS = [
+    KEY_COLUMN, 'County', 'City', 'State', 'Postal Code', 'Model Year', 'Make', 'Model',
+    'Electric Vehicle Type', 'Clean Alternative Fuel Vehicle (CAFV) Eligibility',
+    'Electric Utility'
+] + MEASURE_COLUMNS + COORD_COLUMNS
+
+# Kolom yang dibaca dari CSV; baris hanya dibuang jika kolom selain lokasi/ukuran kosong
+CSV_COLUMNS = [col for col in KEEP_COLUMNS if col not in COORD_COLUMNS] + [LOCATION_COLUMN]
+REQUIRED_COLUMNS = [col for col in CSV_COLUMNS if col not in MEASURE_COLUMNS + [LOCATION_COLUMN]]
+
+_POINT_PATTERN = r'POINT \((?P<lon>[-+\d.eE]+) (?P<lat>[-+\d.eE]+)\)'
+
+# Kolom numerik dibaca sebagai float agar baris kosong bisa dibuang sebelum
+# di-cast ke integer (DOL Vehicle ID < 2^53 sehingga float64 tetap eksak).
+READ_DTYPES = dict(
+    {col: 'string' for col in STRING_COLUMNS + [LOCATION_COLUMN]},
+    **{'Model Year': 'float32', 'Postal Code': 'float64', KEY_COLUMN: 'float64'},
+    **{col: 'float32' for col in MEASURE_COLUMNS}
+)
+
+INT_TYPES = {'Model Year': pa.int16(), 'Postal Code': pa.int32(), KEY_COLUMN: pa.int64()}
+FLOAT_TYPES = {col: pa.float32() for col in MEASURE_COLUMNS + COORD_COLUMNS}
+
+# Skema antara: kolom string sebagai kode int32 global
+CODES_SCHEMA = pa.schema(
+    [(col, INT_TYPES.get(col, FLOAT_TYPES.get(col, pa.int32()))) for col in KEEP_COLUMNS]
+)
+
+
+@dataclass
+class IngestReport:
+    rows_read: int = 0
+    rows_kept: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    peak_rss_bytes: int = 0  # RSS puncak proses (ru_maxrss) setelah ingest
+    peak_rss_growth_bytes: int = 0  # kenaikan RSS puncak selama ingest (0 jika puncak lama lebih tinggi)
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def _peak_rss():
+    """RSS puncak proses dalam byte (ru_maxrss), termasuk puncak di tengah parse chunk"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss dalam KB di Linux, dalam byte di macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def parse_points(values):
+    """Koordinat ``(lon, lat)`` float32 dari string ``POINT (lon lat)``; NaN jika kosong/tidak valid"""
+    match = pc.extract_regex(pa.array(values, type=pa.string()), _POINT_PATTERN)
+    return tuple(
+        pc.struct_field(match, name).cast(pa.float32()).to_numpy(zero_copy_only=False)
+        for name in ('lon', 'lat')
+    )
+
+
+def clean_chunk(chunk):
+    """Terapkan langkah pembersihan dashboard ke satu chunk"""
+    chunk = chunk.dropna(subset=REQUIRED_COLUMNS)
+    chunk['Model Year'] = chunk['Model Year'].astype(np.int16)
+    chunk['Postal Code'] = chunk['Postal Code'].astype(np.int32)
+    chunk[KEY_COLUMN] = chunk[KEY_COLUMN].astype(np.int64)
+    chunk['Longitude'], chunk['Latitude'] = parse_points(chunk[LOCATION_COLUMN])
+    return chunk
+
+
+def iter_clean_chunks(path, chunk_rows=None, report=None):
+    """Generator chunk bersih dari CSV, kolom yang tidak dipakai tidak di-parse"""
+    reader = pd.read_csv(
+        path,
+        usecols=CSV_COLUMNS,
+        dtype=READ_DTYPES,
+        chunksize=chunk_rows or config.INGEST_CHUNK_ROWS,
+    )
+    with reader:
+        for chunk in reader:
+            if report is not None:
+                report.rows_read += len(chunk)
+                report.chunks += 1
+            yield clean_chunk(chunk[CSV_COLUMNS])[KEEP_COLUMNS]
+
+
+def encode_batch(chunk, builder):
+    arrays = [
+        pa.array(builder.encode(col, chunk[col]) if col in STRING_COLUMNS else chunk[col].to_numpy(),
+                 type=CODES_SCHEMA.field(col).type)
+        for col in KEEP_COLUMNS
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=CODES_SCHEMA)
+
+
+def dictionary_schema(dictionaries):
+    """Skema snapshot: kolom string sebagai dictionary dengan index sekecil mungkin"""
+    return pa.schema([
+        pa.field(col, pa.dictionary(index_type(len(dictionaries[col])), pa.string()))
+        if col in dictionaries else CODES_SCHEMA.field(col)
+        for col in KEEP_COLUMNS
+    ])
+
+
+def to_dictionary_batch(batch, schema, dictionaries):
+    """Ubah batch kode (int32 atau dictionary lama) menjadi batch ``schema``.
+
+    Kode lama tetap berlaku karena kamus hanya pernah diperluas di ujungnya.
+    """
+    arrays = []
+    for field in schema:
+        column = batch.column(field.name)
+        if field.name in dictionaries:
+            if pa.types.is_dictionary(column.type):
+                column = column.indices
+            column = pa.DictionaryArray.from_arrays(
+                column.cast(field.type.index_type), dictionaries[field.name]
+            )
+        arrays.append(column)
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _write_dictionary_file(codes_path, dest, builder):
+    """Tulis ulang batch kode menjadi kolom dictionary Arrow dengan kamus final"""
+    dictionaries = {col: builder.dictionary(col) for col in STRING_COLUMNS}
+    schema = dictionary_schema(dictionaries)
+
+    with pa.memory_map(codes_path) as source, pa.OSFile(dest, 'wb') as sink, \
+            pa.ipc.new_file(sink, schema) as writer:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            writer.write_batch(to_dictionary_batch(reader.get_batch(i), schema, dictionaries))
+
+
+def ingest_csv(path, dest, chunk_rows=None, dictionaries=None):
+    """Stream CSV ``path`` ke file Arrow IPC ``dest`` dan kembalikan IngestReport.
+
+    ``dictionaries`` opsional (kolom -> list label) melanjutkan kamus yang
+    sudah ada, sehingga kode file ini sama dengan kode file sebelumnya.
+    """
+    report = IngestReport()
+    started = time.perf_counter()
+    peak_before = _peak_rss()
+    if dictionaries is None:
+        builder = DictionaryBuilder(STRING_COLUMNS)
+    else:
+        builder = DictionaryBuilder.from_dictionaries({col: dictionaries.get(col, []) for col in STRING_COLUMNS})
+    codes_path = dest + '.codes'
+
+    try:
+        with pa.OSFile(codes_path, 'wb') as sink, pa.ipc.new_file(sink, CODES_SCHEMA) as writer:
+            for chunk in iter_clean_chunks(path, chunk_rows, report):
+                batch = encode_batch(chunk, builder)
+                writer.write_batch(batch)
+                report.rows_kept += batch.num_rows
+
+        _write_dictionary_file(codes_path, dest, builder)
+    finally:
+        if os.path.exists(codes_path):
+            os.remove(codes_path)
+
+    report.seconds = time.perf_counter() - started
+    report.peak_rss_bytes = _peak_rss()
+    report.peak_rss_growth_bytes = report.peak_rss_bytes - peak_before
+    logger.info(
+        "Ingest %s: %d/%d baris, %d chunk, %.2fs, RSS puncak %.1f MB (+%.1f MB)",
+        path, report.rows_kept, report.rows_read, report.chunks,
+        report.seconds, report.peak_rss_bytes / 2**20, report.peak_rss_growth_bytes / 2**20,
+    )
+    return report
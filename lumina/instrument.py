@@ -0,0 +1,196 @@
+"""Span waktu dan penghitung alokasi untuk jalur panas dashboard.
+
+``span(nama)`` mengukur durasi blok kode dan selisih blok memori yang
+dialokasikan Python (``sys.getallocatedblocks``), lalu memasukkannya ke
+histogram per nama dengan bucket tetap. Biayanya hanya dua pembacaan jam dan
+satu lock per span, sehingga aman aktif terus di produksi.
+
+Histogram dan statistik dari collector (mis. cache hasil) bisa dibaca lewat
+``snapshot()``, diformat sebagai teks Prometheus lewat ``prometheus_text()``,
+atau ditulis berkala ke file oleh ``start_exporter()``: ``.prom`` untuk
+textfile collector Prometheus, selain itu satu baris JSON per ekspor.
+"""
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from lumina import config
+
+logger = logging.getLogger(__name__)
+
+# Batas atas bucket histogram latensi (detik)
+BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.alloc_blocks = 0
+
+    def observe(self, seconds, alloc_blocks=0):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if alloc_blocks > 0:
+            self.alloc_blocks += alloc_blocks
+
+    def quantile(self, q):
+        """Perkiraan kuantil dari bucket (batas atas bucket, seperti Prometheus)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.sum / self.count * 1000 if self.count else None,
+            'p50_ms': _ms(self.quantile(0.50)),
+            'p95_ms': _ms(self.quantile(0.95)),
+            'p99_ms': _ms(self.quantile(0.99)),
+            'max_ms': self.max * 1000,
+            'alloc_blocks': self.alloc_blocks,
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else seconds * 1000
+
+
+_histograms = {}
+_collectors = {}
+_lock = threading.Lock()
+
+
+def observe(name, seconds, alloc_blocks=0):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(seconds, alloc_blocks)
+
+
+@contextmanager
+def span(name):
+    """Ukur durasi dan alokasi blok kode ``with`` ke histogram ``name``"""
+    if not config.METRICS_ENABLED:
+        yield
+        return
+    blocks = sys.getallocatedblocks()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        # Selisih blok bersifat global proses; sesi lain yang berjalan bersamaan ikut terhitung
+        observe(name, time.perf_counter() - started, sys.getallocatedblocks() - blocks)
+
+
+def timed(name):
+    """Dekorator: setiap pemanggilan fungsi diukur sebagai span ``name``"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def register_collector(name, collect):
+    """Daftarkan fungsi tanpa argumen yang mengembalikan dict angka (mis. ``ResultCache.stats``)"""
+    with _lock:
+        _collectors[name] = collect
+
+
+def snapshot():
+    """Ringkasan semua span dan nilai collector saat ini"""
+    with _lock:
+        spans = {name: hist.summary() for name, hist in sorted(_histograms.items())}
+        collectors = dict(_collectors)
+    return {
+        'spans': spans,
+        'collectors': {name: collect() for name, collect in collectors.items()},
+    }
+
+
+def prometheus_text():
+    """Histogram dan collector dalam format teks eksposisi Prometheus"""
+    with _lock:
+        hists = [(name, list(h.counts), h.count, h.sum, h.alloc_blocks) for name, h in sorted(_histograms.items())]
+        collectors = dict(_collectors)
+
+    lines = ["# TYPE lumina_span_seconds histogram"]
+    for name, counts, count, total, _ in hists:
+        cumulative = 0
+        for bound, n in zip(BUCKETS, counts):
+            cumulative += n
+            lines.append('lumina_span_seconds_bucket{span="%s",le="%g"} %d' % (name, bound, cumulative))
+        lines.append('lumina_span_seconds_bucket{span="%s",le="+Inf"} %d' % (name, count))
+        lines.append('lumina_span_seconds_sum{span="%s"} %.6f' % (name, total))
+        lines.append('lumina_span_seconds_count{span="%s"} %d' % (name, count))
+    lines.append("# TYPE lumina_span_alloc_blocks_total counter")
+    for name, _, _, _, alloc in hists:
+        lines.append('lumina_span_alloc_blocks_total{span="%s"} %d' % (name, alloc))
+    for collector, collect in collectors.items():
+        for key, value in collect().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append("lumina_%s_%s %s" % (collector, key, value))
+    return "\n".join(lines) + "\n"
+
+
+def export(path):
+    """Tulis snapshot metrik ke ``path`` (.prom: ditimpa atomik, lainnya: tambah satu baris JSON)"""
+    if path.endswith(".prom"):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(prometheus_text())
+        os.replace(tmp, path)
+    else:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(dict(snapshot(), at=time.time(), pid=os.getpid())) + "\n")
+
+
+_exporter = None
+
+
+def start_exporter(path=None, interval=None):
+    """Mulai thread daemon yang mengekspor metrik secara berkala (sekali per proses)"""
+    global _exporter
+    path = path or config.METRICS_EXPORT
+    interval = interval or config.METRICS_EXPORT_INTERVAL
+    if not path or not config.METRICS_ENABLED:
+        return None
+    with _lock:
+        if _exporter is not None:
+            return _exporter
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    export(path)
+                except OSError:
+                    logger.exception("Gagal mengekspor metrik ke %s", path)
+
+        _exporter = threading.Thread(target=loop, name="lumina-metrics", daemon=True)
+        _exporter.start()
+    return _exporter
@@ -0,0 +1,354 @@
+"""Load test banyak sesi paralel terhadap server Streamlit lokal.
+
+Harness menjalankan ``streamlit run app.py`` (atau memakai server yang sudah
+berjalan lewat ``--url``) lalu membuka N sesi websocket sekaligus, persis
+seperti N tab browser. Setiap sesi melakukan run awal, kemudian sejumlah
+interaksi acak di sidebar (slider tahun, tipe EV, multiselect County) dan,
+opsional, pindah tab. Latensi rerun diukur dari pesan rerun dikirim sampai
+server mengirim ``script_finished``.
+
+Laporan berisi p50/p95/p99 latensi (run awal dan rerun, juga per jenis
+interaksi), throughput rerun, jumlah error, serta RSS server: baseline
+setelah satu sesi pemanasan, puncak, dan tambahan memori per sesi.
+
+AppTest tidak dipakai karena satu proses hanya bisa menjalankan satu AppTest
+pada satu waktu, sehingga tidak ada kontensi cache antar sesi yang terukur.
+
+Harness membutuhkan paket ``websockets`` yang tidak dipakai dashboard;
+pasang lewat ``pip install -r requirements-dev.txt``. Contoh::
+
+    python -m lumina.loadtest --sessions 16 --reruns 20 --out loadtest.json
+    LUMINA_RESULT_CACHE_MB=0 python -m lumina.loadtest --sessions 16   # tanpa cache hasil
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Label widget sidebar di app.py
+YEAR_LABEL = "Rentang Tahun Model"
+TYPE_LABEL = "Tipe Kendaraan"
+COUNTY_LABEL = "Pilih County (Opsional)"
+
+INTERACTIONS = ('year', 'type', 'county')
+
+
+class AppWidgets:
+    """ID dan opsi widget sidebar/tab, dibaca dari delta run pertama"""
+
+    def __init__(self):
+        self.year = None
+        self.year_bounds = None
+        self.ev_type = None
+        self.type_options = []
+        self.county = None
+        self.county_options = []
+        self.tabs = None
+        self.tab_labels = []
+
+    def observe(self, delta):
+        kind = delta.WhichOneof("type")
+        if kind == "new_element":
+            element = delta.new_element
+            widget = element.WhichOneof("type")
+            if widget == "slider" and element.slider.label == YEAR_LABEL:
+                self.year = element.slider.id
+                self.year_bounds = (int(element.slider.min), int(element.slider.max))
+            elif widget == "multiselect" and element.multiselect.label == TYPE_LABEL:
+                self.ev_type = element.multiselect.id
+                self.type_options = list(element.multiselect.options)
+            elif widget == "multiselect" and element.multiselect.label == COUNTY_LABEL:
+                self.county = element.multiselect.id
+                self.county_options = list(element.multiselect.options)
+        elif kind == "add_block":
+            block = delta.add_block
+            if block.WhichOneof("type") == "tab_container" and block.tab_container.id:
+                self.tabs = block.tab_container.id
+            elif block.WhichOneof("type") == "tab":
+                self.tab_labels.append(block.tab.label)
+
+    @property
+    def ready(self):
+        return None not in (self.year, self.ev_type, self.county)
+
+
+class Session:
+    """Satu sesi browser: koneksi websocket dan nilai widget saat ini"""
+
+    def __init__(self, url, rng):
+        self.url = url
+        self.rng = rng
+        self.values = {}
+        self.widgets = None
+        self.ws = None
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self):
+        """Kirim rerun dengan nilai widget saat ini; kembalikan ``(detik, error)``"""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        for widget_id, (field, value) in self.values.items():
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            if field == "string_value":
+                state.string_value = value
+            else:
+                getattr(state, field).data.extend(value)
+
+        widgets = AppWidgets() if self.widgets is None else None
+        errors = 0
+        started = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof("type")
+            if kind == "delta":
+                if widgets is not None:
+                    widgets.observe(forward.delta)
+                if forward.delta.new_element.WhichOneof("type") == "exception":
+                    errors += 1
+            elif kind == "script_finished":
+                break
+        elapsed = time.perf_counter() - started
+        if widgets is not None:
+            if not widgets.ready:
+                raise RuntimeError("Widget sidebar tidak ditemukan; label di app.py berubah?")
+            self.widgets = widgets
+        return elapsed, errors
+
+    def interact(self, kinds):
+        """Ubah satu widget secara acak; kembalikan jenis interaksinya"""
+        w = self.widgets
+        rng = self.rng
+        kind = rng.choice(kinds)
+        if kind == 'year':
+            low = rng.randint(*w.year_bounds)
+            high = rng.randint(low, w.year_bounds[1])
+            self.values[w.year] = ("double_array_value", [float(low), float(high)])
+        elif kind == 'type':
+            picked = [t for t in w.type_options if rng.random() < 0.7] or w.type_options[:1]
+            self.values[w.ev_type] = ("string_array_value", picked)
+        elif kind == 'county':
+            picked = rng.sample(w.county_options, rng.randint(0, min(3, len(w.county_options))))
+            self.values[w.county] = ("string_array_value", picked)
+        elif kind == 'tab':
+            self.values[w.tabs] = ("string_value", rng.choice(w.tab_labels))
+        return kind
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {
+        'n': len(ordered),
+        'mean': statistics.fmean(ordered),
+        'p50': pick(0.50),
+        'p95': pick(0.95),
+        'p99': pick(0.99),
+        'max': ordered[-1],
+    }
+
+
+def rss_mb(pid):
+    """RSS proses ``pid`` dalam MB (Linux), None jika tidak tersedia"""
+    try:
+        with open("/proc/%d/status" % pid) as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app_path, port, timeout=300):
+    """Jalankan ``streamlit run`` di background dan tunggu sampai sehat"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app_path,
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server Streamlit berhenti saat startup (exit %s)" % process.returncode)
+        try:
+            with urllib.request.urlopen("http://127.0.0.1:%d/_stcore/health" % port, timeout=2) as resp:
+                if resp.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.5)
+    process.kill()
+    raise RuntimeError("Server Streamlit tidak siap dalam %d detik" % timeout)
+
+
+async def _sample_rss(pid, samples, stop):
+    while not stop.is_set():
+        value = rss_mb(pid)
+        if value is not None:
+            samples.append(value)
+        try:
+            await asyncio.wait_for(stop.wait(), 0.2)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _run_session(session, reruns, kinds, think, record):
+    elapsed, errors = await session.rerun()
+    record('initial', elapsed, errors)
+    for _ in range(reruns):
+        if think > 0:
+            await asyncio.sleep(session.rng.expovariate(1 / think))
+        kind = session.interact(kinds)
+        elapsed, errors = await session.rerun()
+        record(kind, elapsed, errors)
+
+
+async def run_load(url, sessions, reruns, kinds, think=0.0, seed=0, pid=None):
+    """Jalankan load test terhadap ``url`` websocket; kembalikan laporan"""
+    latencies = {}
+    errors = [0]
+
+    def record(kind, elapsed, n_errors):
+        latencies.setdefault(kind, []).append(elapsed)
+        errors[0] += n_errors
+
+    # Sesi pemanasan: memuat dataset/cache resource sebelum baseline memori
+    warm = Session(url, random.Random(seed))
+    await warm.connect()
+    warm_seconds, _ = await warm.rerun()
+    await warm.close()
+    baseline = rss_mb(pid) if pid else None
+
+    samples = []
+    stop = asyncio.Event()
+    sampler = asyncio.ensure_future(_sample_rss(pid, samples, stop)) if pid else None
+
+    clients = [Session(url, random.Random(seed + 1 + i)) for i in range(sessions)]
+    await asyncio.gather(*(client.connect() for client in clients))
+    started = time.perf_counter()
+    await asyncio.gather(*(_run_session(c, reruns, kinds, think, record) for c in clients))
+    wall = time.perf_counter() - started
+    # Ukur saat semua sesi masih terbuka (state sesi belum dibersihkan server)
+    active = rss_mb(pid) if pid else None
+    await asyncio.gather(*(client.close() for client in clients))
+
+    if sampler is not None:
+        stop.set()
+        await sampler
+
+    reruns_all = [v for kind, values in latencies.items() if kind != 'initial' for v in values]
+    total_runs = sum(len(values) for values in latencies.values())
+    report = {
+        'sessions': sessions,
+        'reruns_per_session': reruns,
+        'interactions': list(kinds),
+        'think_seconds': think,
+        'warmup_seconds': warm_seconds,
+        'wall_seconds': wall,
+        'throughput_runs_per_s': total_runs / wall if wall > 0 else None,
+        'errors': errors[0],
+        'initial': percentiles(latencies.get('initial', [])),
+        'rerun': percentiles(reruns_all),
+        'by_interaction': {kind: percentiles(values) for kind, values in latencies.items() if kind != 'initial'},
+    }
+    if pid:
+        report['memory_mb'] = {
+            'baseline': baseline,
+            'active': active,
+            'peak': max(samples + [active or 0]),
+            'per_session': (active - baseline) / sessions if active and baseline else None,
+        }
+    return report
+
+
+def _format_ms(stats):
+    if not stats:
+        return "-"
+    return "p50 %.0fms  p95 %.0fms  p99 %.0fms  (n=%d)" % (
+        stats['p50'] * 1000, stats['p95'] * 1000, stats['p99'] * 1000, stats['n'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test sesi paralel Lumina EV Dashboard")
+    parser.add_argument('--sessions', type=int, default=8, help="jumlah sesi paralel")
+    parser.add_argument('--reruns', type=int, default=20, help="interaksi acak per sesi")
+    parser.add_argument('--think', type=float, default=0.0, help="rata-rata jeda antar interaksi (detik)")
+    parser.add_argument('--tabs', action='store_true', help="ikutkan perpindahan tab dalam interaksi acak")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--app', default=os.path.join(_ROOT_DIR, "app.py"))
+    parser.add_argument('--url', help="URL server yang sudah berjalan, mis. http://localhost:8501")
+    parser.add_argument('--out', help="simpan laporan JSON ke file ini")
+    args = parser.parse_args(argv)
+
+    kinds = INTERACTIONS + (('tab',) if args.tabs else ())
+    server = None
+    if args.url:
+        base = args.url.rstrip("/")
+        pid = None
+    else:
+        port = _free_port()
+        server = start_server(args.app, port)
+        base = "http://127.0.0.1:%d" % port
+        pid = server.pid
+    ws_url = base.replace("http://", "ws://").replace("https://", "wss://") + "/_stcore/stream"
+
+    try:
+        report = asyncio.run(run_load(ws_url, args.sessions, args.reruns, kinds, args.think, args.seed, pid))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print("Sesi: %d x %d rerun, %.1fs, throughput %.1f run/s, error %d" % (
+        report['sessions'], report['reruns_per_session'], report['wall_seconds'],
+        report['throughput_runs_per_s'], report['errors']))
+    print("Run awal : " + _format_ms(report['initial']))
+    print("Rerun    : " + _format_ms(report['rerun']))
+    for kind, stats in report['by_interaction'].items():
+        print("  %-7s: %s" % (kind, _format_ms(stats)))
+    if 'memory_mb' in report:
+        memory = report['memory_mb']
+        print("RSS server: baseline %.0f MB, puncak %.0f MB, per sesi %s" % (
+            memory['baseline'] or 0, memory['peak'] or 0,
+            "%.2f MB" % memory['per_session'] if memory['per_session'] is not None else "-"))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
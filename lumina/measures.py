@@ -0,0 +1,185 @@
+"""Distribusi Electric Range dan Base MSRP dari histogram ber-bin per sel cube.
+
+Untuk setiap ukuran, nilai kendaraan dimasukkan ke bin tetap lalu dihitung
+per sel (Model Year, Electric Vehicle Type, County, Make, bin). Histogram
+bisa dijumlahkan antar sel, sehingga untuk filter sidebar apa pun histogram
+keseluruhan, per Make, dan per Model Year didapat dari irisan cuboid dengan
+mask yang sama seperti cube; persentil p10/p50/p90 diinterpolasi dari
+histogram kumulatif, tanpa mengurutkan baris saat rerun.
+
+Nilai kosong atau 0 (di data DOL berarti belum diriset) tidak dihitung.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from lumina.cube import BASE_DIMS, Cuboid, base_mask, group_counts
+from lumina.encoding import codes_of
+
+RANGE = 'Electric Range'
+MSRP = 'Base MSRP'
+
+# Tepi bawah bin; bin terakhir terbuka ke atas
+BIN_EDGES = {
+    RANGE: np.arange(0, 401, 5, dtype=np.float64),
+    MSRP: np.concatenate([
+        np.arange(0, 100_000, 2_500), np.arange(100_000, 200_000, 10_000),
+        np.arange(200_000, 1_000_001, 50_000),
+    ]).astype(np.float64),
+}
+
+MEASURES = tuple(BIN_EDGES)
+QUANTILES = (0.1, 0.5, 0.9)
+TOP_MAKES = 15
+
+MEASURE_DIMS = BASE_DIMS + ('Make', 'bin')
+
+
+def bin_codes(values, edges):
+    """Indeks bin untuk ``values`` (nilai di atas tepi terakhir masuk bin terakhir)"""
+    return (np.searchsorted(edges, values, side='right') - 1).astype(np.intp)
+
+
+def quantiles(hist, edges, qs=QUANTILES):
+    """Persentil per baris matriks histogram ``hist``, interpolasi linear dalam bin.
+
+    Mengembalikan array ``(len(hist), len(qs))``; NaN untuk baris kosong.
+    Persentil yang jatuh di bin terakhir (terbuka) bernilai tepi bawahnya.
+    """
+    hist = np.atleast_2d(hist).astype(np.float64)
+    cum = np.cumsum(hist, axis=1)
+    total = cum[:, -1]
+    widths = np.append(np.diff(edges), 0.0)
+    out = np.full((len(hist), len(qs)), np.nan)
+    rows = np.flatnonzero(total > 0)
+    for j, q in enumerate(qs):
+        target = q * total[rows]
+        idx = np.minimum((cum[rows] < target[:, None]).sum(axis=1), hist.shape[1] - 1)
+        before = np.where(idx > 0, cum[rows, np.maximum(idx - 1, 0)], 0.0)
+        frac = (target - before) / np.maximum(hist[rows, idx], 1)
+        out[rows, j] = edges[idx] + np.clip(frac, 0, 1) * widths[idx]
+    return out
+
+
+@dataclass
+class MeasureSummary:
+    measure: str
+    n: int
+    percentiles: tuple  # (p10, p50, p90) seluruh kendaraan terfilter
+    histogram: pd.Series  # jumlah kendaraan per tepi bawah bin
+    by_make: pd.DataFrame  # count, p10, p50, p90 untuk Make terbanyak
+    by_year: pd.DataFrame  # count, p10, p50, p90 per Model Year
+
+
+def _quantile_frame(hist, labels, edges):
+    counts = hist.sum(axis=1)
+    values = quantiles(hist, edges)
+    frame = pd.DataFrame(values, index=labels, columns=['p10', 'p50', 'p90'])
+    frame.insert(0, 'count', counts.astype(np.int64))
+    return frame[frame['count'] > 0]
+
+
+def _labels(df, year_min, year_max):
+    labels = {'Model Year': pd.Index(np.arange(year_min, year_max + 1), name='Model Year')}
+    for dim in MEASURE_DIMS[1:-1]:
+        labels[dim] = df[dim].cat.categories
+    return labels
+
+
+def _sizes(labels, measure):
+    return [len(labels[d]) for d in MEASURE_DIMS[:-1]] + [len(BIN_EDGES[measure])]
+
+
+def _histogram_codes(df, year_min):
+    """Kode dimensi dan bin per ukuran untuk baris ``df`` yang nilainya diketahui"""
+    codes = [df['Model Year'].to_numpy().astype(np.intp) - year_min]
+    codes += [codes_of(df[d]) for d in MEASURE_DIMS[1:-1]]
+    parts = {}
+    for measure, edges in BIN_EDGES.items():
+        values = df[measure].to_numpy()
+        known = np.isfinite(values) & (values > 0)
+        parts[measure] = [c[known] for c in codes] + [bin_codes(values[known], edges)]
+    return parts
+
+
+class MeasureCube:
+    def __init__(self, labels, year_min, cuboids):
+        self.labels = labels
+        self.year_min = year_min
+        self.cuboids = cuboids
+
+    @classmethod
+    def from_frame(cls, df):
+        """Bangun cuboid histogram untuk setiap ukuran di ``MEASURES``"""
+        years = df['Model Year'].to_numpy()
+        year_min = int(years.min()) if len(years) else 0
+        labels = _labels(df, year_min, int(years.max()) if len(years) else -1)
+        cuboids = {}
+        for measure, parts in _histogram_codes(df, year_min).items():
+            keys, counts = group_counts(parts, _sizes(labels, measure))
+            cuboids[measure] = Cuboid(MEASURE_DIMS, keys, counts)
+        return cls(labels, year_min, cuboids)
+
+    def apply_delta(self, removed, added):
+        """Histogram baru setelah baris ``removed`` dikurangi dan ``added`` ditambahkan.
+
+        Sama seperti ``AggregateCube.apply_delta``: ``added`` berasal dari frame
+        snapshot baru, baris ``removed`` masuk dengan bobot -1, dan cube lama
+        tidak diubah.
+        """
+        years = np.concatenate([removed['Model Year'].to_numpy(), added['Model Year'].to_numpy()])
+        year_min = self.year_min
+        year_max = year_min + len(self.labels['Model Year']) - 1
+        if len(years):
+            year_min = min(year_min, int(years.min())) if year_max >= year_min else int(years.min())
+            year_max = max(year_max, int(years.max()))
+        labels = _labels(added, year_min, year_max) if len(added) else dict(self.labels, **{
+            'Model Year': pd.Index(np.arange(year_min, year_max + 1), name='Model Year')
+        })
+        shift = self.year_min - year_min
+        deltas = [(_histogram_codes(removed, year_min), -1), (_histogram_codes(added, year_min), 1)]
+
+        cuboids = {}
+        for measure, cuboid in self.cuboids.items():
+            parts = [[cuboid.keys[d].astype(np.intp) + (shift if d == 'Model Year' else 0) for d in MEASURE_DIMS]]
+            weights = [cuboid.counts]
+            for codes, sign in deltas:
+                parts.append(codes[measure])
+                weights.append(np.full(len(codes[measure][0]), sign, dtype=np.int64))
+            keys, counts = group_counts(
+                [np.concatenate(p) for p in zip(*parts)], _sizes(labels, measure),
+                weights=np.concatenate(weights).astype(np.float64),
+            )
+            cuboids[measure] = Cuboid(MEASURE_DIMS, keys, counts)
+        return MeasureCube(labels, year_min, cuboids)
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.cuboids.values())
+
+    def _hist(self, cuboid, mask, dim, n_bins):
+        size = len(self.labels[dim])
+        flat = cuboid.keys[dim][mask].astype(np.intp) * n_bins + cuboid.keys['bin'][mask]
+        dense = np.bincount(flat, weights=cuboid.counts[mask], minlength=size * n_bins)
+        return dense.reshape(size, n_bins)
+
+    def summary(self, measure, state):
+        """Histogram dan persentil ``measure`` untuk kendaraan yang lolos ``state``"""
+        edges = BIN_EDGES[measure]
+        cuboid = self.cuboids[measure]
+        mask = base_mask(cuboid, self.labels, self.year_min, state)
+        by_make = self._hist(cuboid, mask, 'Make', len(edges))
+        by_year = self._hist(cuboid, mask, 'Model Year', len(edges))
+        overall = by_year.sum(axis=0)
+
+        makes = _quantile_frame(by_make, self.labels['Make'], edges)
+        makes = makes.sort_values('count', ascending=False, kind='stable').head(TOP_MAKES)
+        return MeasureSummary(
+            measure=measure,
+            n=int(overall.sum()),
+            percentiles=tuple(float(v) for v in quantiles(overall, edges)[0]),
+            histogram=pd.Series(overall.astype(np.int64), index=edges, name='count'),
+            by_make=makes,
+            by_year=_quantile_frame(by_year, self.labels['Model Year'], edges),
+        )
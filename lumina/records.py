@@ -0,0 +1,178 @@
+"""Indeks urut dan pencarian untuk penjelajah data kendaraan per baris.
+
+``RecordIndex`` menyiapkan, per kolom urut, permutasi baris yang sudah
+terurut (dibangun sekali per kolom lalu dipakai ulang semua sesi), dan per
+kolom cari, kamus label huruf kecil beserta kode barisnya. Pencarian teks
+cukup mencocokkan kata ke label kamus (ratusan label, bukan jutaan baris)
+lalu memetakannya ke baris lewat tabel lookup kode.
+
+Seleksi (filter sidebar + pencarian + urutan) disimpan ringkas: bitset
+baris yang cocok (n/8 byte) plus jumlah kumulatif baris cocok per blok
+``SELECTION_BLOCK`` posisi permutasi urut, bukan daftar nomor baris. Membalik
+halaman cukup memindai satu-dua blok permutasi di sekitar halaman itu lalu
+mengambil ``page_size`` baris dari frame, sehingga biayanya tidak bergantung
+pada jumlah kendaraan yang cocok.
+"""
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from lumina.bitmap import contains, pack
+from lumina.encoding import codes_of
+
+SORT_COLUMNS = ('Model Year', 'Make', 'Model', 'City', 'County', 'Postal Code', 'Electric Range', 'Base MSRP')
+SEARCH_COLUMNS = ('Make', 'Model', 'City', 'Postal Code')
+DISPLAY_COLUMNS = [
+    'Model Year', 'Make', 'Model', 'Electric Vehicle Type', 'City', 'County',
+    'Postal Code', 'Electric Range', 'Base MSRP', 'Electric Utility'
+]
+
+DEFAULT_SORT = 'Model Year'
+
+# Jumlah posisi permutasi urut per blok hitungan kumulatif seleksi
+SELECTION_BLOCK = 4096
+
+
+@dataclass(frozen=True)
+class RecordQuery:
+    """Permintaan penjelajah data; menjadi bagian key cache hasil"""
+    filter_state: object
+    search: str = ''
+    sort: str = DEFAULT_SORT
+    descending: bool = True
+
+    @classmethod
+    def from_widgets(cls, filter_state, search, sort, descending):
+        """Normalisasi input: huruf besar/kecil dan spasi berlebih tidak memengaruhi query"""
+        return cls(filter_state, ' '.join(search.lower().split()), sort, bool(descending))
+
+
+@dataclass
+class RecordSelection:
+    resolved: object  # ResolvedFilters yang dipakai untuk seleksi
+    bits: np.ndarray  # bitset uint64 baris frame yang cocok
+    sort: str
+    descending: bool
+    offsets: np.ndarray  # jumlah baris cocok sebelum setiap blok permutasi urut (n_blok + 1)
+
+    @property
+    def total(self):
+        return int(self.offsets[-1])
+
+
+def _positions(segments, start, stop):
+    """Isi posisi ``[start, stop)`` dari gabungan ``segments`` tanpa menyalin seluruhnya"""
+    parts = []
+    for segment in segments:
+        if start < len(segment) and stop > 0:
+            parts.append(segment[max(start, 0):stop])
+        start -= len(segment)
+        stop -= len(segment)
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+def _row_index_dtype(n_rows):
+    return np.int32 if n_rows <= np.iinfo(np.int32).max else np.int64
+
+
+class RecordIndex:
+    def __init__(self, frame, terms=None, orders=None):
+        # ``terms``/``orders`` opsional berisi struktur yang sudah dibangun (mis. dari lumina.shared)
+        self.frame = frame
+        self.n_rows = len(frame)
+        self._orders = dict(orders or {})
+        self._lock = threading.Lock()
+        self.terms = dict(terms or {})
+        for col in SEARCH_COLUMNS:
+            if col in self.terms:
+                continue
+            series = frame[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                labels, codes = series.cat.categories, codes_of(series)
+            else:
+                uniques, codes = np.unique(series.to_numpy(), return_inverse=True)
+                labels = pd.Index(uniques)
+            self.terms[col] = (pd.Index(labels.astype(str).str.lower()), codes)
+
+    def order(self, column):
+        """Permutasi baris terurut naik menurut ``column`` (nilai kosong di akhir) dan jumlah nilai kosong"""
+        with self._lock:
+            cached = self._orders.get(column)
+            if cached is None:
+                cached = self._orders[column] = self._build_order(column)
+            return cached
+
+    def _build_order(self, column):
+        series = self.frame[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            # Peringkat label alfabetis per kode; slot terakhir untuk kode -1 (NaN)
+            rank = np.empty(len(categories) + 1, dtype=np.int64)
+            rank[np.argsort(np.asarray(categories.astype(str)), kind='stable')] = np.arange(len(categories))
+            rank[-1] = len(categories)
+            codes = codes_of(series)
+            key, missing = rank[codes], int((codes < 0).sum())
+        else:
+            key = series.to_numpy()
+            missing = int(np.isnan(key).sum()) if key.dtype.kind == 'f' else 0
+        order = np.argsort(key, kind='stable').astype(_row_index_dtype(self.n_rows))
+        return order, missing
+
+    def _sorted(self, column, descending):
+        """Permutasi urut sebagai potongan view (tanpa salinan) sesuai arah urutan"""
+        order, missing = self.order(column)
+        if not descending:
+            return (order,)
+        # Dibalik tetapi nilai kosong tetap di akhir
+        present = len(order) - missing
+        return (order[:present][::-1], order[present:][::-1])
+
+    @property
+    def nbytes(self):
+        return sum(order.nbytes for order, _ in self._orders.values()) + sum(
+            codes.nbytes for _, codes in self.terms.values()
+        )
+
+    def search_mask(self, search):
+        """Mask baris yang memuat setiap kata ``search`` di salah satu kolom ``SEARCH_COLUMNS``"""
+        mask = None
+        for token in search.split():
+            token_mask = np.zeros(self.n_rows, dtype=bool)
+            for labels, codes in self.terms.values():
+                lut = np.append(labels.str.contains(token, regex=False), False)
+                if lut.any():
+                    token_mask |= lut[codes]
+            mask = token_mask if mask is None else mask & token_mask
+        return mask
+
+    def select(self, mask, search='', sort=DEFAULT_SORT, descending=True, resolved=None):
+        """``RecordSelection`` baris dalam ``mask`` yang cocok dengan ``search``, terurut menurut ``sort``"""
+        if search:
+            mask = mask & self.search_mask(search)
+        hits = np.concatenate([mask[segment] for segment in self._sorted(sort, descending)])
+        counts = np.add.reduceat(hits, np.arange(0, len(hits), SELECTION_BLOCK)) if len(hits) else hits
+        offsets = np.concatenate([[0], np.cumsum(counts, dtype=np.int64)])
+        return RecordSelection(resolved, pack(mask), sort, descending, offsets)
+
+    def rows(self, selection, start, stop):
+        """Nomor baris hasil ``selection`` pada peringkat ``[start, stop)`` sesuai urutannya"""
+        offsets = selection.offsets
+        stop = min(stop, selection.total)
+        if start >= stop:
+            return np.zeros(0, dtype=np.int64)
+        # Blok pertama yang memuat peringkat ``start`` sampai blok yang mencakup ``stop``
+        first = int(np.searchsorted(offsets, start, side='right')) - 1
+        last = int(np.searchsorted(offsets, stop, side='left'))
+        candidates = _positions(
+            self._sorted(selection.sort, selection.descending), first * SELECTION_BLOCK, last * SELECTION_BLOCK
+        )
+        rows = candidates[contains(selection.bits, candidates)]
+        skip = start - int(offsets[first])
+        return rows[skip:skip + stop - start]
+
+    def page(self, selection, page, page_size):
+        """Frame baris halaman ``page`` (mulai 0) dari ``selection``"""
+        start = page * page_size
+        return self.frame.take(self.rows(selection, start, start + page_size))[DISPLAY_COLUMNS]
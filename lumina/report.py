@@ -0,0 +1,43 @@
+"""Isi halaman dashboard (kartu metrik dan sumber data grafik) tanpa Streamlit.
+
+Dipakai ``app.py`` untuk menampilkan halaman dan ``lumina.batch`` untuk
+merender laporan statis, sehingga keduanya selalu menghasilkan angka yang sama.
+"""
+from lumina.aggregates import BEV, PHEV
+from lumina.filters import resolve_filters
+
+# Grafik per tab beserta field DashboardAggregates yang menjadi datanya
+TAB_CHARTS = {
+    'Geografis': [('county_bar', 'top_counties'), ('city_bar', 'top_cities')],
+    'Tren': [('trend', 'trend')],
+    'Merek': [('make_treemap', 'top_makes'), ('model_sunburst', 'model_tree')],
+    'Tipe EV': [('type_bar', 'type_counts'), ('type_stack', 'type_by_county')],
+    'Lanjutan': [('utility_bar', 'top_utilities'), ('heatmap', 'heatmap')],
+}
+
+CHART_SOURCES = {kind: field for charts in TAB_CHARTS.values() for kind, field in charts}
+
+
+def metric_cards(agg):
+    """Kartu metrik halaman sebagai list ``(label, nilai, delta)``"""
+    total = agg.total
+    total_all = agg.total_all
+    bev = agg.type_count(BEV)
+    phev = agg.type_count(PHEV)
+    return [
+        ("Total Kendaraan", f"{total:,}", f"{(total/total_all*100):.1f}% dari total" if total_all > 0 else "N/A"),
+        ("Total BEV", f"{bev:,}", f"{(bev/total*100):.1f}%" if total > 0 else "0.0%"),
+        ("Total PHEV", f"{phev:,}", f"{(phev/total*100):.1f}%" if total > 0 else "0.0%"),
+        ("Merek", f"{agg.n_makes}", f"{agg.n_models} model"),
+    ]
+
+
+def chart_data(agg, kind):
+    """Data untuk grafik ``kind`` (lihat ``lumina.figures.CHARTS``)"""
+    return getattr(agg, CHART_SOURCES[kind])
+
+
+def cube_page(cube, state):
+    """``(resolved, agg)`` untuk ``state`` langsung dari cube, tanpa frame baris"""
+    resolved = resolve_filters(state, cube.count)
+    return resolved, cube.aggregates(resolved.state)
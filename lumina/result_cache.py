@@ -0,0 +1,148 @@
+"""Cache LRU lintas-sesi untuk hasil agregasi per state filter.
+
+Semua sesi memakai dataset yang sama, sehingga hasil untuk state filter yang
+sama (terutama state default) cukup dihitung sekali per proses. Cache dibatasi
+jumlah byte, mengusir entri yang paling lama tidak dipakai, dan menyimpan
+penghitung hit/miss/eviction yang bisa dibaca lewat ``stats()``.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+
+import numpy as np
+import pandas as pd
+
+
+def sizeof(value):
+    """Perkiraan ukuran memori ``value`` dalam byte"""
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, pd.Index):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if is_dataclass(value) and not isinstance(value, type):
+        return sys.getsizeof(value) + sum(sizeof(getattr(value, f.name)) for f in fields(value))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes=None):
+        nbytes = sizeof(value) if nbytes is None else nbytes
+        with self._lock:
+            self._put_locked(key, value, nbytes)
+
+    def _put_locked(self, key, value, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._entries[key] = (value, nbytes)
+        self.bytes += nbytes
+        while self.bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.bytes -= evicted_bytes
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Ambil hasil untuk ``key``; hitung sekali jika belum ada.
+
+        Jika sesi lain sedang menghitung key yang sama, tunggu hasilnya alih-alih
+        menghitung ulang secara paralel.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self._inflight[key] = threading.Event()
+                    break
+            pending.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+            # Penghitung sebelumnya gagal atau hasilnya terlalu besar: coba lagi
+
+        try:
+            value = compute()
+            nbytes = sizeof(value)
+            with self._lock:
+                self._put_locked(key, value, nbytes)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set()
+
+    def keys(self):
+        """Key yang tersimpan, dari yang paling lama tidak dipakai ke yang terbaru"""
+        with self._lock:
+            return list(self._entries)
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        # Tidak menghitung hit/miss dan tidak mengubah urutan LRU
+        with self._lock:
+            return key in self._entries
+
+    def stats(self):
+        """Ringkasan penghitung cache untuk inspeksi/monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
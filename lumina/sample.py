@@ -0,0 +1,146 @@
+"""Sampel berstrata untuk mode perkiraan (``LUMINA_APPROXIMATE=1``).
+
+Strata adalah kombinasi County x Tipe EV x Model Year, yaitu persis dimensi
+filter sidebar. Setiap stratum diambil sampelnya secara proporsional (minimal
+``MIN_PER_STRATUM`` baris) dan setiap baris sampel berbobot ``N_h / n_h``.
+Karena filter hanya memilih strata utuh, total, BEV/PHEV, County, dan tren
+per tahun hasil estimasi sama persis dengan nilai sebenarnya; yang diperkirakan
+hanya dimensi di luar strata (City, Make, Model, Utility) dan jumlah merek/model.
+
+Margin galat 95% per kategori memakai varians estimator total berstrata::
+
+    Var = sum_h N_h^2 (1 - n_h/N_h) p_h (1 - p_h) / (n_h - 1)
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from lumina import config
+from lumina.cube import BASE_DIMS, Cuboid, base_mask
+from lumina.encoding import codes_of
+from lumina.engine import AggregationEngine
+
+STRATA_DIMS = BASE_DIMS
+MIN_PER_STRATUM = 2
+Z_95 = 1.96
+
+# Field DashboardAggregates yang diperkirakan beserta dimensi kategorinya
+APPROX_FIELDS = {
+    'top_cities': 'City',
+    'top_makes': 'Make',
+    'top_models': 'Model',
+    'top_utilities': 'Electric Utility',
+}
+# Semua field yang nilainya perkiraan (heatmap, pohon drill-down, dan jumlah merek/model tanpa margin)
+ESTIMATED_FIELDS = tuple(APPROX_FIELDS) + ('heatmap', 'model_tree', 'n_makes', 'n_models')
+
+
+@dataclass
+class Estimate:
+    agg: object  # DashboardAggregates dari baris sampel berbobot
+    margins: dict  # field -> Series margin galat 95% sejajar dengan index field tersebut
+    sample_rows: int  # baris sampel yang lolos filter
+
+    def margin(self, field):
+        """Margin galat 95% terbesar untuk field ``field`` (0 jika pasti, None jika tidak dihitung)"""
+        if field in self.margins:
+            margins = self.margins[field]
+            return float(margins.max()) if len(margins) else 0.0
+        return None
+
+
+class StratifiedSample:
+    def __init__(self, labels, year_min, strata, taken, sample_strata, weights, engine):
+        self.labels = labels
+        self.year_min = year_min
+        self.strata = strata  # Cuboid STRATA_DIMS dengan counts = jumlah baris populasi N_h
+        self.taken = taken  # jumlah baris sampel n_h per stratum
+        self.sample_strata = sample_strata  # indeks stratum per baris sampel
+        self.weights = weights  # N_h / n_h per baris sampel
+        self.engine = engine
+
+    @classmethod
+    def from_frame(cls, df, target_rows=None, seed=0):
+        """Ambil sampel berstrata sekitar ``target_rows`` baris dari frame kendaraan"""
+        target_rows = target_rows or config.SAMPLE_ROWS
+        n_rows = len(df)
+        years = df['Model Year'].to_numpy()
+        year_min = int(years.min()) if n_rows else 0
+        labels = {
+            'Model Year': pd.Index(np.arange(year_min, int(years.max()) + 1 if n_rows else 0), name='Model Year'),
+            'Electric Vehicle Type': df['Electric Vehicle Type'].cat.categories,
+            'County': df['County'].cat.categories,
+        }
+        codes = [
+            years.astype(np.intp) - year_min,
+            codes_of(df['Electric Vehicle Type']).astype(np.intp),
+            codes_of(df['County']).astype(np.intp),
+        ]
+        sizes = [len(labels[d]) for d in STRATA_DIMS]
+        flat = np.ravel_multi_index(codes, sizes) if n_rows else np.zeros(0, dtype=np.intp)
+        cells, stratum, population = np.unique(flat, return_inverse=True, return_counts=True)
+
+        rate = min(1.0, target_rows / n_rows) if n_rows else 1.0
+        taken = np.minimum(population, np.maximum(np.ceil(population * rate), MIN_PER_STRATUM)).astype(np.int64)
+
+        # Urutan acak di dalam setiap stratum; ambil n_h baris pertama per stratum
+        rng = np.random.default_rng(seed)
+        order = np.lexsort((rng.random(n_rows), stratum))
+        starts = np.concatenate([[0], np.cumsum(population)[:-1]]).astype(np.int64)
+        ordered_strata = stratum[order]
+        rank = np.arange(n_rows) - starts[ordered_strata]
+        rows = np.sort(order[rank < taken[ordered_strata]])
+
+        sample_strata = stratum[rows]
+        weights = (population / taken)[sample_strata]
+        sample = AggregationEngine.from_frame(df.take(rows))
+        engine = AggregationEngine(sample.codes, sample.labels, n_rows)
+        keys = [k.astype(np.uint32) for k in np.unravel_index(cells, sizes)]
+        strata = Cuboid(STRATA_DIMS, keys, population.astype(np.int64))
+        return cls(labels, year_min, strata, taken, sample_strata, weights, engine)
+
+    def __len__(self):
+        return len(self.sample_strata)
+
+    @property
+    def nbytes(self):
+        return (
+            self.strata.nbytes + self.taken.nbytes + self.sample_strata.nbytes + self.weights.nbytes
+            + sum(codes.nbytes for codes in self.engine.codes.values())
+        )
+
+    def _strata_mask(self, state):
+        return base_mask(self.strata, self.labels, self.year_min, state)
+
+    def count(self, state):
+        """Jumlah kendaraan populasi yang lolos ``state`` (pasti, dari ukuran strata)"""
+        return int(self.strata.counts[self._strata_mask(state)].sum())
+
+    def estimate(self, state):
+        """``Estimate`` angka halaman untuk ``state`` dari baris sampel berbobot"""
+        rows = np.flatnonzero(self._strata_mask(state)[self.sample_strata])
+        agg = self.engine.aggregates(rows, self.weights[rows])
+        margins = {
+            field: self._margins(rows, dim, getattr(agg, field).index)
+            for field, dim in APPROX_FIELDS.items()
+        }
+        return Estimate(agg, margins, len(rows))
+
+    def _margins(self, rows, dim, index):
+        """Margin galat 95% estimasi jumlah kendaraan untuk kategori ``index`` dimensi ``dim``"""
+        k = len(index)
+        lut = np.full(len(self.engine.labels[dim]) + 1, -1, dtype=np.intp)  # slot terakhir untuk kode -1
+        lut[self.engine.labels[dim].get_indexer(index)] = np.arange(k)
+        local = lut[self.engine.codes[dim][rows]]
+        hit = local >= 0
+        n_strata = len(self.taken)
+        hits = np.bincount(
+            self.sample_strata[rows][hit] * k + local[hit], minlength=n_strata * k
+        ).reshape(n_strata, k)
+
+        taken = self.taken[:, None].astype(np.float64)
+        population = self.strata.counts[:, None].astype(np.float64)
+        p = hits / taken
+        variance = population ** 2 * (1 - taken / population) * p * (1 - p) / np.maximum(taken - 1, 1)
+        return pd.Series(Z_95 * np.sqrt(variance.sum(axis=0)), index=index)
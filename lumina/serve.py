@@ -0,0 +1,33 @@
+"""Jalankan server Streamlit dashboard dengan pemanasan saat boot.
+
+Contoh::
+
+    LUMINA_READY_PORT=8502 python -m lumina.serve --server.port 8501
+
+Pemanasan (``lumina.warmup``) dimulai sebelum server menerima koneksi dan
+berjalan di proses yang sama, sehingga sesi pertama memakai dataset dan cache
+hasil yang sudah hangat. Server menjalankan ``server.py`` (``st.App`` dengan
+route unduhan ekspor). Argumen tambahan diteruskan ke ``streamlit run``.
+"""
+import logging
+import os
+import sys
+
+from lumina import config, warmup
+
+SERVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server.py")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    warmup.start()
+    if config.READY_PORT:
+        warmup.serve_readiness(config.READY_PORT)
+
+    from streamlit.web import cli
+    return cli.main(["run", SERVER_PATH] + list(argv), prog_name="streamlit")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
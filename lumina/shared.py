@@ -0,0 +1,265 @@
+"""Dataset bersama lintas proses server lewat file memory-map (``LUMINA_SHARED_DIR``).
+
+Jika beberapa proses Streamlit berjalan di satu host, normalnya setiap proses
+memegang salinan frame kendaraan dan indeks per barisnya sendiri. Pada mode
+ini satu proses (pemegang lock file) mempublikasikan kolom frame (kode kamus
+dan nilai numerik) serta array indeks per baris (bitmap filter, kode tahun
+engine, urutan dan kamus cari penjelajah data) sebagai file ``.npy`` di satu
+folder per snapshot. Semua proses, termasuk penerbitnya, membukanya dengan
+``np.load(mmap_mode='r')``: halaman memorinya dibagi lewat page cache OS dan
+array bersifat read-only. Dengan begitu memori per host tidak bertambah saat
+proses ditambah. Folder di tmpfs (mis. ``/dev/shm/lumina``) berarti
+shared memory murni.
+
+Tabel Arrow untuk ekspor juga dibangun di atas array yang sama. Struktur
+teragregasi (cube, piramida tile, histogram ukuran) berukuran kecil
+dan tetap dibangun per proses. Contoh publikasi sebelum worker dijalankan::
+
+    LUMINA_SHARED_DIR=/dev/shm/lumina python -m lumina.shared
+"""
+import argparse
+import contextlib
+import functools
+import json
+import logging
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:  # tanpa lock, publikasi ganda tetap aman karena rename folder atomik
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from lumina import config
+from lumina.bitmap import DEFAULT_DIMS, BitmapIndex, ValueBitmaps
+from lumina.engine import AggregationEngine
+from lumina.records import SEARCH_COLUMNS, SORT_COLUMNS, RecordIndex
+from lumina.snapshot import load_vehicle_frame, read_manifest, read_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Naikkan setiap kali isi/tata letak folder bersama berubah
+SHARED_LAYOUT = 1
+
+META_NAME = "meta.json"
+LOCK_NAME = ".lock"
+
+
+def _shared_path(snapshot_path, shared_dir):
+    return os.path.join(shared_dir, os.path.splitext(os.path.basename(snapshot_path))[0])
+
+
+def _read_meta(path, snapshot_path):
+    """Metadata folder bersama ``path``, atau None jika belum ada/usang untuk ``snapshot_path``"""
+    try:
+        with open(os.path.join(path, META_NAME), encoding="utf-8") as f:
+            meta = json.load(f)
+        mtime = os.stat(snapshot_path).st_mtime_ns
+    except (OSError, ValueError):
+        return None
+    if meta.get('layout') != SHARED_LAYOUT or meta.get('snapshot_mtime') != mtime:
+        return None
+    return meta
+
+
+@contextlib.contextmanager
+def _lock(shared_dir):
+    with open(os.path.join(shared_dir, LOCK_NAME), "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _remove_stale(shared_dir, snapshot_dir):
+    """Hapus folder sisa publikasi gagal dan folder snapshot yang sudah tidak ada.
+
+    Proses yang masih memetakan file lama tidak terganggu: di POSIX mapping
+    tetap valid sampai ditutup walaupun filenya sudah dihapus.
+    """
+    for entry in os.listdir(shared_dir):
+        path = os.path.join(shared_dir, entry)
+        if not os.path.isdir(path):
+            continue
+        if ".tmp-" in entry or not os.path.exists(os.path.join(snapshot_dir, entry + ".arrow")):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def publish(snapshot_path, path, dims=None):
+    """Tulis kolom frame dan indeks per baris snapshot ``snapshot_path`` ke folder ``path``"""
+    dims = dims or DEFAULT_DIMS + config.BITMAP_EXTRA_DIMS
+    frame = read_snapshot(snapshot_path)
+    tmp = "%s.tmp-%d" % (path, os.getpid())
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    arrays = {}
+
+    def save(key, values):
+        name = "%d.npy" % len(arrays)
+        np.save(os.path.join(tmp, name), np.ascontiguousarray(values))
+        arrays[key] = name
+
+    columns = []
+    for col in frame.columns:
+        series = frame[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            save('frame/' + col, series.array.codes)
+            columns.append(dict(name=col, categories=series.cat.categories.tolist()))
+        else:
+            save('frame/' + col, series.to_numpy())
+            columns.append(dict(name=col))
+
+    index = BitmapIndex.from_frame(frame, dims)
+    save('bitmap/year_le', index.year_le)
+    bitmaps = {}
+    for dim, values in index.value_bitmaps.items():
+        dense, sparse = sorted(values.dense), sorted(values.sparse)
+        save('bitmap/%s/dense' % dim, np.stack([values.dense[code] for code in dense]) if dense
+             else np.zeros((0, len(index.all_bits)), dtype=np.uint64))
+        save('bitmap/%s/sparse' % dim, np.concatenate([values.sparse[code] for code in sparse]) if sparse
+             else np.zeros(0, dtype=np.uint32))
+        bounds = np.cumsum([0] + [len(values.sparse[code]) for code in sparse])
+        bitmaps[dim] = dict(dense=dense, sparse=sparse, bounds=bounds.tolist())
+
+    save('engine/Model Year', AggregationEngine.from_frame(frame).codes['Model Year'])
+
+    records = RecordIndex(frame)
+    missing = {}
+    for col in SORT_COLUMNS:
+        order, missing[col] = records.order(col)
+        save('records/order/' + col, order)
+    terms = {}
+    for col in SEARCH_COLUMNS:
+        # Kolom kategorikal memakai kode frame langsung; hanya kolom lain yang disimpan
+        if not isinstance(frame[col].dtype, pd.CategoricalDtype):
+            labels, codes = records.terms[col]
+            save('records/terms/' + col, codes)
+            terms[col] = labels.tolist()
+
+    meta = dict(
+        layout=SHARED_LAYOUT, snapshot=os.path.basename(snapshot_path),
+        snapshot_mtime=os.stat(snapshot_path).st_mtime_ns, n_rows=len(frame), columns=columns,
+        arrays=arrays, bitmap=dict(year_min=index.year_min, dims=bitmaps),
+        records=dict(missing=missing, terms=terms),
+    )
+    with open(os.path.join(tmp, META_NAME), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmp, path)
+    logger.info("Dataset bersama dipublikasikan ke %s (%d baris)", path, len(frame))
+
+
+class SharedSnapshot:
+    def __init__(self, path, meta):
+        self.path = path
+        self.meta = meta
+        self.n_rows = meta['n_rows']
+        # np.asarray: ndarray biasa (bukan subclass memmap) yang tetap merujuk mapping file
+        self.arrays = {
+            key: np.asarray(np.load(os.path.join(path, name), mmap_mode='r'))
+            for key, name in meta['arrays'].items()
+        }
+        self.frame = self._frame()
+
+    def _frame(self):
+        data = {}
+        for column in self.meta['columns']:
+            values = self.arrays['frame/' + column['name']]
+            if 'categories' in column:
+                values = pd.Categorical.from_codes(values, pd.Index(column['categories']), validate=False)
+            data[column['name']] = values
+        # copy=False: kolom tetap merujuk array memory-map, tanpa salinan per proses
+        return pd.DataFrame(data, copy=False)
+
+    def table(self):
+        """Frame sebagai tabel Arrow yang kolomnya merujuk buffer memory-map (tanpa salinan per proses)"""
+        arrays = []
+        for column in self.meta['columns']:
+            values = self.arrays['frame/' + column['name']]
+            if 'categories' in column:
+                # Kode -1 (nilai kosong) menjadi null; kamus kategori kecil dibangun per proses
+                missing = values < 0
+                indices = pa.array(values, mask=missing if missing.any() else None)
+                categories = self.frame[column['name']].cat.categories
+                arrays.append(pa.DictionaryArray.from_arrays(indices, pa.Array.from_pandas(categories)))
+            else:
+                # from_pandas: NaN menjadi null seperti pa.Table.from_pandas
+                arrays.append(pa.array(values, from_pandas=True))
+        return pa.Table.from_arrays(arrays, names=[column['name'] for column in self.meta['columns']])
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.arrays.values())
+
+    def bitmap_index(self, dims):
+        """``BitmapIndex`` untuk ``dims`` dari array bersama, atau None jika ada dimensi yang tidak dipublikasikan"""
+        meta = self.meta['bitmap']
+        if not set(dims) <= set(meta['dims']):
+            return None
+        value_bitmaps = {}
+        for dim in dims:
+            parts = meta['dims'][dim]
+            dense = self.arrays['bitmap/%s/dense' % dim]
+            sparse = self.arrays['bitmap/%s/sparse' % dim]
+            bounds = parts['bounds']
+            value_bitmaps[dim] = ValueBitmaps(
+                self.frame[dim].cat.categories, self.n_rows,
+                dict(zip(parts['dense'], dense)),
+                {code: sparse[bounds[i]:bounds[i + 1]] for i, code in enumerate(parts['sparse'])},
+            )
+        return BitmapIndex(self.n_rows, meta['year_min'], self.arrays['bitmap/year_le'], value_bitmaps)
+
+    def engine(self):
+        return AggregationEngine.from_frame(self.frame, year_codes=self.arrays['engine/Model Year'])
+
+    def records(self):
+        meta = self.meta['records']
+        terms = {
+            col: (pd.Index(labels), self.arrays['records/terms/' + col]) for col, labels in meta['terms'].items()
+        }
+        orders = {col: (self.arrays['records/order/' + col], missing) for col, missing in meta['missing'].items()}
+        return RecordIndex(self.frame, terms, orders)
+
+
+@functools.lru_cache(maxsize=2)
+def attach(snapshot_path, shared_dir=None):
+    """``SharedSnapshot`` untuk file snapshot ``snapshot_path``; dipublikasikan dulu jika belum ada.
+
+    Hanya satu proses yang mempublikasikan (lock file); proses lain menunggu
+    lalu langsung membuka hasilnya.
+    """
+    shared_dir = shared_dir or config.SHARED_DIR
+    os.makedirs(shared_dir, exist_ok=True)
+    path = _shared_path(snapshot_path, shared_dir)
+    meta = _read_meta(path, snapshot_path)
+    if meta is None:
+        with _lock(shared_dir):
+            meta = _read_meta(path, snapshot_path)
+            if meta is None:
+                _remove_stale(shared_dir, os.path.dirname(snapshot_path))
+                publish(snapshot_path, path)
+                meta = _read_meta(path, snapshot_path)
+    return SharedSnapshot(path, meta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publikasikan snapshot dataset ke folder bersama untuk semua proses server")
+    parser.add_argument('--shared-dir', default=config.SHARED_DIR)
+    parser.add_argument('--source', default=None, help="path/URL CSV (default LUMINA_DATA_SOURCE)")
+    parser.add_argument('--snapshot-dir', default=config.SNAPSHOT_DIR)
+    args = parser.parse_args(argv)
+    if not args.shared_dir:
+        parser.error("--shared-dir atau LUMINA_SHARED_DIR wajib diisi")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    load_vehicle_frame(args.source, args.snapshot_dir)
+    manifest = read_manifest(args.snapshot_dir)
+    shared = attach(os.path.join(args.snapshot_dir, manifest['file']), args.shared_dir)
+    print("%s\t%d baris\t%.1f MB" % (shared.path, shared.n_rows, shared.nbytes / 2**20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""Snapshot kolumnar lokal untuk frame kendaraan yang sudah dibersihkan.
+
+CSV sumber hanya di-parse sekali. Hasilnya disimpan sebagai file Arrow IPC
+tanpa kompresi sehingga bisa dibuka lewat memory-map pada startup berikutnya.
+Manifest JSON di sebelahnya menyimpan fingerprint (SHA-256 isi CSV) dan
+snapshot otomatis dibangun ulang ketika isi sumber berubah. ``refresh_snapshot``
+memperbarui snapshot secara inkremental dari delta per DOL Vehicle ID.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+import pyarrow.feather as feather
+
+from lumina import config
+from lumina.delta import DeltaError, diff_extract, write_delta_snapshot
+from lumina.ingest import ingest_csv
+
+logger = logging.getLogger(__name__)
+
+# Naikkan setiap kali format/isi frame bersih berubah agar snapshot lama dibuang
+SNAPSHOT_VERSION = 6
+
+MANIFEST_NAME = "manifest.json"
+_CHUNK_BYTES = 1 << 20
+
+
+def is_remote(source):
+    """True jika sumber data berupa URL http(s)"""
+    return source.startswith(("http://", "https://"))
+
+
+def read_manifest(snapshot_dir):
+    """Baca manifest snapshot, atau dict kosong jika belum ada/tidak valid"""
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(snapshot_dir, manifest):
+    tmp = os.path.join(snapshot_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(snapshot_dir, MANIFEST_NAME))
+
+
+def _hash_stream(src, dst=None):
+    """SHA-256 dari stream biner, sekaligus menyalinnya ke ``dst`` jika diberikan"""
+    digest = hashlib.sha256()
+    while True:
+        block = src.read(_CHUNK_BYTES)
+        if not block:
+            break
+        digest.update(block)
+        if dst is not None:
+            dst.write(block)
+    return digest.hexdigest()
+
+
+def _local_fingerprint(path, manifest):
+    """Fingerprint file lokal; hash ulang hanya jika ukuran/mtime berubah"""
+    st = os.stat(path)
+    stat_key = [st.st_size, st.st_mtime_ns]
+    if manifest.get("source") == path and manifest.get("stat") == stat_key:
+        return manifest["fingerprint"], {"stat": stat_key}
+    with open(path, "rb") as f:
+        return _hash_stream(f), {"stat": stat_key}
+
+
+def _fetch_remote(url, manifest, workdir):
+    """Unduh sumber URL secara kondisional.
+
+    Mengembalikan ``(fingerprint, path_csv, meta)``. ``path_csv`` bernilai None
+    jika server menjawab 304 (isi tidak berubah) sehingga snapshot lama valid.
+    """
+    request = urllib.request.Request(url)
+    if manifest.get("source") == url:
+        if manifest.get("etag"):
+            request.add_header("If-None-Match", manifest["etag"])
+        if manifest.get("last_modified"):
+            request.add_header("If-Modified-Since", manifest["last_modified"])
+    try:
+        response = urllib.request.urlopen(request, timeout=config.REMOTE_TIMEOUT)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return manifest["fingerprint"], None, {}
+        raise
+    with response:
+        meta = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        fd, path = tempfile.mkstemp(suffix=".csv", dir=workdir)
+        with os.fdopen(fd, "wb") as out:
+            fingerprint = _hash_stream(response, out)
+    return fingerprint, path, meta
+
+
+def _snapshot_path(snapshot_dir, manifest):
+    return os.path.join(snapshot_dir, manifest["file"])
+
+
+def _is_usable(snapshot_dir, manifest):
+    return (
+        manifest.get("version") == SNAPSHOT_VERSION
+        and "file" in manifest
+        and os.path.exists(_snapshot_path(snapshot_dir, manifest))
+    )
+
+
+def read_snapshot(path):
+    """Baca snapshot Arrow IPC lewat memory-map menjadi DataFrame milik proses ini"""
+    table = feather.read_table(path, memory_map=True)
+    # Kolom dictionary Arrow menjadi pd.Categorical dengan kamus bersama
+    return table.to_pandas()
+
+
+def open_snapshot(path):
+    """DataFrame snapshot ``path``; dengan ``LUMINA_SHARED_DIR`` dibuka dari dataset bersama lintas proses"""
+    if config.SHARED_DIR:
+        from lumina.shared import attach
+        return attach(path).frame
+    return read_snapshot(path)
+
+
+def _write_snapshot(snapshot_dir, manifest, write):
+    """Jalankan ``write(tmp_path)`` lalu pindahkan hasilnya secara atomik"""
+    name = "vehicles-%s.arrow" % manifest["fingerprint"][:16]
+    tmp = os.path.join(snapshot_dir, name + ".tmp")
+    try:
+        result = write(tmp)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, os.path.join(snapshot_dir, name))
+    return name, result
+
+
+def _install_manifest(snapshot_dir, manifest):
+    """Tulis manifest snapshot baru lalu hapus file snapshot yang tidak dipakai"""
+    name = manifest["file"]
+    _write_manifest(snapshot_dir, manifest)
+
+    # Bersihkan snapshot lama yang sudah tidak direferensikan manifest
+    for entry in os.listdir(snapshot_dir):
+        if entry.startswith("vehicles-") and entry.endswith(".arrow") and entry != name:
+            try:
+                os.remove(os.path.join(snapshot_dir, entry))
+            except OSError:
+                pass
+    return manifest
+
+
+def build_snapshot(csv_path, snapshot_dir, manifest):
+    """Ingest CSV ke snapshot baru secara atomik lalu perbarui manifest"""
+    name, report = _write_snapshot(snapshot_dir, manifest, lambda tmp: ingest_csv(csv_path, tmp))
+    return _install_manifest(snapshot_dir, dict(
+        manifest, version=SNAPSHOT_VERSION, file=name, rows=report.rows_kept,
+        ingest=report.as_dict(), created_at=time.time()
+    ))
+
+
+def current_snapshot(snapshot_dir=None):
+    """``(frame, manifest)`` snapshot yang sedang direferensikan manifest, atau None"""
+    snapshot_dir = snapshot_dir or config.SNAPSHOT_DIR
+    manifest = read_manifest(snapshot_dir)
+    if not _is_usable(snapshot_dir, manifest):
+        return None
+    return open_snapshot(_snapshot_path(snapshot_dir, manifest)), manifest
+
+
+def _fingerprint_source(source, manifest, usable, snapshot_dir):
+    """Fingerprint sumber; sumber URL diunduh dulu (kondisional) ke ``snapshot_dir``.
+
+    Mengembalikan ``(fingerprint, path_csv, path_unduhan, meta)``.
+    """
+    if is_remote(source):
+        fingerprint, downloaded, meta = _fetch_remote(source, manifest if usable else {}, snapshot_dir)
+        return fingerprint, downloaded, downloaded, meta
+    fingerprint, meta = _local_fingerprint(source, manifest)
+    return fingerprint, source, None, meta
+
+
+def load_vehicle_frame(source=None, snapshot_dir=None):
+    """Muat frame kendaraan bersih dari snapshot, membangunnya jika perlu"""
+    source = source or config.DATA_SOURCE
+    snapshot_dir = snapshot_dir or config.SNAPSHOT_DIR
+    os.makedirs(snapshot_dir, exist_ok=True)
+    manifest = read_manifest(snapshot_dir)
+    usable = _is_usable(snapshot_dir, manifest)
+
+    try:
+        fingerprint, csv_path, downloaded, meta = _fingerprint_source(source, manifest, usable, snapshot_dir)
+    except (OSError, urllib.error.URLError) as e:
+        # Sumber tidak bisa dijangkau: tetap jalan dengan snapshot terakhir
+        if usable:
+            logger.warning("Sumber data %s tidak dapat diakses (%s); memakai snapshot lama", source, e)
+            return open_snapshot(_snapshot_path(snapshot_dir, manifest))
+        raise
+
+    try:
+        if usable and manifest.get("fingerprint") == fingerprint:
+            if meta and any(manifest.get(k) != v for k, v in meta.items()):
+                _write_manifest(snapshot_dir, dict(manifest, source=source, **meta))
+            return open_snapshot(_snapshot_path(snapshot_dir, manifest))
+
+        manifest = build_snapshot(csv_path, snapshot_dir, dict(meta, source=source, fingerprint=fingerprint))
+        logger.info("Snapshot %s dibangun dari %s", fingerprint[:16], source)
+        return open_snapshot(_snapshot_path(snapshot_dir, manifest))
+    finally:
+        if downloaded:
+            os.remove(downloaded)
+
+
+def refresh_snapshot(source=None, snapshot_dir=None):
+    """Perbarui snapshot secara inkremental jika isi sumber berubah.
+
+    Mengembalikan None jika sumber tidak berubah. Jika berubah, mengembalikan
+    ``(frame, delta)``: frame snapshot baru dan ``Delta`` terhadap snapshot
+    sebelumnya. ``delta`` bernilai None jika snapshot harus dibangun ulang
+    penuh (belum ada snapshot yang cocok atau kunci tidak unik).
+    """
+    source = source or config.DATA_SOURCE
+    snapshot_dir = snapshot_dir or config.SNAPSHOT_DIR
+    os.makedirs(snapshot_dir, exist_ok=True)
+    manifest = read_manifest(snapshot_dir)
+    usable = _is_usable(snapshot_dir, manifest)
+    fingerprint, csv_path, downloaded, meta = _fingerprint_source(source, manifest, usable, snapshot_dir)
+
+    try:
+        if usable and manifest.get("fingerprint") == fingerprint:
+            return None
+        update = dict(meta, source=source, fingerprint=fingerprint)
+
+        if usable:
+            old_path = _snapshot_path(snapshot_dir, manifest)
+            try:
+                delta = diff_extract(open_snapshot(old_path), csv_path)
+            except DeltaError as e:
+                logger.warning("Refresh inkremental tidak bisa dipakai (%s); membangun ulang snapshot", e)
+            else:
+                name, rows = _write_snapshot(
+                    snapshot_dir, update, lambda tmp: write_delta_snapshot(old_path, delta, tmp)
+                )
+                manifest = _install_manifest(snapshot_dir, dict(
+                    update, version=SNAPSHOT_VERSION, file=name, rows=rows, base=manifest["fingerprint"],
+                    delta=delta.report.as_dict(), created_at=time.time()
+                ))
+                return open_snapshot(_snapshot_path(snapshot_dir, manifest)), delta
+
+        manifest = build_snapshot(csv_path, snapshot_dir, update)
+        return open_snapshot(_snapshot_path(snapshot_dir, manifest)), None
+    finally:
+        if downloaded:
+            os.remove(downloaded)
@@ -0,0 +1,161 @@
+"""Foto model lokal berukuran kecil untuk strip "Top 5 Model" di tab Merek.
+
+Foto asli (URL atau path lokal di ``MODEL_IMAGE_MAP``) diunduh sekali ke
+``config.THUMBNAIL_DIR``, lalu diperkecil menjadi JPEG selebar
+``config.THUMBNAIL_WIDTH``. Render hanya membaca thumbnail yang sudah ada di
+disk (``cached``); foto yang belum ada diambil oleh thread background
+(``prefetch``), sehingga rerun tidak pernah menunggu server luar. Total
+thumbnail dibatasi ``config.THUMBNAIL_CACHE_MB`` dengan urutan LRU berdasarkan
+mtime (disentuh saat dipakai, paling sering sekali per ``TOUCH_SECONDS``); foto
+asli di ``originals/`` tidak dihitung karena jumlahnya tetap sebanyak
+``MODEL_IMAGE_MAP``.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+
+from PIL import Image
+
+from lumina import config
+from lumina.snapshot import is_remote
+
+logger = logging.getLogger(__name__)
+
+MODEL_IMAGE_MAP = {
+    "MODEL Y": "https://digitalassets.tesla.com/tesla-contents/image/upload/f_auto,q_auto/Homepage-Card-Model-Y-Desktop-US-v2.jpg",
+    "MODEL 3": "https://digitalassets.tesla.com/tesla-contents/image/upload/f_auto,q_auto/Homepage-Card-Model-3-Desktop-US-v2.jpg",
+    "LEAF": "https://dealernissandijakarta.com/wp-content/uploads/2021/08/nissan-leaf-1.jpg",
+    "MODEL S": "https://digitalassets.tesla.com/tesla-contents/image/upload/f_auto,q_auto/Homepage-Card-Model-S-Desktop-US-v3.jpg",
+    "BOLT EV": "https://media.architecturaldigest.com/photos/58910b7233bd1de9129eab2c/master/pass/Chevrolet%20Bolt%20EV%201.jpg",
+}
+
+# Jeda (detik) sebelum foto yang gagal diambil dicoba lagi
+RETRY_SECONDS = 300
+
+# Jeda minimum (detik) antar-pembaruan mtime thumbnail yang sama saat dipakai
+TOUCH_SECONDS = 60
+
+JPEG_QUALITY = 80
+
+# Keduanya hanya diakses dengan memegang _lock (ditulis juga oleh thread prefetch)
+_failed = {}  # sumber -> waktu gagal terakhir
+_pending = set()
+_lock = threading.Lock()
+
+
+def _key(source):
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:24]
+
+
+def thumbnail_path(source, width=None, thumbnail_dir=None):
+    """Path file thumbnail untuk sumber foto ``source`` (belum tentu sudah ada)"""
+    width = width or config.THUMBNAIL_WIDTH
+    return os.path.join(thumbnail_dir or config.THUMBNAIL_DIR, "%s-%d.jpg" % (_key(source), width))
+
+
+def cached(model, width=None, thumbnail_dir=None):
+    """Path thumbnail foto ``model`` jika sudah ada di disk, atau None (tanpa akses jaringan)"""
+    source = MODEL_IMAGE_MAP.get(model)
+    if not source:
+        return None
+    path = thumbnail_path(source, width, thumbnail_dir)
+    try:
+        # Tandai baru dipakai untuk urutan LRU, tanpa menulis metadata setiap render
+        if time.time() - os.stat(path).st_mtime >= TOUCH_SECONDS:
+            os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def _original(source, thumbnail_dir):
+    """Path foto asli di disk; sumber URL diunduh sekali"""
+    if not is_remote(source):
+        return source
+    path = os.path.join(thumbnail_dir, "originals", _key(source))
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            request = urllib.request.Request(source, headers={"User-Agent": "lumina-ev-dashboard"})
+            with os.fdopen(fd, "wb") as out, urllib.request.urlopen(request, timeout=config.REMOTE_TIMEOUT) as response:
+                shutil.copyfileobj(response, out)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return path
+
+
+def build(source, width=None, thumbnail_dir=None):
+    """Ambil foto ``source`` lalu simpan thumbnail JPEG selebar maksimum ``width``; kembalikan path-nya"""
+    width = width or config.THUMBNAIL_WIDTH
+    thumbnail_dir = thumbnail_dir or config.THUMBNAIL_DIR
+    os.makedirs(thumbnail_dir, exist_ok=True)
+    path = thumbnail_path(source, width, thumbnail_dir)
+    with Image.open(_original(source, thumbnail_dir)) as image:
+        image = image.convert("RGB")
+        image.thumbnail((width, width * 4))
+        tmp = path + ".tmp"
+        image.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True)
+    os.replace(tmp, path)
+    evict(thumbnail_dir)
+    return path
+
+
+def evict(thumbnail_dir=None, max_bytes=None):
+    """Hapus thumbnail yang paling lama tidak dipakai sampai totalnya di bawah ``max_bytes``"""
+    thumbnail_dir = thumbnail_dir or config.THUMBNAIL_DIR
+    max_bytes = config.THUMBNAIL_CACHE_MB * 2**20 if max_bytes is None else max_bytes
+    files = []
+    for entry in os.scandir(thumbnail_dir):
+        if not entry.name.endswith(".jpg"):
+            continue
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+
+def _fetch(models):
+    for model in models:
+        source = MODEL_IMAGE_MAP[model]
+        try:
+            build(source)
+        except Exception as exc:
+            with _lock:
+                _failed[source] = time.monotonic()
+            logger.warning("Foto model %s tidak bisa diambil (%s)", model, exc)
+        finally:
+            with _lock:
+                _pending.discard(model)
+
+
+def prefetch(models):
+    """Siapkan thumbnail ``models`` yang belum ada di thread background"""
+    with _lock:
+        missing = [
+            model for model in models
+            if model in MODEL_IMAGE_MAP and model not in _pending
+            and not os.path.exists(thumbnail_path(MODEL_IMAGE_MAP[model]))
+            and time.monotonic() - _failed.get(MODEL_IMAGE_MAP[model], -RETRY_SECONDS) >= RETRY_SECONDS
+        ]
+        _pending.update(missing)
+    if missing:
+        threading.Thread(target=_fetch, args=(missing,), name="lumina-thumbnails", daemon=True).start()
+    return missing
@@ -0,0 +1,138 @@
+"""Pemanasan dataset dan cache hasil saat server start.
+
+``start()`` memuat snapshot, membangun cube/indeks, kerangka grafik, lalu
+menghitung halaman untuk state filter default dan preset populer
+(``config.WARM_PRESETS``) di thread background. ``app.py`` mengambil dataset
+lewat ``dataset()`` yang menunggu hasil pemanasan bila sedang berjalan, jadi
+pekerjaan tidak pernah dilakukan dua kali.
+
+Kesiapan bisa dicek lewat ``is_ready()``/``status()`` atau endpoint HTTP
+``/ready`` dari ``serve_readiness()`` (200 jika siap, 503 jika belum) untuk
+readiness probe load balancer saat rolling restart.
+"""
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lumina import config, figures, instrument, thumbnails
+from lumina.batch import preset_states
+from lumina.dataset import Dataset
+from lumina.filters import DEFAULT_YEAR_START
+from lumina.measures import MEASURES
+from lumina.records import DEFAULT_SORT
+from lumina.result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_ready = threading.Event()
+_thread = None
+_dataset = None
+_error = None
+_status = {'phase': 'idle'}
+
+
+def warm(dataset, presets=None):
+    """Hitung halaman, sel peta, dan ringkasan ukuran preset ``presets`` ke cache hasil ``dataset``; kembalikan jumlah state"""
+    for kind in figures.CHARTS:
+        figures.skeleton(kind)
+    state = dataset.state
+    if config.AGGREGATION_BACKEND == "engine":
+        state.engine
+    state.records.order(DEFAULT_SORT)
+    if config.APPROXIMATE:
+        state.sample
+    frame = state.frame
+    year_range = (DEFAULT_YEAR_START, int(frame['Model Year'].max()))
+    warmed = set()
+    for preset in presets if presets is not None else config.WARM_PRESETS:
+        for _, filter_state in preset_states(preset, frame, year_range):
+            if filter_state not in warmed:
+                dataset.page(state, filter_state)
+                dataset.map_cells(state, filter_state)
+                for measure in MEASURES:
+                    dataset.measure_summary(state, filter_state, measure)
+                warmed.add(filter_state)
+    return len(warmed)
+
+
+def _run():
+    global _dataset, _error
+    started = time.perf_counter()
+    try:
+        _status.update(phase='loading')
+        dataset = Dataset.load(ResultCache(config.RESULT_CACHE_BYTES), config.DATA_SOURCE)
+        _status.update(phase='warming', rows=len(dataset.state.frame))
+        with instrument.span("warmup"):
+            _status['states'] = warm(dataset)
+        thumbnails.prefetch(dataset.state.top_models)
+        instrument.start_exporter()
+        _dataset = dataset
+        _status.update(phase='ready', seconds=round(time.perf_counter() - started, 3))
+        logger.info("Warm-up selesai: %d state filter dalam %.1fs", _status['states'], _status['seconds'])
+    except Exception as exc:
+        _error = exc
+        _status.update(phase='failed', error=repr(exc))
+        logger.exception("Warm-up gagal")
+    finally:
+        _ready.set()
+
+
+def start():
+    """Mulai pemanasan di thread background (sekali per proses)"""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _status.update(phase='starting', started_at=time.time())
+            _thread = threading.Thread(target=_run, name="lumina-warmup", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def dataset():
+    """Dataset hasil pemanasan; mulai dan tunggu pemanasan jika belum selesai"""
+    global _thread, _error
+    start()
+    _ready.wait()
+    with _lock:
+        error = _error
+        if error is not None:
+            # Izinkan percobaan ulang pada pemanggilan berikutnya
+            _thread, _error = None, None
+            _ready.clear()
+    if error is not None:
+        raise error
+    return _dataset
+
+
+def is_ready():
+    return _ready.is_set() and _error is None
+
+
+def status():
+    return dict(_status)
+
+
+class _ReadinessHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/ready"):
+            self.send_error(404)
+            return
+        body = json.dumps(status()).encode()
+        self.send_response(200 if is_ready() else 503)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_readiness(port, host="0.0.0.0"):
+    """Jalankan endpoint readiness HTTP di thread daemon"""
+    server = ThreadingHTTPServer((host, port), _ReadinessHandler)
+    threading.Thread(target=server.serve_forever, name="lumina-ready", daemon=True).start()
+    return server
@@ -0,0 +1,12 @@
+"""Entry ASGI dashboard: ``app.py`` ditambah route unduhan ekspor (``lumina.downloads``).
+
+Jalankan lewat ``python -m lumina.serve`` (dengan pemanasan), ``streamlit run server.py``
+atau server ASGI lain, mis. ``uvicorn server:app``.
+"""
+import os
+
+import streamlit as st
+
+from lumina import downloads
+
+app = st.App(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), routes=downloads.routes())
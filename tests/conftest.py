@@ -0,0 +1,128 @@
+"""Fixture bersama: snapshot sintetis kecil (seed tetap) dan pembanding pandas.
+
+Hasil cube/engine dibandingkan dengan ``value_counts``/``groupby`` pandas atas
+baris yang lolos filter, yaitu cara dashboard menghitung sebelum ada cube.
+Urutan kategori dengan hitungan seri tidak dibandingkan.
+"""
+import numpy as np
+import pytest
+
+from lumina import synthetic
+from lumina.aggregates import BEV, OTHER_LABEL, PHEV, TOP_COUNTIES_BY_TYPE, TOP_MAKES_HEATMAP, TOP_N
+from lumina.filters import FilterState
+from lumina.ingest import ingest_csv
+from lumina.snapshot import read_snapshot
+
+N_ROWS = 3000
+SEED = 3
+
+
+def build_frame(directory, name, n_rows=N_ROWS, seed=SEED):
+    """Frame snapshot dari CSV sintetis, lewat ingest yang sama dengan dashboard"""
+    csv_path = str(directory / (name + ".csv"))
+    arrow_path = str(directory / (name + ".arrow"))
+    synthetic.write_csv(csv_path, n_rows, seed=seed)
+    ingest_csv(csv_path, arrow_path)
+    return read_snapshot(arrow_path)
+
+
+# State filter yang diuji: tanpa filter, rentang tahun, tipe EV, County (padat
+# dan jarang), kombinasi, serta pilihan yang menghasilkan data kosong
+STATES = [
+    FilterState(),
+    FilterState(year_range=(2018, 2023)),
+    FilterState(ev_types=(PHEV,)),
+    FilterState(counties=('King',)),
+    FilterState(counties=('Chelan', 'Yakima')),
+    FilterState(year_range=(2015, 2026), ev_types=(BEV, PHEV), counties=('Pierce', 'Snohomish')),
+    FilterState(year_range=(2030, 2031)),
+    FilterState(ev_types=()),
+]
+
+
+@pytest.fixture(params=STATES, ids=repr)
+def state(request):
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def frame(tmp_path_factory):
+    return build_frame(tmp_path_factory.mktemp("snapshot"), "vehicles")
+
+
+def filter_mask(frame, state):
+    """Mask baris ``frame`` yang lolos ``state``, dihitung langsung dengan pandas"""
+    mask = np.ones(len(frame), dtype=bool)
+    if state.year_range is not None:
+        years = frame['Model Year']
+        mask &= ((years >= state.year_range[0]) & (years <= state.year_range[1])).to_numpy()
+    if state.ev_types is not None:
+        mask &= frame['Electric Vehicle Type'].isin(state.ev_types).to_numpy()
+    if state.counties:
+        mask &= frame['County'].isin(state.counties).to_numpy()
+    return mask
+
+
+def _value_counts(series):
+    counts = series.value_counts()
+    return counts[counts > 0]
+
+
+def _assert_top(top, expected, k=None):
+    """``top`` berisi k kategori teratas ``expected`` (seri boleh dalam urutan apa pun)"""
+    expected = expected.sort_values(ascending=False, kind='stable')
+    assert top.tolist() == expected.iloc[:k].tolist()
+    for label, value in top.items():
+        assert expected[label] == value
+
+
+def assert_page(agg, frame, state):
+    """Bandingkan ``DashboardAggregates`` dengan hitungan pandas atas baris yang lolos ``state``"""
+    rows = frame[filter_mask(frame, state)]
+    assert agg.total == len(rows)
+    assert agg.total_all == len(frame)
+    assert agg.n_makes == rows['Make'].nunique()
+    assert agg.n_models == rows['Model'].nunique()
+    assert agg.type_counts.to_dict() == _value_counts(rows['Electric Vehicle Type']).to_dict()
+
+    _assert_top(agg.top_counties, _value_counts(rows['County']), TOP_N['County'])
+    _assert_top(agg.top_cities, _value_counts(rows['City']), TOP_N['City'])
+    _assert_top(agg.top_makes, _value_counts(rows['Make']), TOP_N['Make'])
+    _assert_top(agg.top_models, _value_counts(rows['Model']), TOP_N['Model'])
+    _assert_top(agg.top_utilities, _value_counts(rows['Electric Utility']), TOP_N['Electric Utility'])
+
+    trend = rows['Model Year'].value_counts().sort_index()
+    assert agg.trend.index.tolist() == trend.index.tolist()
+    assert agg.trend.tolist() == trend.tolist()
+
+    _assert_top(agg.type_by_county.sum(axis=1), _value_counts(rows['County']), TOP_COUNTIES_BY_TYPE)
+    by_type = rows.groupby(['County', 'Electric Vehicle Type'], observed=True).size()
+    for county, row in agg.type_by_county.iterrows():
+        for ev_type, value in row.items():
+            assert by_type.get((county, ev_type), 0) == value
+
+    # Baris heatmap urut nama merek
+    _assert_top(agg.heatmap.sum(axis=1).sort_values(ascending=False), _value_counts(rows['Make']), TOP_MAKES_HEATMAP)
+    by_year = rows.groupby(['Make', 'Model Year'], observed=True).size()
+    assert agg.heatmap.to_numpy().sum() == by_year[by_year.index.get_level_values(0).isin(agg.heatmap.index)].sum()
+    for make, row in agg.heatmap.iterrows():
+        for year, value in row.items():
+            assert by_year.get((make, year), 0) == value
+
+    assert_tree(agg.model_tree, rows)
+
+
+def assert_tree(tree, rows):
+    """Pohon drill-down: nilai induk = jumlah anak, daun sama dengan hitungan pandas"""
+    values = tree.set_index('id')['value']
+    children = tree.groupby('parent')['value'].sum()
+    assert children.get("", 0) == len(rows)
+    for node, total in children.items():
+        if node:
+            assert values[node] == total
+
+    by_model = rows.groupby(['Make', 'Model', 'Model Year'], observed=True).size()
+    leaves = tree[~tree['id'].isin(children.index) & (tree['label'] != OTHER_LABEL)]
+    for node, value in zip(leaves['id'], leaves['value']):
+        make, model, year = node.split("/")
+        assert by_model[(make, model, int(year))] == value
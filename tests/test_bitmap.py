@@ -0,0 +1,65 @@
+import numpy as np
+
+from lumina.bitmap import (
+    DEFAULT_DIMS, BitmapIndex, delete_bits, from_rows, pack, popcount, shift_rows, to_mask, to_rows,
+)
+
+from conftest import filter_mask
+
+
+def test_select_matches_boolean_mask(frame, state):
+    index = BitmapIndex.from_frame(frame)
+    expected = filter_mask(frame, state)
+    bits = index.select(state)
+    assert np.array_equal(to_mask(bits, len(frame)), expected)
+    assert index.count(state) == expected.sum()
+
+
+def test_sparse_and_dense_values(frame):
+    county = BitmapIndex.from_frame(frame).value_bitmaps['County']
+    # County besar disimpan padat, County kecil sebagai daftar baris
+    assert county.dense and county.sparse
+    for label in county.categories:
+        bits = county.union([label])
+        assert np.array_equal(to_mask(bits, len(frame)), (frame['County'] == label).to_numpy())
+
+
+def test_extra_dims(frame, state):
+    index = BitmapIndex.from_frame(frame, DEFAULT_DIMS + ('Make',))
+    makes = ('TESLA', 'KIA')
+    expected = filter_mask(frame, state) & frame['Make'].isin(makes).to_numpy()
+    assert np.array_equal(to_mask(index.select(state, {'Make': makes}), len(frame)), expected)
+
+
+def test_year_bits_outside_data(frame):
+    index = BitmapIndex.from_frame(frame)
+    years = frame['Model Year'].to_numpy()
+    assert popcount(index.year_bits((1900, 1950))) == 0
+    assert popcount(index.year_bits((2040, 2050))) == 0
+    assert popcount(index.year_bits((1900, 2050))) == len(frame)
+    assert popcount(index.year_bits((2020, 2050))) == (years >= 2020).sum()
+
+
+def test_pack_round_trip():
+    rng = np.random.default_rng(0)
+    for n_rows in (0, 1, 63, 64, 65, 1000):
+        mask = rng.random(n_rows) < 0.3
+        bits = pack(mask)
+        assert np.array_equal(to_mask(bits, n_rows), mask)
+        assert np.array_equal(to_rows(bits, n_rows), np.flatnonzero(mask))
+        assert np.array_equal(from_rows(np.flatnonzero(mask), n_rows), bits)
+        assert popcount(bits) == mask.sum()
+
+
+def test_delete_bits_matches_mask():
+    rng = np.random.default_rng(1)
+    for n_rows in (1, 63, 64, 65, 130, 1000):
+        masks = rng.random((3, n_rows)) < 0.4
+        for n_removed in (0, 1, n_rows // 7, n_rows):
+            removed = np.sort(rng.choice(n_rows, n_removed, replace=False))
+            keep = np.ones(n_rows, dtype=bool)
+            keep[removed] = False
+            bits = delete_bits(np.stack([pack(mask) for mask in masks]), n_rows, removed)
+            for row, mask in zip(bits, masks):
+                assert np.array_equal(to_mask(row, keep.sum()), mask[keep])
+            assert np.array_equal(shift_rows(np.flatnonzero(masks[0]), removed), np.flatnonzero(masks[0][keep]))
@@ -0,0 +1,55 @@
+import numpy as np
+
+from lumina.aggregates import MAKE_MODEL_YEAR, model_tree
+from lumina.cube import AggregateCube, group_counts
+
+from conftest import assert_page, assert_tree, filter_mask
+
+
+def test_aggregates_match_pandas(frame, state):
+    cube = AggregateCube.from_frame(frame)
+    assert_page(cube.aggregates(state), frame, state)
+
+
+def test_count_matches_pandas(frame, state):
+    cube = AggregateCube.from_frame(frame)
+    assert cube.count(state) == filter_mask(frame, state).sum()
+
+
+def test_cuboids_cover_every_row(frame):
+    cube = AggregateCube.from_frame(frame)
+    for cuboid in cube.cuboids.values():
+        assert cuboid.counts.sum() == len(frame)
+        assert (cuboid.counts > 0).all()
+
+
+def test_group_counts_sparse_path_matches_dense():
+    rng = np.random.default_rng(0)
+    codes = [rng.integers(0, 50, 1000), rng.integers(0, 40, 1000)]
+    weights = rng.choice([-1.0, 1.0], 1000)
+    dense = group_counts(codes, [50, 40], weights)
+    # Ukuran dimensi besar memaksa jalur np.unique
+    sparse = group_counts(codes, [50, 1 << 22], weights)
+    assert np.array_equal(dense[1], sparse[1])
+    for a, b in zip(dense[0], sparse[0]):
+        assert np.array_equal(a, b)
+
+
+def test_model_tree_is_pruned(frame):
+    cube = AggregateCube.from_frame(frame)
+    base = cube.cuboids['Model']
+    cells = cube._cells(base, np.ones(len(base), dtype=bool), *MAKE_MODEL_YEAR)
+    tree = model_tree(cells, cube.labels, top=(2, 2, 1))
+    assert_tree(tree, frame)
+    assert (tree['parent'] == "").sum() == 3  # dua merek + "Lainnya"
+
+
+def test_cells_match_dense_counts(frame, state):
+    cube = AggregateCube.from_frame(frame)
+    base = cube.cuboids['Model']
+    mask = cube._mask(base, state)
+    (makes, models, years), counts = cube._cells(base, mask, *MAKE_MODEL_YEAR)
+    dense = cube._bincount(base, mask, *MAKE_MODEL_YEAR)
+    assert (counts > 0).all()
+    assert np.array_equal(dense[makes, models, years], counts)
+    assert counts.sum() == dense.sum()
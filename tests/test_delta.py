@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lumina import synthetic
+from lumina.bitmap import DEFAULT_DIMS, BitmapIndex, to_mask
+from lumina.cube import AggregateCube
+from lumina.delta import DeltaError, diff_extract, write_delta_snapshot
+from lumina.geo import TilePyramid
+from lumina.ingest import KEY_COLUMN, ingest_csv
+from lumina.measures import MEASURES, MeasureCube
+from lumina.snapshot import read_snapshot
+
+from conftest import STATES, build_frame
+
+
+@pytest.fixture(scope="module")
+def refreshed(tmp_path_factory):
+    """Snapshot lama, extract baru (hapus, ubah, tambah baris), dan hasil delta-nya"""
+    directory = tmp_path_factory.mktemp("delta")
+    old = build_frame(directory, "old")
+    extract = pd.read_csv(directory / "old.csv")
+    rng = np.random.default_rng(1)
+    extract = extract.drop(index=rng.choice(len(extract), 100, replace=False)).reset_index(drop=True)
+    changed = rng.choice(len(extract), 150, replace=False)
+    before = extract.copy()
+    extract.loc[changed[:50], 'Model Year'] = 2026
+    extract.loc[changed[50:100], 'County'] = 'Chelan'
+    extract.loc[changed[100:], 'Make'] = 'NEWMAKE'  # label baru: kamus diperluas
+    edited = ['Model Year', 'County', 'Make']
+    updated = int((extract[edited] != before[edited]).any(axis=1).sum())
+    fresh = synthetic.generate(200, seed=9, first_id=900_000_000)
+    extract = pd.concat([extract, fresh], ignore_index=True)
+    new_csv = str(directory / "new.csv")
+    extract.to_csv(new_csv, index=False)
+
+    delta = diff_extract(old, new_csv)
+    new_path = str(directory / "new.arrow")
+    write_delta_snapshot(str(directory / "old.arrow"), delta, new_path)
+    full_path = str(directory / "full.arrow")
+    ingest_csv(new_csv, full_path)
+    return old, delta, read_snapshot(new_path), read_snapshot(full_path), updated
+
+
+def test_delta_report(refreshed):
+    _, delta, _, _, updated = refreshed
+    assert delta.report.deleted == 100
+    assert delta.report.updated == updated
+    assert delta.report.inserted == 200
+
+
+def test_delta_snapshot_matches_full_ingest(refreshed):
+    _, _, new, full, _ = refreshed
+    key = KEY_COLUMN
+    new = new.sort_values(key, ignore_index=True)
+    full = full.sort_values(key, ignore_index=True)
+    assert len(new) == len(full)
+    for col in full.columns:
+        assert new[col].astype(object).equals(full[col].astype(object)), col
+
+
+def test_apply_delta_matches_rebuild(refreshed):
+    old, delta, new, _, _ = refreshed
+    added = new.iloc[len(new) - len(delta.added):]
+    patched = AggregateCube.from_frame(old).apply_delta(old.take(delta.removed), added)
+    rebuilt = AggregateCube.from_frame(new)
+    assert patched.total == rebuilt.total
+    for extra, cuboid in rebuilt.cuboids.items():
+        other = patched.cuboids[extra]
+        assert np.array_equal(other.counts, cuboid.counts)
+        for dim in cuboid.dims:
+            assert np.array_equal(other.keys[dim], cuboid.keys[dim])
+    for state in STATES:
+        a, b = patched.aggregates(state), rebuilt.aggregates(state)
+        assert a.top_makes.equals(b.top_makes)
+        assert a.trend.equals(b.trend)
+        assert a.model_tree.equals(b.model_tree)
+
+
+def test_index_apply_delta_matches_rebuild(refreshed):
+    old, delta, new, _, _ = refreshed
+    dims = DEFAULT_DIMS + ('Make',)
+    added = new.iloc[len(new) - len(delta.added):]
+    patched = BitmapIndex.from_frame(old, dims).apply_delta(delta.removed, added)
+    rebuilt = BitmapIndex.from_frame(new, dims)
+    assert patched.n_rows == len(new)
+    for state in STATES:
+        assert np.array_equal(to_mask(patched.select(state), len(new)), to_mask(rebuilt.select(state), len(new)))
+    for makes in (('TESLA',), ('NEWMAKE', 'KIA')):
+        assert np.array_equal(patched.select(STATES[0], {'Make': makes}), rebuilt.select(STATES[0], {'Make': makes}))
+
+
+def test_pyramid_apply_delta_matches_rebuild(refreshed):
+    old, delta, new, _, _ = refreshed
+    added = new.iloc[len(new) - len(delta.added):]
+    patched = TilePyramid.from_frame(old).apply_delta(old.take(delta.removed), added)
+    rebuilt = TilePyramid.from_frame(new)
+    assert patched.located == rebuilt.located
+    assert patched.year_min == rebuilt.year_min
+    for level, cuboid in rebuilt.levels.items():
+        other = patched.levels[level]
+        assert np.array_equal(other.counts, cuboid.counts)
+        for dim in cuboid.dims:
+            assert np.array_equal(other.keys[dim], cuboid.keys[dim])
+    for state in STATES:
+        assert patched.cells(state).cells.equals(rebuilt.cells(state).cells)
+
+
+def test_measures_apply_delta_matches_rebuild(refreshed):
+    old, delta, new, _, _ = refreshed
+    added = new.iloc[len(new) - len(delta.added):]
+    patched = MeasureCube.from_frame(old).apply_delta(old.take(delta.removed), added)
+    rebuilt = MeasureCube.from_frame(new)
+    for measure, cuboid in rebuilt.cuboids.items():
+        other = patched.cuboids[measure]
+        assert np.array_equal(other.counts, cuboid.counts)
+        for dim in cuboid.dims:
+            assert np.array_equal(other.keys[dim], cuboid.keys[dim])
+    for state in STATES:
+        for measure in MEASURES:
+            a, b = patched.summary(measure, state), rebuilt.summary(measure, state)
+            assert a.n == b.n
+            assert a.histogram.equals(b.histogram)
+            assert a.by_make.equals(b.by_make)
+            assert a.by_year.equals(b.by_year)
+
+
+def test_duplicate_keys_are_rejected(refreshed, tmp_path):
+    old = refreshed[0]
+    path = tmp_path / "dup.csv"
+    extract = synthetic.generate(10, seed=2)
+    pd.concat([extract, extract.iloc[:1]]).to_csv(path, index=False)
+    with pytest.raises(DeltaError):
+        diff_extract(old, str(path))
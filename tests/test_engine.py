@@ -0,0 +1,41 @@
+import numpy as np
+
+from lumina.aggregates import MAKE_MODEL_YEAR
+from lumina.bitmap import BitmapIndex, to_rows
+from lumina.cube import AggregateCube
+from lumina.engine import AggregationEngine
+
+from conftest import assert_page
+
+
+def _assert_cells_equal(a, b):
+    for keys, other in zip(a[0], b[0]):
+        assert np.array_equal(keys, other)
+    assert np.array_equal(a[1], b[1])
+
+
+def test_aggregates_match_pandas(frame, state):
+    engine = AggregationEngine.from_frame(frame)
+    index = BitmapIndex.from_frame(frame)
+    rows = to_rows(index.select(state), len(frame))
+    assert_page(engine.aggregates(rows), frame, state)
+
+
+def test_unit_weights_match_unweighted(frame):
+    engine = AggregationEngine.from_frame(frame)
+    rows = np.arange(0, len(frame), 3)
+    plain = engine.dense_counts(rows)
+    weighted = engine.dense_counts(rows, np.ones(len(rows)))
+    for key, counts in plain.items():
+        if key == MAKE_MODEL_YEAR:
+            _assert_cells_equal(counts, weighted[key])
+        else:
+            assert np.array_equal(counts, weighted[key])
+
+
+def test_dense_counts_match_cube(frame):
+    engine = AggregationEngine.from_frame(frame)
+    cube = AggregateCube.from_frame(frame)
+    base = cube.cuboids['Model']
+    expected = cube._cells(base, np.ones(len(base), dtype=bool), *MAKE_MODEL_YEAR)
+    _assert_cells_equal(engine.dense_counts()[MAKE_MODEL_YEAR], expected)
@@ -0,0 +1,88 @@
+import asyncio
+import io
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from lumina.downloads import stream
+from lumina.export import FORMATS, write_export
+from lumina.shared import attach
+
+from conftest import build_frame, filter_mask
+
+
+def _read(path, fmt):
+    if fmt == 'csv':
+        return pd.read_csv(path)
+    return pq.read_table(path).to_pandas()
+
+
+@pytest.mark.parametrize('fmt', list(FORMATS))
+def test_export_round_trip(frame, state, fmt, tmp_path):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    rows = np.flatnonzero(filter_mask(frame, state))
+    # Potongan kecil agar jalur irisan dan take sama-sama terpakai
+    path = str(tmp_path / ('export.' + fmt))
+    assert write_export(table, rows, path, fmt, chunk_rows=97) == len(rows)
+    exported = _read(path, fmt)
+
+    expected = frame.iloc[rows].reset_index(drop=True)
+    assert list(exported.columns) == list(expected.columns)
+    assert len(exported) == len(expected)
+    for column in ('Make', 'Model', 'County', 'Electric Vehicle Type'):
+        assert exported[column].astype(str).tolist() == expected[column].astype(str).tolist()
+    assert exported['Model Year'].tolist() == expected['Model Year'].tolist()
+
+
+async def _collect(produce, block_size, limit=None):
+    blocks = []
+    async for block in stream(produce, block_size):
+        blocks.append(block)
+        if len(blocks) == limit:
+            break
+    return blocks
+
+
+@pytest.mark.parametrize('fmt', list(FORMATS))
+def test_stream_matches_file(frame, fmt):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    rows = np.arange(0, len(frame), 3)
+    expected = io.BytesIO()
+    write_export(table, rows, expected, fmt, chunk_rows=97)
+    blocks = asyncio.run(_collect(lambda sink: write_export(table, rows, sink, fmt, chunk_rows=97), 512))
+    assert len(blocks) > 1
+    assert b''.join(blocks) == expected.getvalue()
+
+
+def test_stream_stops_producer_when_closed(frame):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    blocks = asyncio.run(_collect(lambda sink: write_export(table, np.arange(len(frame)), sink, 'csv', 10), 64, limit=1))
+    assert len(blocks) == 1
+    deadline = time.monotonic() + 5
+    while any(t.name == 'lumina-export' for t in threading.enumerate()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not any(t.name == 'lumina-export' for t in threading.enumerate())
+
+
+def test_stream_raises_producer_error():
+    def produce(sink):
+        sink.write(b'x')
+        raise ValueError("gagal")
+
+    with pytest.raises(ValueError):
+        asyncio.run(_collect(produce, 512))
+
+
+def test_shared_table_uses_mapped_columns(tmp_path):
+    frame = build_frame(tmp_path, "vehicles", n_rows=500)
+    shared = attach(str(tmp_path / "vehicles.arrow"), str(tmp_path / "shared"))
+    table = shared.table()
+    assert table.to_pandas().equals(pa.Table.from_pandas(frame, preserve_index=False).to_pandas())
+    for name in ('DOL Vehicle ID', 'Electric Range'):
+        assert table[name].chunk(0).buffers()[1].address == shared.arrays['frame/' + name].ctypes.data
+    assert table['Make'].chunk(0).indices.buffers()[1].address == shared.arrays['frame/Make'].ctypes.data
@@ -0,0 +1,34 @@
+import numpy as np
+
+from lumina.filters import ALL_ROWS
+from lumina.geo import MAX_LEVEL, MIN_LEVEL, TilePyramid, tile_range, tile_xy, viewport
+
+from conftest import filter_mask
+
+
+def _located(frame):
+    return np.isfinite(frame['Longitude'].to_numpy()) & np.isfinite(frame['Latitude'].to_numpy())
+
+
+def test_cells_count_located_rows(frame, state):
+    pyramid = TilePyramid.from_frame(frame)
+    assert pyramid.cells(state).total == (filter_mask(frame, state) & _located(frame)).sum()
+
+
+def test_viewport_clips_to_visible_tiles(frame, state):
+    pyramid = TilePyramid.from_frame(frame)
+    bounds = (-122.5, 47.4, -122.0, 47.8)
+    cells = pyramid.cells(state, max_cells=50, bounds=bounds)
+    assert len(cells.cells) <= 50 or cells.level == MIN_LEVEL
+
+    x, y = tile_xy(frame['Longitude'].to_numpy(), frame['Latitude'].to_numpy(), cells.level)
+    x0, x1, y0, y1 = tile_range(bounds, cells.level)
+    inside = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1) & _located(frame)
+    assert cells.total == (filter_mask(frame, state) & inside).sum()
+
+
+def test_smaller_viewport_uses_finer_level(frame):
+    pyramid = TilePyramid.from_frame(frame)
+    whole = pyramid.cells(ALL_ROWS, max_cells=200)
+    zoomed = pyramid.cells(ALL_ROWS, max_cells=200, bounds=viewport([-122.33], [47.61], whole.level))
+    assert whole.level < zoomed.level <= MAX_LEVEL
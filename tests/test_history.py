@@ -0,0 +1,14 @@
+import os
+
+import pytest
+
+from lumina.history import add_release, read_history
+
+
+@pytest.mark.parametrize('label', ['../escape', 'a/b', '', 'rilis 2025'])
+def test_add_release_rejects_unsafe_label(tmp_path, label):
+    history_dir = str(tmp_path / "history")
+    with pytest.raises(ValueError):
+        add_release(label, str(tmp_path / "missing.csv"), history_dir)
+    assert not os.path.exists(history_dir)
+    assert read_history(history_dir) == []
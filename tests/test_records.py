@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from lumina import records as records_module
+from lumina.records import SORT_COLUMNS, RecordIndex
+
+from conftest import filter_mask
+
+
+def _expected_rows(frame, mask, sort, descending):
+    """Urutan baris versi daftar nomor baris penuh (stabil, nilai kosong di akhir)"""
+    series = frame[sort]
+    if hasattr(series, 'cat'):
+        # Label alfabetis; kode -1 (kosong) di akhir
+        rank = series.cat.categories.astype(str).argsort(kind='stable').argsort()
+        codes = series.cat.codes.to_numpy()
+        key = np.where(codes >= 0, rank[codes], len(rank))
+    else:
+        key = series.to_numpy()
+    order = np.argsort(key, kind='stable')
+    if descending:
+        missing = int(series.isna().sum())
+        order = order[::-1]
+        order = np.concatenate([order[missing:], order[:missing]])
+    return order[mask[order]]
+
+
+@pytest.mark.parametrize('descending', [False, True])
+@pytest.mark.parametrize('sort', ['Model Year', 'Make', 'Base MSRP'])
+def test_pages_match_full_ordering(frame, state, sort, descending, monkeypatch):
+    # Blok kecil agar halaman melintasi banyak batas blok
+    monkeypatch.setattr(records_module, 'SELECTION_BLOCK', 64)
+    index = RecordIndex(frame)
+    mask = filter_mask(frame, state)
+    selection = index.select(mask, '', sort, descending)
+    expected = _expected_rows(frame, mask, sort, descending)
+    assert selection.total == len(expected)
+
+    page_size = 50
+    pages = [index.rows(selection, start, start + page_size) for start in range(0, selection.total, page_size)]
+    got = np.concatenate(pages) if pages else np.zeros(0, dtype=np.int64)
+    assert np.array_equal(got, expected)
+    assert len(index.rows(selection, selection.total, selection.total + page_size)) == 0
+
+
+def test_search_narrows_selection(frame):
+    index = RecordIndex(frame)
+    mask = np.ones(len(frame), dtype=bool)
+    selection = index.select(mask, 'tesla model', 'Make')
+    rows = index.rows(selection, 0, selection.total)
+    expected = (frame['Make'] == 'TESLA') & frame['Model'].str.lower().str.contains('model')
+    assert sorted(rows) == sorted(np.flatnonzero(expected.to_numpy()))
+    assert set(index.page(selection, 0, 10)['Make']) == {'TESLA'}
+
+
+def test_selection_is_compact(frame):
+    index = RecordIndex(frame)
+    selection = index.select(np.ones(len(frame), dtype=bool), '', SORT_COLUMNS[0])
+    assert selection.bits.nbytes <= len(frame) // 8 + 8
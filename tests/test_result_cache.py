@@ -0,0 +1,88 @@
+import threading
+
+import numpy as np
+import pytest
+
+from lumina.result_cache import ResultCache, sizeof
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = ResultCache(max_bytes=100)
+    cache.put('a', 1, nbytes=40)
+    cache.put('b', 2, nbytes=40)
+    assert cache.get('a') == 1  # 'b' sekarang yang paling lama tidak dipakai
+    cache.put('c', 3, nbytes=40)
+    assert cache.keys() == ['a', 'c']
+    assert cache.bytes == 80
+    assert cache.stats()['evictions'] == 1
+
+
+def test_replacing_key_updates_bytes():
+    cache = ResultCache(max_bytes=100)
+    cache.put('a', 1, nbytes=60)
+    cache.put('a', 2, nbytes=30)
+    assert cache.get('a') == 2
+    assert cache.bytes == 30
+
+
+def test_value_larger_than_cache_is_not_stored():
+    cache = ResultCache(max_bytes=100)
+    cache.put('a', 1, nbytes=10)
+    cache.put('big', 2, nbytes=101)
+    assert 'big' not in cache
+    assert cache.keys() == ['a']
+
+
+def test_stats_count_hits_and_misses():
+    cache = ResultCache(max_bytes=100)
+    assert cache.get('a') is None
+    cache.put('a', 1, nbytes=1)
+    cache.get('a')
+    assert 'a' in cache  # __contains__ tidak dihitung
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+
+def test_concurrent_requests_compute_once():
+    cache = ResultCache(max_bytes=1 << 20)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return np.arange(10)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert all(result is results[0] for result in results)
+    assert cache.stats()['misses'] == 1
+
+
+def test_failed_compute_is_retried():
+    cache = ResultCache(max_bytes=1 << 20)
+
+    def fail():
+        raise RuntimeError("gagal")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('k', fail)
+    assert cache.get_or_compute('k', lambda: 7) == 7
+
+
+def test_sizeof_counts_array_bytes():
+    values = np.zeros(1000, dtype=np.int64)
+    assert sizeof(values) == 8000
+    assert sizeof({'a': values}) > 8000
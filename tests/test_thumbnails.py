@@ -0,0 +1,43 @@
+import os
+
+from PIL import Image
+
+from lumina import thumbnails
+
+
+def _source(tmp_path, name, size=(640, 480)):
+    path = str(tmp_path / name)
+    Image.new("RGB", size, (40, 90, 160)).save(path, "PNG")
+    return path
+
+
+def test_cached_touches_at_most_once_per_interval(tmp_path, monkeypatch):
+    thumbnail_dir = str(tmp_path / "thumbs")
+    source = _source(tmp_path, "model.png")
+    monkeypatch.setitem(thumbnails.MODEL_IMAGE_MAP, "TEST MODEL", source)
+    path = thumbnails.build(source, 64, thumbnail_dir)
+
+    os.utime(path, (1000, 1000))
+    assert thumbnails.cached("TEST MODEL", 64, thumbnail_dir) == path
+    touched = os.stat(path).st_mtime
+    assert touched > 1000
+
+    os.utime(path, (touched - 1, touched - 1))
+    thumbnails.cached("TEST MODEL", 64, thumbnail_dir)
+    assert os.stat(path).st_mtime == touched - 1
+    assert thumbnails.cached("MISSING MODEL", 64, thumbnail_dir) is None
+
+
+def test_evict_counts_thumbnails_only(tmp_path):
+    thumbnail_dir = str(tmp_path / "thumbs")
+    paths = [thumbnails.build(_source(tmp_path, "%d.png" % i), 64, thumbnail_dir) for i in range(3)]
+    for i, path in enumerate(paths):
+        os.utime(path, (1000 + i, 1000 + i))
+    original = os.path.join(thumbnail_dir, "originals", "photo")
+    os.makedirs(os.path.dirname(original))
+    with open(original, "wb") as f:
+        f.write(b"\0" * 10**6)
+
+    thumbnails.evict(thumbnail_dir, max_bytes=sum(os.path.getsize(p) for p in paths[1:]))
+    assert [os.path.exists(p) for p in paths] == [False, True, True]
+    assert os.path.exists(original)